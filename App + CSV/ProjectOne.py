@@ -1,652 +1,1439 @@
-import tkinter as tk
-from tkinter import messagebox
-import re
-import csv
-
-
-storage_text = None # this is the window on the bottom of the app to display the texts
-window = None # This is the window you're using
-
-# Dictionaries to store storage, quanity, first name, last name, phone number, and email
-storage_items = {}
-quantity = {}
-first_name = {}
-last_name = {}
-phone_number = {}
-email = {}
-
-def delete_items(itemID):
-    """
-    Delete an item from the storage system.
-
-    Parameters:
-    - itemID (int): The unique identifier of the item to be deleted.
-
-    Clears the text box at the bottom and checks if the item exists in the storage system.
-    If the item exists, it is deleted along with associated information (quantity, first name, last name, phone number, email).
-    If the item does not exist, a message is displayed indicating that it is not in the system.
-
-    Displays a messagebox with information about the deletion or the non-existence of the item.
-
-    Example:
-    delete_items(42)  # Deletes the item with ID 42 from the storage system.
-
-    """
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-
-    #check to see if it exists and if not to send a message that it does not exist
-    if itemID in storage_items:
-        del storage_items[itemID]
-        del quantity[itemID]
-        del first_name[itemID]
-        del last_name[itemID]
-        del phone_number[itemID]
-        del email[itemID]
-
-        #send a message and say that it was deleted
-        messagebox.showinfo("Item Deleted", f"Item {itemID} has been deleted.")
-
-    else:
-        #send a message and say that it does not exist
-        messagebox.showinfo("Item Not Found", f"Item {itemID} is not in the system.")
-
-
-#use this to read the csv file
-def read_csv():
-
-    """
-    Read data from a CSV file and update the storage system.
-
-    Clears the text box at the bottom, opens the 'ProjectStorage.csv' file, and creates a CSV reader.
-    Iterates over rows in the CSV file, extracting values using column names.
-    Updates the storage system with the extracted information.
-
-    Updates:
-    - storage_items
-    - quantity
-    - first_name
-    - last_name
-    - phone_number
-    - email
-
-    Displays a messagebox to notify the user that the storage has been updated.
-
-    Example:
-    read_csv()  # Reads data from 'ProjectStorage.csv' and updates the storage system.
-
-    """
-
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-    # Open the CSV file
-    with open('ProjectStorage.csv', 'r') as file:
-        # Create a CSV reader
-        csv_reader = csv.DictReader(file)
-
-        # Iterate over rows
-        for row in csv_reader:
-            #find value from rows using the column name
-            itemID = row['itemID']
-            product = row['Product']
-            Quantity = row['Quantity']
-            FirstName = row['First Name']
-            LastName = row['Last Name']
-            PhoneNumber = row['Phonenumber']
-            Email = row['Email']
-
-            # store in the directiry
-            storage_items[itemID] = product
-            quantity[itemID] = Quantity
-            first_name[itemID] = FirstName
-            last_name[itemID] = LastName
-            phone_number[itemID] = PhoneNumber
-            email[itemID] = Email
-            
-    #let user know that the storage has been updated
-    messagebox.showinfo("Storage Notification", "Storage has been uploaded.")
-
-#use this to read the csv file
-def write_csv():
-
-    """
-    Write data to a CSV file based on the current storage system.
-
-    Clears the text box at the bottom, opens the 'ProjectStorage.csv' file for writing, and creates a CSV writer.
-    Writes the header and iterates over items in the storage system to write data rows in the CSV file.
-
-    Writes:
-    - 'itemID'
-    - 'Product'
-    - 'Quantity'
-    - 'First Name'
-    - 'Last Name'
-    - 'Phonenumber'
-    - 'Email'
-
-    Displays a messagebox to notify the user that the storage has been updated.
-
-    Example:
-    write_csv()  # Writes data from the current storage system to 'ProjectStorage.csv'.
-
-    """
-
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-    # Open the CSV file
-    with open('ProjectStorage.csv', 'w', newline='') as file:
-        # Create a CSV writer
-        writer = csv.writer(file)
-        header = ['itemID','Product','Quantity','First Name','Last Name','Phonenumber','Email']
-        writer.writerow(header)
-       
-       #forloop to run through and write in the file 
-        for itemID, product in storage_items.items():
-            # Create a list representing the row
-            row = [itemID, storage_items[itemID], quantity[itemID], first_name[itemID], last_name[itemID], phone_number[itemID], email[itemID]]
-            writer.writerow(row)             
-
-            
-    #let user know that the storage has been updated
-    messagebox.showinfo("Storage Notification", "Storage has been updated.")
-
-def add_item(itemID, product,Quantity,FirstName,LastName,PhoneNumber,Email):
-
-    """
-    Add an item to the storage system.
-
-    Clears the text box at the bottom and performs validation checks on input parameters.
-    Checks for completeness, validity of itemID, quantity, first and last names, product name, email, and phone number.
-    Ensures itemID is unique and not already in use.
-    Uses regular expression for validating the phone number.
-    Displays appropriate messages in case of validation errors.
-
-    Parameters:
-    - itemID (str or int): The unique identifier for the item.
-    - product (str): The product name.
-    - Quantity (str): The quantity of the item.
-    - FirstName (str): The first name associated with the item.
-    - LastName (str): The last name associated with the item.
-    - PhoneNumber (str): The phone number associated with the item (in xxx-xxx-xxxx format).
-    - Email (str): The email address associated with the item.
-
-    Example:
-    add_item(123, "Laptop", "5", "John", "Doe", "123-456-7890", "john.doe@example.com")
-    # Adds an item with the specified details to the storage system.
-
-    """
-
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-
-    # Check if itemID and product are not blank
-    if not itemID or not product or not FirstName or not LastName or not PhoneNumber or not Email:
-        messagebox.showinfo("Incomplete Information", "Please fill out the entire information.")
-        return
-    
-    # Check if itemID contains only digits
-    if not itemID.isdigit():
-        messagebox.showinfo("Invalid ItemID", "Please enter a valid integer for itemID.")
-        return
-    
-    # Check if quanity contains only digits
-    if not Quantity.isdigit():
-        messagebox.showinfo("Invalid Quanity", "Please enter a valid integer for quanity.")
-        return
-    
-    # Check if FirstName contains only letters
-    if not FirstName.isalpha():
-        messagebox.showinfo("Invalid First Name", "Please enter a valid first name with only letters.")
-        return
-
-    # Check if LastName contains only letters
-    if not LastName.isalpha():
-        messagebox.showinfo("Invalid Last Name", "Please enter a valid last name with only letters.")
-        return
-    
-    # Check if product name contains only letters
-    if not product.isalpha():
-        messagebox.showinfo("Invalid Product Name", "Please enter a valid product name with only letters.")
-        return
-    
-    # Check if email contains only allowed characters
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789@.")
-
-    # Check if email contains '@' and ends with '.com'
-    if '@' not in Email or not Email.endswith('.com'):
-        message = "Invalid email format. Please use the correct email format (e.g., user@example.com)."
-        messagebox.showinfo("Invalid Email Address", message)
-        return
-
-    # Check if '@' and '.' are used only in specific positions
-    if Email.count('@') != 1 or Email.count('.') != 1 or Email.index('@') > Email.index('.'):
-        message = "Invalid email format. Please use the correct email format (e.g., user@example.com)."
-        messagebox.showinfo("Invalid Email Address", message)
-        return
-
-    # Check if email contains only allowed characters before '@' and after '.'
-    local_part, domain_part = Email.split('@')
-    if not all(char in allowed_chars for char in local_part) or not all(char in allowed_chars for char in domain_part):
-        message = "Invalid characters in the email address. Please use only letters, numbers, @, and '.'."
-        messagebox.showinfo("Invalid Email Address", message)
-        return
-
-    
-    #make sure we have not used that id yet
-    if (itemID in storage_items):
-        message = "ItemID you entered is already in use. Try again"
-        messagebox.showinfo("Invalid ItemID", message)
-        return
-    
-    # validating the phone number here using regex
-    if not re.match(r'^\d{3}-\d{3}-\d{4}$', PhoneNumber):
-        messagebox.showinfo("Invalid Phone Number", "Please enter a valid phone number in xxx-xxx-xxxx format.")
-        return
-
-    # Add item logic using itemID and product
-    storage_items[itemID] = product
-    first_name[itemID] = FirstName
-    last_name[itemID] = LastName
-    phone_number[itemID] = PhoneNumber
-    email[itemID] = Email
-    quantity[itemID] = Quantity
-
-    # Display message to the user
-    messagebox.showinfo("Item Added", f"Item {itemID} has been added successfully.")
-
-
-# Function to show the most recent items
-def most_recent_items():
-
-    """
-    Display the most recently added items in the storage system.
-
-    Clears the text widget before updating.
-    Creates a list of item details in reverse order based on the storage system.
-    Prints the most recent items in the text widget.
-
-    Displays:
-    - itemID
-    - Product
-    - Quantity
-    - Full Name (concatenation of first and last names)
-    - Phone Number
-    - Email
-
-    Example:
-    most_recent_items()  # Displays the most recently added items in the storage system.
-
-    """
-
-    # Clear the text widget before updating
-    storage_text.delete(1.0, tk.END)
-    
-    #store the reverse order in this 
-    recent_list = []
-
-    #use this loop to save into a list then print the list out backwards
-    for itemID, product in storage_items.items():
-        
-        recent_list.append("\nitemID : "+itemID +"\nProduct: "+ storage_items[itemID] +"\nQuanity: "+quantity[itemID]+"\nFull Name: "+first_name[itemID]+" "+last_name[itemID]+ "\nPhone Number: "+phone_number[itemID]+ "\nEmail: "+email[itemID]+"\n")
-    
-    #use this to reverse the list
-    recent_list.reverse()
-    storage_text.insert(tk.END, "Most Recent Stored Storage:\n")
-
-    #use this for loop to print out the list
-    for itemID in recent_list:
-        storage_text.insert(tk.END, itemID)
-    
-    storage_text.insert(tk.END, "\n")
-
-# Function to display stored storage
-def show_items():
-
-    """
-    Display all stored items in the storage system.
-
-    Clears the text widget before updating.
-    Prints the details of each stored item, including itemID, product, quantity,
-    full name (concatenation of first and last names), phone number, and email address.
-
-    Example:
-    show_items()  # Displays all stored items in the storage system.
-
-    """
-
-    # Clear the text widget before updating
-    storage_text.delete(1.0, tk.END)
-    
-    # Display stored storage in the text widget
-    storage_text.insert(tk.END, "Stored storage:\n\n")
-    for itemID, product in storage_items.items():
-        storage_text.insert(tk.END, f"itemID: {itemID}\nProduct: {storage_items[itemID]}\nQuantity: {quantity[itemID]}\nFull Name: {first_name[itemID]} {last_name[itemID]}\nPhone Number: {phone_number[itemID]}\nEmail Address: {email[itemID]}\n\n")
-    storage_text.insert(tk.END, "\n")
-
-def finding_item(itemID):
-
-    """
-    Find and display details for a specific item in the storage system.
-
-    Clears the text widget before updating.
-    Validates that itemID contains only digits.
-    Searches for the item in the storage system based on itemID.
-    Displays the details of the found item if it exists, otherwise, displays a message.
-
-    Parameters:
-    - itemID (str or int): The unique identifier for the item to be found.
-
-    Example:
-    finding_item(42)  # Finds and displays details for the item with itemID 42.
-
-    """
-
-    # Clear the text widget before updating
-    storage_text.delete(1.0, tk.END)
-
-    # Check if itemID contains only digits
-    if not itemID.isdigit():
-        messagebox.showinfo("Invalid ItemID", "Please enter a valid integer for itemID.")
-        return
-
-    # Search through the dictionary
-    if itemID in storage_items:
-        storage_text.insert(tk.END, f"Item found:\n\nitemID: {itemID}\nProduct: {storage_items[itemID]}\nQuantity: {quantity[itemID]}\nFull Name: {first_name[itemID]} {last_name[itemID]}\nPhone Number: {phone_number[itemID]}\nEmail Address: {email[itemID]}\n\n")
-    else:
-        storage_text.insert(tk.END, f"Item not found for itemID: {itemID}")
-    storage_text.insert(tk.END, "\n")
-
-
-  
-def open_create_item_window():
-
-    """
-    Open a window for creating and adding a new item to the storage system.
-
-    Clears the text widget at the bottom.
-    Creates a new top-level window titled "Create Item" with entry widgets for itemID, product, quantity,
-    first name, last name, phone number, and email. Also, includes a submit button to add the new item.
-
-    Example:
-    open_create_item_window()  # Opens a window for creating and adding a new item to the storage system.
-
-    """
-
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-
-    # Function to open the Create Item window
-    create_item_window = tk.Toplevel(window)
-    create_item_window.title("Create Item")
-
-    # Set the window size to 400x200
-    create_item_window.geometry("400x500")
-
-    # Create entry widgets for itemID and product
-    label_itemID = tk.Label(create_item_window, text="itemID:", fg="blue")
-    entry_itemID = tk.Entry(create_item_window, fg="blue", width=30)
-    
-    label_product = tk.Label(create_item_window, text="Product Name:", fg="blue")
-    entry_product = tk.Entry(create_item_window, fg="blue", width=30)
-
-    label_quantity = tk.Label(create_item_window, text="Quantity:", fg="blue")
-    entry_quantity = tk.Entry(create_item_window, fg="blue", width=30)
-
-    # Create entry widgets for first and last name
-    label_first_name = tk.Label(create_item_window, text="First Name:", fg="blue")
-    entry_first_name = tk.Entry(create_item_window, fg="blue", width=30)
-    
-    label_last_name = tk.Label(create_item_window, text="Last Name:", fg="blue")
-    entry_last_name = tk.Entry(create_item_window, fg="blue", width=30)
-
-    # Create entry widgets for phone number and email
-    label_phone_number = tk.Label(create_item_window, text="Phone Number (xxx-xxx-xxxx):", fg="blue")
-    entry_phone_number = tk.Entry(create_item_window, fg="blue", width=30)
-    
-    label_email = tk.Label(create_item_window, text="Email:", fg="blue")
-    entry_email = tk.Entry(create_item_window, fg="blue", width=30)
-
-
-    # Create a Submit button
-    submit_button = tk.Button(create_item_window, text="Submit", command=lambda: add_item(entry_itemID.get(), entry_product.get(),entry_quantity.get(), entry_first_name.get(), entry_last_name.get(),entry_phone_number.get(),entry_email.get()))
-
-    # Pack the widgets
-    label_itemID.pack(pady=5)
-    entry_itemID.pack(pady=5)
-
-    label_product.pack(pady=5)
-    entry_product.pack(pady=5)
-
-    label_quantity.pack(pady=5)
-    entry_quantity.pack(pady=5)
-
-    label_first_name.pack(pady=5)
-    entry_first_name.pack(pady=5)
-
-    label_last_name.pack(pady=5)
-    entry_last_name.pack(pady=5)
-
-    label_phone_number.pack(pady=5)
-    entry_phone_number.pack(pady=5)
-
-    label_email.pack(pady=5)
-    entry_email.pack(pady=5)
-
-    submit_button.pack(pady=10)
-
-# Function to handle finding an item
-def find_item_window():
-
-    """
-    Open a window for finding details about a specific item in the storage system.
-
-    Clears the text widget at the bottom.
-    Creates a new top-level window titled "Find Item" with an entry widget for itemID and a submit button.
-    The submit button triggers the `finding_item` function to search and display details for the specified item.
-
-    Example:
-    find_item_window()  # Opens a window for finding details about a specific item in the storage system.
-
-    """
-
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-
-    # Create a Toplevel window for finding an item
-    find_item_window = tk.Toplevel(window)
-    find_item_window.title("Find Item")
-
-    # Set the window size to 300x100
-    find_item_window.geometry("300x100")
-
-    # Create an itemID widget for finding
-    label_itemID = tk.Label(find_item_window, text="ItemID:", fg="blue")
-    entry_itemID = tk.Entry(find_item_window)
-    label_itemID.pack()
-    entry_itemID.pack()
-
-    # Create a button to submit the item finding
-    submit_button = tk.Button(find_item_window, text="Submit", command=lambda: finding_item(entry_itemID.get()))
-    submit_button.pack()
-
-    # Function to handle finding an item
-def delete_items_window():
-
-    """
-    Open a window for deleting a specific item from the storage system.
-
-    Clears the text widget at the bottom.
-    Creates a new top-level window titled "Delete Item" with an entry widget for itemID and a submit button.
-    The submit button triggers the `delete_items` function to remove the specified item from the storage system.
-
-    Example:
-    delete_items_window()  # Opens a window for deleting a specific item from the storage system.
-
-    """
-
-    #clear the text box at the bottom
-    storage_text.delete(1.0, tk.END)
-
-    # Create a Toplevel window for finding an item
-    find_item_window = tk.Toplevel(window)
-    find_item_window.title("Delete Item")
-
-    # Set the window size to 300x100
-    find_item_window.geometry("300x100")
-
-    # Create an itemID widget for finding
-    label_itemID = tk.Label(find_item_window, text="ItemID:", fg="blue")
-    entry_itemID = tk.Entry(find_item_window)
-    label_itemID.pack()
-    entry_itemID.pack()
-
-    # Create a button to submit the item finding
-    submit_button = tk.Button(find_item_window, text="Submit", command=lambda: delete_items(entry_itemID.get()))
-    submit_button.pack()
-
-def main():
-    global storage_text  # Declare storage_text as a global variable
-    
-    window = tk.Tk()
-    # Set the window size to full screen
-    window.geometry(f"{window.winfo_screenwidth()}x{window.winfo_screenheight()}")
-    # Set the background color to light blue
-    window.configure(bg="steel blue")
-
-
-
-    # Increase the font size of the label text
-    font_settings = ("Script MT Bold", 30)  # Font family: Helvetica, Font size: 16
-    greeting = tk.Label(text="Storage Management", fg="white", bg="lightblue", width=20, height=3, font=font_settings,relief=tk.RIDGE,borderwidth=5, highlightthickness=2,)
-    greeting.pack()
-
-    # Load from ssv file button
-    load_items_button = tk.Button(
-        text="Load Previous Session",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=read_csv
-    )
-
-    # Pack the button to the top
-    load_items_button.pack(side=tk.TOP, pady=10)
-
-    # Account creation button
-    item_creation_button = tk.Button(
-        text="Create Item",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=open_create_item_window  # Set the command to open the Create Item window
-    )
-
-    # Pack the button to the top
-    item_creation_button.pack(side=tk.TOP, pady=10)
-
-    # Show storage button
-    show_item_button = tk.Button(
-        text="Show Storage",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=show_items  # Set the command option to the show_items function
-    )
-
-    # Pack the button to the Left side
-    show_item_button.pack(side=tk.TOP, pady=10)
-
-    # Show storage button
-    find_item_button = tk.Button(
-        text="Find Item",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=find_item_window
-    )
-
-    # Pack the button to the Left side
-    find_item_button.pack(side=tk.TOP, pady=10)
-
-    # Show storage button
-    delete_item_button = tk.Button(
-        text="Delete Item",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=delete_items_window
-    )
-
-    # Pack the button to the Left side
-    delete_item_button.pack(side=tk.TOP, pady=10)
-
-    # Show storage button
-    recent_item_button = tk.Button(
-        text="Most Recent Products",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=most_recent_items
-    )
-
-    # Pack the button to the Left side
-    recent_item_button.pack(side=tk.TOP, pady=10)
-
-
-    # save current session
-    save_session_button = tk.Button(
-        text="Save Current Session",
-        width=25,
-        height=1,
-        bg="navy",
-        fg="white",
-        font=("Script MT Bold", 13),
-        relief=tk.RIDGE,
-        borderwidth=5, 
-        highlightthickness=2,
-        command=write_csv
-    )
-
-    # Pack the button to the Left side
-    save_session_button.pack(side=tk.TOP, pady=10)
-
-
-
-    # Text widget to display storage
-    storage_text = tk.Text(window, height=10, width=60)
-    storage_text.pack(pady=10)
-
-    window.mainloop()
-
-if __name__ == "__main__":
-    main()
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import json
+import os
+import queue
+import threading
+import time
+
+from autosave import AUTOSAVE_INTERVAL, Autosaver
+from bulk_import import BulkImporter
+from csv_loader import CsvLoader
+from instrumentation import format_report, performance
+from movements import CHECK_IN, CHECK_OUT, SET_QUANTITY
+from paged_view import PagedView
+from snapshot import SnapshotLoader
+from text_renderer import TextRenderer
+from storage_core import LOW_STOCK_THRESHOLD, QUICK_SEARCH_LIMIT, StorageCore, StorageError, format_customer, format_record
+from validation import ValidationError
+
+
+storage_text = None # this is the window on the bottom of the app to display the texts
+output = None # the TextRenderer every function writes to storage_text through
+result_view = None # the paged table under the text box that shows stored items
+recent_count_box = None # the spinbox next to "Most Recent Products" holding how many items to show
+low_stock_box = None # the spinbox next to "Stock Report" holding the highest quantity that counts as low stock
+save_status = None # the label at the bottom showing when the storage was last saved
+quick_search_box = None # the Quick Search entry at the top, searched as the user types
+quick_search_pending = None # the `window.after` ID of the Quick Search waiting for the typing to pause
+quick_search_builder = None # the thread building the Quick Search's indexes, started by its first keystroke
+window = None # This is the window you're using
+
+# The storage system itself; every function below is a window around one of its operations.
+# It is opened in main(), so importing this module (as a bulk import's worker processes do)
+# opens no files.
+core = None
+
+loader = None # the CsvLoader of the load that is running, if any
+load_started = None # when the running load started, for the Performance window
+importer = None # the BulkImporter of the import that is running, if any
+autosaver = None # the Autosaver saving changes in the background, if autosave is on
+
+# How often the window checks on a running load, and how long each check may spend applying rows
+LOAD_POLL_MS = 50
+LOAD_APPLY_BUDGET = 0.03
+
+# Fields the Find Item window can search, as shown in the window -> store field name
+SEARCH_FIELDS = {
+    "ItemID": "itemID",
+    "Product": "product",
+    "First Name": "first_name",
+    "Last Name": "last_name",
+    "Phone Number": "phone_number",
+    "Email": "email",
+}
+
+# Ways the Find Customer window can look a customer up, as shown in the window -> lookup field
+CUSTOMER_LOOKUPS = {
+    "Email": "email",
+    "Phone Number": "phone_number",
+    "Name": "name",
+}
+
+# How often the save status at the bottom of the window is brought up to date
+SAVE_STATUS_MS = 1000
+
+# How often an open Performance window is brought up to date
+PERFORMANCE_REFRESH_MS = 1000
+
+# How long the Quick Search waits after a key for the next one, so fast typing searches once
+QUICK_SEARCH_DELAY_MS = 80
+
+# Most search results printed in the text box
+SEARCH_DISPLAY_LIMIT = 500
+
+# How many items "Most Recent Products" shows unless the user picks another number
+RECENT_ITEMS_COUNT = 10
+
+# Stock movements as shown in the Stock Movement window -> movement kind
+MOVEMENT_BUTTONS = {
+    "Check In": CHECK_IN,
+    "Check Out": CHECK_OUT,
+    "Set Quantity": SET_QUANTITY,
+}
+
+# How many products the stock report ranks
+STOCK_TOP_PRODUCTS = 10
+
+def delete_items(itemID):
+    """
+    Delete an item from the storage system.
+
+    Parameters:
+    - itemID (int): The unique identifier of the item to be deleted.
+
+    Clears the text box at the bottom and checks if the item exists in the storage system.
+    If the item exists, it is deleted along with associated information (quantity, first name, last name, phone number, email).
+    If the item does not exist, a message is displayed indicating that it is not in the system.
+
+    Displays a messagebox with information about the deletion or the non-existence of the item.
+
+    Example:
+    delete_items(42)  # Deletes the item with ID 42 from the storage system.
+
+    """
+    #clear the text box at the bottom
+    output.clear()
+
+    #check to see if it exists and if not to send a message that it does not exist
+    try:
+        core.delete_item(itemID)
+    except StorageError as error:
+        #send a message and say that it does not exist
+        messagebox.showinfo(error.title, error.message)
+        return
+
+    result_view.refresh_later()
+
+    #send a message and say that it was deleted
+    messagebox.showinfo("Item Deleted", f"Item {itemID} has been deleted.")
+
+
+#use this to read the csv file
+def read_csv():
+
+    """
+    Read data from a CSV file and update the storage system without freezing the window.
+
+    Clears the text box at the bottom and starts a CsvLoader that reads 'ProjectStorage.csv'
+    in the background, chunk by chunk, then replays the saved journal on top of it. The window picks up the chunks through `poll_load`,
+    so the items show up in the store while the file is still being read.
+    If 'ProjectStorage.snapshot' was saved with the CSV as it is now (see `save_snapshot`), the
+    snapshot is read instead: the table shows its items straight away, decoded from the
+    memory-mapped file a page at a time, while a SnapshotLoader fills the store behind it.
+    The load can be stopped part way through with `cancel_load`. With the sqlite backend
+    (STORAGE_BACKEND=sqlite) the items are already in the database and are just shown.
+
+    Updates:
+    - store (one row per itemID; an itemID already in the store is overwritten)
+
+    Displays a messagebox to notify the user once the storage has been updated.
+
+    Example:
+    read_csv()  # Starts reading 'ProjectStorage.csv' into the storage system.
+
+    """
+    global loader, load_started
+
+    # only one load or import at a time
+    if loader is not None or importer is not None:
+        messagebox.showinfo("Storage Notification", "Storage is already being loaded.")
+        return
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # the sqlite backend reads items from its database as they are needed, so there is nothing to load
+    if core.load_on_demand:
+        show_items()
+        messagebox.showinfo("Storage Notification", "Storage has been updated.")
+        return
+
+    output.write("Loading storage...\n")
+
+    # read the file on a background thread and check on it from the Tk mainloop
+    snapshot = core.open_snapshot()
+    if snapshot is not None:
+        result_view.show("Stored storage", lambda: len(snapshot), snapshot.page)
+        loader = SnapshotLoader(snapshot)
+    else:
+        loader = CsvLoader(core.path)
+    # a background save may be compacting the journal into the CSV; let it finish before reading
+    core.wait_for_save()
+    load_started = time.perf_counter()
+    loader.start()
+    window.after(LOAD_POLL_MS, poll_load)
+
+def poll_load():
+
+    """
+    Apply the rows a running CsvLoader has read so far and show its progress.
+
+    Runs on the Tk thread through `window.after`. Each call applies chunks for at most
+    LOAD_APPLY_BUDGET seconds so the window keeps responding, then reschedules itself
+    until the loader sends its end marker.
+
+    """
+    global loader
+
+    deadline = time.perf_counter() + LOAD_APPLY_BUDGET
+    finished = False
+    while time.perf_counter() < deadline:
+        try:
+            chunk = loader.chunks.get_nowait()
+        except queue.Empty:
+            break
+        if chunk is None:
+            finished = True
+            break
+        # chunks still queued when the user cancels are thrown away
+        if not loader.cancelled:
+            core.put_loaded(chunk)
+
+    if not finished:
+        # show the progress and check again shortly
+        output.show(f"Loading storage... {loader.progress():.0%} ({loader.rows_read} items read)\n")
+        window.after(LOAD_POLL_MS, poll_load)
+        return
+
+    finished_loader, loader = loader, None
+    output.clear()
+    if isinstance(finished_loader, SnapshotLoader):
+        read_bytes = os.path.getsize(finished_loader.snapshot.path)
+    else:
+        read_bytes = finished_loader.bytes_read
+    performance.record("read_csv", time.perf_counter() - load_started, finished_loader.rows_read, read_bytes, finished_loader.error is not None)
+    if isinstance(finished_loader, SnapshotLoader):
+        # the table was showing the snapshot itself; switch it over to the store
+        show_items()
+        finished_loader.snapshot.close()
+    else:
+        result_view.refresh()
+
+    #let user know how the load went
+    if finished_loader.error is not None:
+        messagebox.showinfo("Storage Notification", f"Storage could not be loaded: {finished_loader.error}")
+    elif not finished_loader.cancelled:
+        # the journal holds the changes saved since the CSV was last compacted
+        core.replay_journal()
+        messagebox.showinfo("Storage Notification", "Storage has been uploaded.")
+    else:
+        messagebox.showinfo("Storage Notification", f"Loading was cancelled. {len(core)} items are in the system.")
+
+def cancel_load():
+
+    """
+    Stop the load started by `read_csv` or the import started by `bulk_import`.
+
+    Items a load already applied stay in the storage system; a cancelled import adds nothing.
+
+    """
+
+    if loader is None and importer is None:
+        messagebox.showinfo("Storage Notification", "No storage is being loaded.")
+        return
+    if loader is not None:
+        loader.cancel()
+    if importer is not None:
+        importer.cancel()
+
+def bulk_import(paths=None):
+
+    """
+    Import one or more CSV files into the storage system in bulk.
+
+    Asks for the files if none are given, then starts a BulkImporter that reads and validates
+    every row in the background, in batches. Rows with a problem or an itemID that is already
+    in use are written to the rejects file instead of popping a messagebox each. Once every
+    file is read, `poll_import` adds all the valid rows in one go and shows a single summary.
+
+    Parameters:
+    - paths (list): The CSV files to import.
+
+    Example:
+    bulk_import(['site1.csv', 'site2.csv'])  # Imports both files and shows one summary.
+
+    """
+    global importer
+
+    # only one load or import at a time
+    if loader is not None or importer is not None:
+        messagebox.showinfo("Storage Notification", "Storage is already being loaded.")
+        return
+
+    if paths is None:
+        paths = filedialog.askopenfilenames(title="Bulk Import", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not paths:
+        return
+
+    #clear the text box at the bottom
+    output.clear()
+    output.write(f"Importing {len(paths)} file(s)...\n")
+
+    importer = BulkImporter(paths, core.__contains__)
+    importer.start()
+    window.after(LOAD_POLL_MS, poll_import)
+
+def poll_import():
+
+    """
+    Show the progress of a running BulkImporter and commit it once it is done.
+
+    Runs on the Tk thread through `window.after`, so the rows are added to the store on the
+    same thread as every other change.
+
+    """
+    global importer
+
+    if not importer.finished.is_set():
+        output.show(f"Importing... {importer.rows_read} rows checked, {importer.rejected} rejected ({importer.files_done} of {len(importer.paths)} files)\n")
+        window.after(LOAD_POLL_MS, poll_import)
+        return
+
+    finished_importer, importer = importer, None
+    output.clear()
+
+    if finished_importer.error is not None:
+        messagebox.showinfo("Import Summary", f"Import failed, nothing was added: {finished_importer.error}")
+        return
+    if finished_importer.cancelled:
+        messagebox.showinfo("Import Summary", "Import was cancelled, nothing was added.")
+        return
+
+    # all valid rows go in together
+    core.commit_import(finished_importer)
+    result_view.refresh()
+    output.write(finished_importer.summary() + "\n")
+    messagebox.showinfo("Import Summary", finished_importer.summary())
+
+#use this to read the csv file
+def write_csv():
+
+    """
+    Save the changes made in this session.
+
+    Clears the text box at the bottom and appends the adds and deletes recorded since the last
+    save to the journal file ('ProjectStorage.csv.journal'), so a save only costs as much as the
+    number of changes. Once the journal gets long it is compacted: merged with
+    'ProjectStorage.csv' into a temp file that then replaces the CSV in one step.
+    Nothing is written when there are no unsaved changes. The Autosaver does the same in the
+    background, so this only saves what it has not got to yet.
+
+    Displays a messagebox to notify the user that the storage has been updated.
+
+    Example:
+    write_csv()  # Saves the current storage system changes.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # write only what changed, and fold the journal into the CSV when it has grown
+    try:
+        saved = core.save(compact=loader is None)
+    except OSError as error:
+        messagebox.showinfo("Storage Notification", f"Storage could not be saved: {error}")
+        return
+    show_save_status()
+
+    #let user know that the storage has been updated
+    if saved:
+        messagebox.showinfo("Storage Notification", "Storage has been updated.")
+    else:
+        messagebox.showinfo("Storage Notification", "Storage is already up to date.")
+
+def show_error(error):
+
+    """
+    Show why text worked out in the background could not be, e.g. a search by an invalid value.
+
+    Called by the TextRenderer for every failed `submit`.
+
+    Parameters:
+    - error (Exception): What went wrong; a ValidationError or StorageError carries its title and message.
+
+    """
+
+    if isinstance(error, (ValidationError, StorageError)):
+        messagebox.showinfo(error.title, error.message)
+    else:
+        messagebox.showinfo("Storage Notification", f"Something went wrong: {error}")
+
+def show_save_status():
+
+    """
+    Show when the storage was last saved in the label at the bottom of the window.
+
+    Only reads the figures the core and the Autosaver keep, so it never waits on a save that
+    is running. Also says how many changes are waiting and whether the last autosave failed.
+
+    """
+
+    if core.last_saved is None:
+        text = "Not saved yet"
+    else:
+        text = "Last saved " + time.strftime("%H:%M:%S", time.localtime(core.last_saved))
+    if core.unsaved_changes:
+        text += f" - {core.unsaved_changes} unsaved changes"
+    if autosaver is not None and autosaver.error is not None:
+        text += f" - autosave failed: {autosaver.error}"
+    save_status.config(text=text)
+
+def poll_save_status():
+
+    """Bring the save status up to date every SAVE_STATUS_MS, through `window.after`."""
+
+    show_save_status()
+    window.after(SAVE_STATUS_MS, poll_save_status)
+
+def close_window():
+
+    """
+    Save and close the window.
+
+    Stops a running load, lets the Autosaver save whatever is left (or saves straight away
+    when autosave is off), then destroys the window. If the save fails the user is asked
+    whether to close anyway.
+
+    """
+
+    if loader is not None:
+        loader.cancel()
+    try:
+        if autosaver is not None:
+            autosaver.stop()
+            if autosaver.error is not None:
+                raise autosaver.error
+        else:
+            core.save(compact=loader is None)
+    except OSError as error:
+        if not messagebox.askyesno("Storage Notification", f"Storage could not be saved: {error}\nClose anyway?"):
+            return
+    output.close()
+    window.destroy()
+
+def save_snapshot():
+
+    """
+    Save the current session and write it to 'ProjectStorage.snapshot'.
+
+    Clears the text box at the bottom, saves like `write_csv` and folds the journal into the
+    CSV, then writes every item to the binary snapshot: fixed-width columns and a table of
+    distinct strings, which the next "Load Previous Session" maps into memory instead of
+    parsing the CSV.
+
+    Displays a messagebox to notify the user that the snapshot has been saved.
+
+    Example:
+    save_snapshot()  # Saves the session and a snapshot of it.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    if loader is not None or importer is not None:
+        messagebox.showinfo("Storage Notification", "Wait for the running load to finish before saving a snapshot.")
+        return
+
+    try:
+        count = core.save_snapshot()
+    except OSError as error:
+        messagebox.showinfo("Storage Notification", f"Snapshot could not be saved: {error}")
+        return
+
+    #let user know that the snapshot has been saved
+    messagebox.showinfo("Storage Notification", f"Snapshot of {count} items has been saved.")
+
+def add_item(itemID, product,Quantity,FirstName,LastName,PhoneNumber,Email):
+
+    """
+    Add an item to the storage system.
+
+    Clears the text box at the bottom and performs validation checks on input parameters.
+    Checks for completeness, validity of itemID, quantity, first and last names, product name, email,
+    and phone number through `validation.validate_item`, whose patterns are compiled once.
+    Ensures itemID is unique and not already in use.
+    Displays appropriate messages in case of validation errors.
+
+    Parameters:
+    - itemID (str or int): The unique identifier for the item.
+    - product (str): The product name.
+    - Quantity (str): The quantity of the item.
+    - FirstName (str): The first name associated with the item.
+    - LastName (str): The last name associated with the item.
+    - PhoneNumber (str): The phone number associated with the item (in xxx-xxx-xxxx format).
+    - Email (str): The email address associated with the item.
+
+    Example:
+    add_item(123, "Laptop", "5", "John", "Doe", "123-456-7890", "john.doe@example.com")
+    # Adds an item with the specified details to the storage system.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # Check every field in one pass and add the item; the first problem found is shown to the user
+    try:
+        core.add_item(itemID, product, Quantity, FirstName, LastName, PhoneNumber, Email)
+    except (ValidationError, StorageError) as error:
+        messagebox.showinfo(error.title, error.message)
+        return
+    result_view.refresh_later()
+
+    # Display message to the user
+    messagebox.showinfo("Item Added", f"Item {itemID} has been added successfully.")
+
+
+# Function to show the most recent items
+def move_stock(itemID, kind, amount):
+
+    """
+    Check stock in or out of an item, or set its quantity.
+
+    Clears the text box at the bottom and applies the movement through `StorageCore.move_stock`,
+    which changes the quantity in place: the item keeps its other fields and its place among
+    the most recent items, and the movement is logged for the next save. The new quantity is
+    printed in the text box; a messagebox only shows up when the movement cannot be made.
+
+    Parameters:
+    - itemID (str): The unique identifier of the item.
+    - kind (str): CHECK_IN, CHECK_OUT or SET_QUANTITY.
+    - amount (str): The units to check in or out, or the new quantity.
+
+    Example:
+    move_stock("42", CHECK_OUT, "3")  # Takes 3 units of item 42 out of stock.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    try:
+        quantity = core.move_stock([(itemID, kind, amount)])[0]
+    except (ValidationError, StorageError) as error:
+        messagebox.showinfo(error.title, error.message)
+        return
+
+    result_view.refresh_later()
+    output.write(f"Item {itemID.strip()} now has {quantity} units.\n")
+
+def most_recent_items(count=None):
+
+    """
+    Display the most recently added items in the storage system.
+
+    Clears the text widget before updating.
+    Shows the newest `count` items in the result table, newest first. They are walked from the
+    store's recency index, so this takes O(count) time however many items are stored.
+
+    Parameters:
+    - count (int): How many items to show. Defaults to the number in the spinbox next to the button.
+
+    Displays:
+    - itemID
+    - Product
+    - Quantity
+    - Full Name (concatenation of first and last names)
+    - Phone Number
+    - Email
+
+    Example:
+    most_recent_items(5)  # Displays the five most recently added items in the storage system.
+
+    """
+
+    # Clear the text widget before updating
+    output.clear()
+
+    # read how many items to show from the spinbox
+    if count is None:
+        text = recent_count_box.get().strip()
+        if not text.isdigit() or int(text) == 0:
+            messagebox.showinfo("Invalid Count", "Please enter how many recent items to show.")
+            return
+        count = int(text)
+
+    output.write(f"Most Recent Stored Storage: the newest {min(count, len(core))} of {len(core)} items.\n")
+
+    # the table pulls each page from the newest items only
+    result_view.show("Most Recent Stored Storage", lambda: min(count, len(core)), lambda start, rows: core.most_recent(min(count, start + rows))[start:])
+
+# Function to display stored storage
+def show_items():
+
+    """
+    Display all stored items in the storage system.
+
+    Clears the text widget before updating.
+    Shows the stored items in the result table, including itemID, product, quantity,
+    full name (concatenation of first and last names), phone number, and email address.
+    Only the rows in view are fetched from the store; scrolling and the page controls fetch more.
+
+    Example:
+    show_items()  # Displays all stored items in the storage system.
+
+    """
+
+    # Clear the text widget before updating
+    output.show(f"Stored storage: {len(core)} items.\n")
+
+    # Display stored storage in the table, one page at a time
+    with performance.measure("show_items"):
+        result_view.show("Stored storage", lambda: len(core), core.page)
+
+def stock_report(threshold=None):
+
+    """
+    Display the stock on hand.
+
+    Clears the text box at the bottom and prints the total units and items, the products with
+    the most units and the units and items of every product. The items with at most
+    `threshold` units are shown in the result table. The totals come from
+    `StorageCore.stock_report`, which keeps per-product sums up to date as items change, so
+    the report does not re-read every item.
+
+    Parameters:
+    - threshold (int): The highest quantity that counts as low stock. Defaults to the number in the spinbox next to the button.
+
+    Example:
+    stock_report(3)  # Shows the stock report with every item that has 3 units or fewer.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # read the low stock threshold from the spinbox
+    if threshold is None:
+        text = low_stock_box.get().strip()
+        if not text.isdigit():
+            messagebox.showinfo("Invalid Threshold", "Please enter the quantity that counts as low stock.")
+            return
+        threshold = int(text)
+
+    def report_text():
+        # runs on the render thread: the report and its text
+        report = core.stock_report(STOCK_TOP_PRODUCTS, threshold)
+        lines = [f"Stock Report: {report['total_units']} units in {report['items']} items of {len(report['products'])} products.",
+                 f"Low stock (quantity {threshold} or less): {len(report['low_stock'])} items.", "",
+                 f"Top {len(report['top_products'])} products by units:"]
+        lines += [f"  {total.product}: {total.units} units in {total.items} items" for total in report["top_products"]]
+        lines += ["", "Every product:"]
+        lines += [f"  {total.product}: {total.units} units in {total.items} items" for total in report["products"]]
+        return "\n".join(lines) + "\n", report["low_stock"]
+
+    def show_low_stock(low_stock):
+        # the table pages through the low stock items only; items deleted since the report was
+        # made are dropped when the table is refreshed after the number of items changed
+        stored = len(core)
+
+        def count():
+            nonlocal stored
+            if len(core) != stored:
+                stored = len(core)
+                low_stock[:] = [itemID for itemID in low_stock if itemID in core]
+            return len(low_stock)
+
+        result_view.show(f"Low Stock (quantity {threshold} or less)", count,
+                         lambda start, rows: core.records_for(low_stock[start:start + rows]))
+
+    output.submit(report_text, show_low_stock)
+
+def finding_item(itemID):
+
+    """
+    Find and display details for a specific item in the storage system.
+
+    Clears the text widget before updating.
+    Validates that itemID contains only digits.
+    Searches for the item in the storage system based on itemID.
+    Displays the details of the found item if it exists, otherwise, displays a message.
+
+    Parameters:
+    - itemID (str or int): The unique identifier for the item to be found.
+
+    Example:
+    finding_item(42)  # Finds and displays details for the item with itemID 42.
+
+    """
+
+    # Clear the text widget before updating
+    output.clear()
+
+    def item_text():
+        # runs on the render thread; an itemID that is not all digits is shown as an error
+        try:
+            return "Item found:\n\n" + format_record(core.find_item(itemID)) + "\n\n"
+        except StorageError as error:
+            return error.message + "\n"
+
+    output.submit(item_text)
+
+def search_items(field, value, prefix=False):
+
+    """
+    Find and display every item whose field matches a value.
+
+    Clears the text widget before updating.
+    Looks the value up in the store's secondary indexes (ignoring case), so the search does
+    not have to go through every item. With prefix set, every value starting with the text
+    matches, e.g. "Jo" finds Jones and Johnson. Only the first SEARCH_DISPLAY_LIMIT
+    matches are printed; they are looked up and formatted on the text box's render thread.
+
+    Parameters:
+    - field (str): The field to search, one of the keys of SEARCH_FIELDS (e.g. "Last Name").
+    - value (str): The text to look for.
+    - prefix (bool): Whether to match values that start with the text.
+
+    Example:
+    search_items("Email", "john@gmail.com")  # Displays the items stored under that email.
+
+    """
+
+    # Clear the text widget before updating
+    output.clear()
+
+    # ItemIDs keep their own exact lookup
+    if field == "ItemID" and not prefix:
+        finding_item(value)
+        return
+
+    if not value:
+        messagebox.showinfo("Incomplete Information", "Please enter something to search for.")
+        return
+
+    def results_text():
+        # runs on the render thread; a search that cannot be done is shown as an error
+        total, records = core.search(SEARCH_FIELDS[field], value, prefix, SEARCH_DISPLAY_LIMIT)
+        if not total:
+            return f"No items found for {field}: {value}\n"
+        lines = [f"Items found: {total}", ""]
+        lines += [format_record(record) for record in records]
+        if total > SEARCH_DISPLAY_LIMIT:
+            lines.append(f"...and {total - SEARCH_DISPLAY_LIMIT} more.")
+        return "\n".join(lines) + "\n"
+
+    output.submit(results_text)
+
+
+  
+def quick_search_typed(event=None):
+
+    """
+    Run the Quick Search once the user stops typing for QUICK_SEARCH_DELAY_MS.
+
+    Bound to every key released in the Quick Search box; each key puts the search off again,
+    so a burst of typing searches once, for the whole text. The first key starts building
+    the Quick Search's indexes on a worker thread, so they only take memory once the Quick
+    Search is used, and are mostly built by the time the typing pauses.
+
+    """
+    global quick_search_pending, quick_search_builder
+
+    if not core.quick_search_ready and (quick_search_builder is None or not quick_search_builder.is_alive()):
+        quick_search_builder = threading.Thread(target=core.prepare_quick_search, name="prepare-quick-search", daemon=True)
+        quick_search_builder.start()
+    if quick_search_pending is not None:
+        window.after_cancel(quick_search_pending)
+    quick_search_pending = window.after(QUICK_SEARCH_DELAY_MS, quick_search)
+
+def quick_search():
+
+    """
+    Display the items that best match the text in the Quick Search box.
+
+    The search runs on the text box's render thread (see TextRenderer.submit), so typing
+    never waits for it, and results overtaken by newer typing are never drawn.
+    Looks through products, first names, last names and emails at once, ignoring case: items
+    containing the text come first (exact values, then values starting with it), followed by
+    items that only look like it, so a typo such as "Lebowksi" still finds Lebowski. The
+    matches come from the store's trigram indexes, so each search stays quick however many
+    items are stored. The best QUICK_SEARCH_LIMIT items are shown in the result table.
+
+    Example:
+    quick_search()  # Displays the best matches of what is typed in the Quick Search box.
+
+    """
+    global quick_search_pending
+
+    quick_search_pending = None
+    text = quick_search_box.get().strip()
+
+    # the last results stay up until the new ones are drawn in their place
+    if not text:
+        output.clear()
+        return
+
+    def matches_text():
+        # runs on the render thread, so the window keeps taking keys while it searches
+        started = time.perf_counter()
+        records = core.quick_search(text, QUICK_SEARCH_LIMIT)
+        seconds = time.perf_counter() - started
+        if not records:
+            return f"No items match: {text}\n", records
+        return f"Best matches for {text}: {len(records)} ({seconds * 1000:.1f} ms)\n", records
+
+    output.submit(matches_text, lambda records: result_view.show(f"Quick Search: {text}", lambda: len(records), lambda start, rows: records[start:start + rows]))
+
+def customer_items(field, value):
+
+    """
+    Find customers and display what each of them has in storage.
+
+    Clears the text widget before updating.
+    Prints every matching customer with their number of items and total quantity, and shows
+    all of their items in the result table. The items come from the store's customer -> items
+    table (see `StorageCore.find_customers`), so the lookup does not go through every item.
+
+    Parameters:
+    - field (str): How to look the customer up, one of the keys of CUSTOMER_LOOKUPS (e.g. "Email").
+    - value (str): The email, phone number or name to look for. A name can be "First Last" or just one of them.
+
+    Example:
+    customer_items("Email", "john@gmail.com")  # Displays the customer and every item stored under that email.
+
+    """
+
+    # Clear the text widget before updating
+    output.clear()
+
+    def customers_text():
+        # runs on the render thread; a lookup that cannot be done is shown as an error
+        found = core.find_customers(CUSTOMER_LOOKUPS[field], value)
+        if not found:
+            return f"No customers found for {field}: {value.strip()}\n", None
+        lines = [f"Customers found: {len(found)}", ""]
+        lines += [format_customer(customer) for customer in found]
+        return "\n".join(lines) + "\n", [record for customer in found for record in customer.records]
+
+    def show_records(records):
+        # the table pages through the items of every customer found
+        if records is not None:
+            result_view.show(f"Items of {field}: {value.strip()}", lambda: len(records), lambda start, rows: records[start:start + rows])
+
+    output.submit(customers_text, show_records)
+
+def open_create_item_window():
+
+    """
+    Open a window for creating and adding a new item to the storage system.
+
+    Clears the text widget at the bottom.
+    Creates a new top-level window titled "Create Item" with entry widgets for itemID, product, quantity,
+    first name, last name, phone number, and email. Also, includes a submit button to add the new item.
+
+    Example:
+    open_create_item_window()  # Opens a window for creating and adding a new item to the storage system.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # Function to open the Create Item window
+    create_item_window = tk.Toplevel(window)
+    create_item_window.title("Create Item")
+
+    # Set the window size to 400x200
+    create_item_window.geometry("400x500")
+
+    # Create entry widgets for itemID and product
+    label_itemID = tk.Label(create_item_window, text="itemID:", fg="blue")
+    entry_itemID = tk.Entry(create_item_window, fg="blue", width=30)
+    
+    label_product = tk.Label(create_item_window, text="Product Name:", fg="blue")
+    entry_product = tk.Entry(create_item_window, fg="blue", width=30)
+
+    label_quantity = tk.Label(create_item_window, text="Quantity:", fg="blue")
+    entry_quantity = tk.Entry(create_item_window, fg="blue", width=30)
+
+    # Create entry widgets for first and last name
+    label_first_name = tk.Label(create_item_window, text="First Name:", fg="blue")
+    entry_first_name = tk.Entry(create_item_window, fg="blue", width=30)
+    
+    label_last_name = tk.Label(create_item_window, text="Last Name:", fg="blue")
+    entry_last_name = tk.Entry(create_item_window, fg="blue", width=30)
+
+    # Create entry widgets for phone number and email
+    label_phone_number = tk.Label(create_item_window, text="Phone Number (xxx-xxx-xxxx):", fg="blue")
+    entry_phone_number = tk.Entry(create_item_window, fg="blue", width=30)
+    
+    label_email = tk.Label(create_item_window, text="Email:", fg="blue")
+    entry_email = tk.Entry(create_item_window, fg="blue", width=30)
+
+
+    # Create a Submit button
+    submit_button = tk.Button(create_item_window, text="Submit", command=lambda: add_item(entry_itemID.get(), entry_product.get(),entry_quantity.get(), entry_first_name.get(), entry_last_name.get(),entry_phone_number.get(),entry_email.get()))
+
+    # Pack the widgets
+    label_itemID.pack(pady=5)
+    entry_itemID.pack(pady=5)
+
+    label_product.pack(pady=5)
+    entry_product.pack(pady=5)
+
+    label_quantity.pack(pady=5)
+    entry_quantity.pack(pady=5)
+
+    label_first_name.pack(pady=5)
+    entry_first_name.pack(pady=5)
+
+    label_last_name.pack(pady=5)
+    entry_last_name.pack(pady=5)
+
+    label_phone_number.pack(pady=5)
+    entry_phone_number.pack(pady=5)
+
+    label_email.pack(pady=5)
+    entry_email.pack(pady=5)
+
+    submit_button.pack(pady=10)
+
+# Function to handle finding an item
+def find_item_window():
+
+    """
+    Open a window for finding items in the storage system.
+
+    Clears the text widget at the bottom.
+    Creates a new top-level window titled "Find Item" with a menu to pick the field to search
+    (itemID, product, first or last name, phone number or email), an entry widget for the value,
+    a "Starts with" checkbox for prefix searches, and a submit button.
+    The submit button triggers the `search_items` function to search and display the matching items.
+
+    Example:
+    find_item_window()  # Opens a window for finding details about a specific item in the storage system.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # Create a Toplevel window for finding an item
+    find_item_window = tk.Toplevel(window)
+    find_item_window.title("Find Item")
+
+    # Set the window size to 300x170
+    find_item_window.geometry("300x170")
+
+    # Create a menu to pick the field to search by
+    label_field = tk.Label(find_item_window, text="Search by:", fg="blue")
+    selected_field = tk.StringVar(find_item_window, value="ItemID")
+    menu_field = tk.OptionMenu(find_item_window, selected_field, *SEARCH_FIELDS)
+    label_field.pack()
+    menu_field.pack()
+
+    # Create a value widget for finding
+    entry_value = tk.Entry(find_item_window)
+    entry_value.pack()
+
+    # Create a checkbox for prefix searches
+    starts_with = tk.BooleanVar(find_item_window, value=False)
+    check_prefix = tk.Checkbutton(find_item_window, text="Starts with", variable=starts_with)
+    check_prefix.pack()
+
+    # Create a button to submit the item finding
+    submit_button = tk.Button(find_item_window, text="Submit", command=lambda: search_items(selected_field.get(), entry_value.get(), starts_with.get()))
+    submit_button.pack()
+
+    # Function to handle finding an item
+def find_customer_window():
+
+    """
+    Open a window for looking up a customer.
+
+    Clears the text widget at the bottom.
+    Creates a new top-level window titled "Find Customer" with a menu to pick what to look the
+    customer up by (email, phone number or name), an entry widget for the value and a submit button.
+    The submit button triggers the `customer_items` function to display the customer's items and totals.
+
+    Example:
+    find_customer_window()  # Opens a window for looking up a customer's items.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # Create a Toplevel window for finding a customer
+    find_customer_window = tk.Toplevel(window)
+    find_customer_window.title("Find Customer")
+
+    # Set the window size to 300x140
+    find_customer_window.geometry("300x140")
+
+    # Create a menu to pick what to look the customer up by
+    label_field = tk.Label(find_customer_window, text="Look up by:", fg="blue")
+    selected_field = tk.StringVar(find_customer_window, value="Email")
+    menu_field = tk.OptionMenu(find_customer_window, selected_field, *CUSTOMER_LOOKUPS)
+    label_field.pack()
+    menu_field.pack()
+
+    # Create a value widget for the lookup
+    entry_value = tk.Entry(find_customer_window)
+    entry_value.pack()
+
+    # Create a button to submit the lookup
+    submit_button = tk.Button(find_customer_window, text="Submit", command=lambda: customer_items(selected_field.get(), entry_value.get()))
+    submit_button.pack()
+
+def delete_items_window():
+
+    """
+    Open a window for deleting a specific item from the storage system.
+
+    Clears the text widget at the bottom.
+    Creates a new top-level window titled "Delete Item" with an entry widget for itemID and a submit button.
+    The submit button triggers the `delete_items` function to remove the specified item from the storage system.
+
+    Example:
+    delete_items_window()  # Opens a window for deleting a specific item from the storage system.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # Create a Toplevel window for finding an item
+    find_item_window = tk.Toplevel(window)
+    find_item_window.title("Delete Item")
+
+    # Set the window size to 300x100
+    find_item_window.geometry("300x100")
+
+    # Create an itemID widget for finding
+    label_itemID = tk.Label(find_item_window, text="ItemID:", fg="blue")
+    entry_itemID = tk.Entry(find_item_window)
+    label_itemID.pack()
+    entry_itemID.pack()
+
+    # Create a button to submit the item finding
+    submit_button = tk.Button(find_item_window, text="Submit", command=lambda: delete_items(entry_itemID.get()))
+    submit_button.pack()
+
+def stock_movement_window():
+
+    """
+    Open a window for moving stock in and out of an item.
+
+    Clears the text widget at the bottom.
+    Creates a new top-level window titled "Stock Movement" with entry widgets for itemID and
+    the number of units, and one button per movement (Check In, Check Out, Set Quantity).
+    Each button triggers the `move_stock` function. The window stays open so many movements
+    can be entered one after the other.
+
+    Example:
+    stock_movement_window()  # Opens a window for checking stock in and out.
+
+    """
+
+    #clear the text box at the bottom
+    output.clear()
+
+    # Create a Toplevel window for stock movements
+    movement_window = tk.Toplevel(window)
+    movement_window.title("Stock Movement")
+
+    # Set the window size to 300x200
+    movement_window.geometry("300x200")
+
+    # Create entry widgets for itemID and units
+    label_itemID = tk.Label(movement_window, text="ItemID:", fg="blue")
+    entry_itemID = tk.Entry(movement_window)
+    label_itemID.pack()
+    entry_itemID.pack()
+
+    label_amount = tk.Label(movement_window, text="Units:", fg="blue")
+    entry_amount = tk.Entry(movement_window)
+    label_amount.pack()
+    entry_amount.pack()
+
+    # Create a button for every movement
+    for text, kind in MOVEMENT_BUTTONS.items():
+        movement_button = tk.Button(movement_window, text=text, command=lambda kind=kind: move_stock(entry_itemID.get(), kind, entry_amount.get()))
+        movement_button.pack(pady=2)
+
+def performance_window():
+
+    """
+    Open the Performance window: live timings of the storage operations.
+
+    Shows the call count, errors, mean, p50, p99 and slowest latency, and the rows and bytes
+    processed of every operation the app has measured (loading, saving, showing the storage,
+    validating and adding items, searches and lookups), refreshed every
+    PERFORMANCE_REFRESH_MS. Recording starts off unless STORAGE_PERF=1 was set; the
+    checkbox turns it on and off. "Profile Next Action" runs the next operation under
+    cProfile and shows its busiest functions, and "Save as JSON" writes the same figures
+    the command line prints with --perf.
+
+    """
+
+    perf_window = tk.Toplevel(window)
+    perf_window.title("Performance")
+
+    recording = tk.BooleanVar(value=performance.enabled)
+    controls = tk.Frame(perf_window)
+    controls.pack(pady=5)
+    tk.Checkbutton(controls, text="Record timings", variable=recording,
+                   command=lambda: performance.enable() if recording.get() else performance.disable()).pack(side=tk.LEFT)
+    tk.Button(controls, text="Reset", command=lambda: performance.reset() or refresh(False)).pack(side=tk.LEFT, padx=5)
+    tk.Button(controls, text="Profile Next Action", command=lambda: performance.profile_next() or recording.set(True)).pack(side=tk.LEFT, padx=5)
+    tk.Button(controls, text="Save as JSON", command=save_performance_report).pack(side=tk.LEFT, padx=5)
+
+    perf_text = tk.Text(perf_window, height=30, width=110, font=("Courier", 10))
+    perf_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    def refresh(again=True):
+        # the window may have been closed since the last refresh
+        if not perf_window.winfo_exists():
+            return
+        report = performance.snapshot()
+        text = format_report(report)
+        if performance.profile_armed:
+            text += "\nThe next action will be profiled.\n"
+        profile = report["last_profile"]
+        if profile is not None:
+            text += f"\nProfile of {profile['operation']} ({profile['seconds'] * 1000:.1f} ms):\n{profile['report']}"
+        perf_text.delete(1.0, tk.END)
+        perf_text.insert(tk.END, text)
+        if again:
+            perf_window.after(PERFORMANCE_REFRESH_MS, refresh)
+
+    refresh()
+
+def save_performance_report():
+
+    """Ask for a file and write the Performance window's figures to it as JSON."""
+
+    path = filedialog.asksaveasfilename(title="Save performance figures", defaultextension=".json", filetypes=[("JSON files", "*.json")])
+    if not path:
+        return
+    try:
+        with open(path, 'w') as file:
+            json.dump(performance.snapshot(), file, indent=2)
+    except OSError as error:
+        messagebox.showinfo("Performance", f"The figures could not be saved: {error}")
+
+def main():
+    global storage_text, output, window, result_view, recent_count_box, low_stock_box, save_status, autosaver, quick_search_box  # Declare the widgets the functions use as global variables
+    global core
+
+    core = StorageCore('ProjectStorage.csv')
+
+    window = tk.Tk()
+    # Set the window size to full screen
+    window.geometry(f"{window.winfo_screenwidth()}x{window.winfo_screenheight()}")
+    # Set the background color to light blue
+    window.configure(bg="steel blue")
+
+
+
+    # Increase the font size of the label text
+    font_settings = ("Script MT Bold", 30)  # Font family: Helvetica, Font size: 16
+    greeting = tk.Label(text="Storage Management", fg="white", bg="lightblue", width=20, height=3, font=font_settings,relief=tk.RIDGE,borderwidth=5, highlightthickness=2,)
+    greeting.pack()
+
+    # Quick Search box, searched as the user types
+    quick_search_frame = tk.Frame(window, bg="steel blue")
+    quick_search_frame.pack(side=tk.TOP, pady=10)
+    tk.Label(quick_search_frame, text="Quick Search:", fg="white", bg="steel blue", font=("Script MT Bold", 13)).pack(side=tk.LEFT)
+    quick_search_box = tk.Entry(quick_search_frame, width=40)
+    quick_search_box.pack(side=tk.LEFT, padx=5)
+    quick_search_box.bind("<KeyRelease>", quick_search_typed)
+
+    # Load from ssv file button
+    load_items_button = tk.Button(
+        text="Load Previous Session",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=read_csv
+    )
+
+    # Pack the button to the top
+    load_items_button.pack(side=tk.TOP, pady=10)
+
+    # Bulk import button
+    bulk_import_button = tk.Button(
+        text="Bulk Import",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=bulk_import
+    )
+
+    # Pack the button to the top
+    bulk_import_button.pack(side=tk.TOP, pady=10)
+
+    # Cancel a running load button
+    cancel_load_button = tk.Button(
+        text="Cancel Load",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=cancel_load
+    )
+
+    # Pack the button to the top
+    cancel_load_button.pack(side=tk.TOP, pady=10)
+
+    # Account creation button
+    item_creation_button = tk.Button(
+        text="Create Item",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=open_create_item_window  # Set the command to open the Create Item window
+    )
+
+    # Pack the button to the top
+    item_creation_button.pack(side=tk.TOP, pady=10)
+
+    # Show storage button
+    show_item_button = tk.Button(
+        text="Show Storage",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=show_items  # Set the command option to the show_items function
+    )
+
+    # Pack the button to the Left side
+    show_item_button.pack(side=tk.TOP, pady=10)
+
+    # Show storage button
+    find_item_button = tk.Button(
+        text="Find Item",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=find_item_window
+    )
+
+    # Pack the button to the Left side
+    find_item_button.pack(side=tk.TOP, pady=10)
+
+    # Find customer button
+    find_customer_button = tk.Button(
+        text="Find Customer",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=find_customer_window
+    )
+
+    # Pack the button to the Left side
+    find_customer_button.pack(side=tk.TOP, pady=10)
+
+    # Show storage button
+    delete_item_button = tk.Button(
+        text="Delete Item",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=delete_items_window
+    )
+
+    # Pack the button to the Left side
+    delete_item_button.pack(side=tk.TOP, pady=10)
+
+    # Stock movement button
+    stock_movement_button = tk.Button(
+        text="Stock Movement",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=stock_movement_window
+    )
+
+    # Pack the button to the Left side
+    stock_movement_button.pack(side=tk.TOP, pady=10)
+
+    # Show storage button
+    recent_item_button = tk.Button(
+        text="Most Recent Products",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=most_recent_items
+    )
+
+    # Pack the button to the Left side
+    recent_item_button.pack(side=tk.TOP, pady=10)
+
+    # Spinbox to pick how many recent items to show
+    recent_count_box = tk.Spinbox(window, from_=1, to=1000000, width=8)
+    recent_count_box.delete(0, tk.END)
+    recent_count_box.insert(0, RECENT_ITEMS_COUNT)
+    recent_count_box.pack(side=tk.TOP)
+
+    # Stock report button
+    stock_report_button = tk.Button(
+        text="Stock Report",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=stock_report
+    )
+
+    # Pack the button to the Left side
+    stock_report_button.pack(side=tk.TOP, pady=10)
+
+    # Spinbox to pick the highest quantity that counts as low stock
+    low_stock_box = tk.Spinbox(window, from_=0, to=1000000, width=8)
+    low_stock_box.delete(0, tk.END)
+    low_stock_box.insert(0, LOW_STOCK_THRESHOLD)
+    low_stock_box.pack(side=tk.TOP)
+
+
+    # save current session
+    save_session_button = tk.Button(
+        text="Save Current Session",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=write_csv
+    )
+
+    # Pack the button to the Left side
+    save_session_button.pack(side=tk.TOP, pady=10)
+
+    # save a binary snapshot of the session
+    save_snapshot_button = tk.Button(
+        text="Save Snapshot",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=save_snapshot
+    )
+
+    # Pack the button to the Left side
+    save_snapshot_button.pack(side=tk.TOP, pady=10)
+
+    # Performance window button
+    performance_button = tk.Button(
+        text="Performance",
+        width=25,
+        height=1,
+        bg="navy",
+        fg="white",
+        font=("Script MT Bold", 13),
+        relief=tk.RIDGE,
+        borderwidth=5, 
+        highlightthickness=2,
+        command=performance_window
+    )
+
+    # Pack the button to the Left side
+    performance_button.pack(side=tk.TOP, pady=10)
+
+
+
+    # Label showing when the storage was last saved
+    save_status = tk.Label(window, text="", fg="white", bg="steel blue")
+    save_status.pack(side=tk.BOTTOM)
+
+    # Text widget to display storage
+    storage_text = tk.Text(window, height=10, width=60)
+    storage_text.pack(pady=10)
+
+    # everything shown in it is batched and drawn once per frame
+    output = TextRenderer(storage_text, on_error=show_error)
+
+    # Paged table to display stored items
+    result_view = PagedView(window)
+    result_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    # Save in the background every AUTOSAVE_INTERVAL seconds (AUTOSAVE_INTERVAL=0 turns it off),
+    # but leave the CSV alone while it is being loaded
+    if AUTOSAVE_INTERVAL > 0:
+        autosaver = Autosaver(core, can_compact=lambda: loader is None)
+        autosaver.start()
+
+    poll_save_status()
+
+    # Save what is left when the window is closed
+    window.protocol("WM_DELETE_WINDOW", close_window)
+
+    window.mainloop()
+
+if __name__ == "__main__":
+    main()
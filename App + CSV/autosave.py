@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+
+
+# Seconds between autosaves, and the number of unsaved changes that triggers one sooner.
+# Picked with AUTOSAVE_INTERVAL and AUTOSAVE_CHANGES; an interval of 0 turns autosave off.
+AUTOSAVE_INTERVAL = float(os.environ.get('AUTOSAVE_INTERVAL', 30))
+AUTOSAVE_CHANGES = int(os.environ.get('AUTOSAVE_CHANGES', 500))
+
+# How often the saver checks the change count while it waits for the interval
+CHECK_INTERVAL = 0.5
+
+
+class Autosaver(threading.Thread):
+
+    """
+    Background thread that saves a StorageCore on its own.
+
+    Changes made between two saves are coalesced into one: every `interval` seconds, or as
+    soon as `max_changes` changes are waiting, the saver calls `StorageCore.save`, which
+    takes the batch of changes in one step and writes it on this thread. Nothing is written
+    while the core is not dirty. `stop` saves one last time, so closing the window keeps
+    every change.
+
+    The saver never touches a widget; the window reads the core's `last_saved` and the
+    saver's `error` through `window.after` polling, so showing the save status never waits
+    on the disk.
+
+    Parameters:
+    - core (StorageCore): The storage system to save.
+    - interval (float): The most seconds a change waits before it is saved.
+    - max_changes (int): The number of unsaved changes that starts a save straight away.
+    - can_compact (callable): Returns whether a save may compact the journal now, e.g. not
+      while the CSV is being loaded. Compaction is always allowed if not given.
+
+    Example:
+    autosaver = Autosaver(core, interval=10)
+    autosaver.start()
+    autosaver.stop()  # saves what is left and ends the thread
+
+    """
+
+    def __init__(self, core, interval=AUTOSAVE_INTERVAL, max_changes=AUTOSAVE_CHANGES, can_compact=None):
+        super().__init__(daemon=True)
+        self.core = core
+        self.interval = interval
+        self.max_changes = max_changes
+        self.can_compact = can_compact or (lambda: True)
+
+        # how many saves wrote something; error holds the exception of the last save if it failed
+        self.saves = 0
+        self.error = None
+
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def save_now(self):
+        """Ask the saver to save straight away instead of waiting for the interval."""
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Save whatever is left and wait for the thread to end."""
+        self._stopped.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def run(self):
+        due = time.monotonic() + self.interval
+        while not self._stopped.is_set():
+            woken = self._wake.wait(min(CHECK_INTERVAL, self.interval))
+            self._wake.clear()
+            if woken or self.core.unsaved_changes >= self.max_changes or time.monotonic() >= due:
+                self._save()
+                due = time.monotonic() + self.interval
+        # one last save on the way out
+        self._save()
+
+    def _save(self):
+        if not self.core.dirty:
+            return
+        try:
+            self.core.save(compact=self.can_compact())
+        except Exception as error:
+            self.error = error
+        else:
+            self.error = None
+            self.saves += 1
@@ -0,0 +1,68 @@
+"""
+Autosave benchmark: what background saving costs the thread making the changes.
+
+For every dataset size it makes --changes random check-outs against a store of that size
+- manual: calling StorageCore.save on the same thread every --every changes, as the
+  Save Current Session button does
+- autosave: leaving the saves to an Autosaver thread with max_changes set to --every
+and prints the wall time of the changes plus how many saves each one took.
+
+Usage:
+python bench_autosave.py [--sizes 1e5,1e6] [--changes 20000] [--every 500]
+
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# bench_utils puts the app folder on sys.path, so it goes first
+from bench_utils import parse_sizes, synthetic_rows
+from autosave import Autosaver
+from storage_core import StorageCore
+
+
+def make_core(path, count):
+    core = StorageCore(path, 'memory')
+    core.store.put_many((int(itemID), product, int(qty) + 10**6, first, last, phone, mail)
+                        for itemID, product, qty, first, last, phone, mail in synthetic_rows(count))
+    return core
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6])
+    parser.add_argument("--changes", type=int, default=20000)
+    parser.add_argument("--every", type=int, default=500, help="changes per save")
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'changes':>8} {'manual (ms)':>12} {'saves':>6} {'autosave (ms)':>14} {'saves':>6}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            core = make_core(os.path.join(folder, f'manual{count}.csv'), count)
+            item_ids = random.Random(count).choices(list(core.store.item_ids()), k=args.changes)
+
+            start = time.perf_counter()
+            manual_saves = 0
+            for done, itemID in enumerate(item_ids, 1):
+                core.check_out(itemID, 1)
+                if done % args.every == 0:
+                    core.save()
+                    manual_saves += 1
+            manual_ms = (time.perf_counter() - start) * 1000
+
+            core = make_core(os.path.join(folder, f'auto{count}.csv'), count)
+            autosaver = Autosaver(core, interval=60, max_changes=args.every)
+            autosaver.start()
+            start = time.perf_counter()
+            for itemID in item_ids:
+                core.check_out(itemID, 1)
+            auto_ms = (time.perf_counter() - start) * 1000
+            autosaver.stop()
+
+            print(f"{count:>9} {len(item_ids):>8} {manual_ms:>12.1f} {manual_saves:>6} {auto_ms:>14.1f} {autosaver.saves:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Backend benchmark: the in-memory StorageStore against the SQLite backend.
+
+For every dataset size it times
+- load: putting every row in the store (put_many; for SQLite one executemany and a commit)
+- open: what starting the app costs before the first item can be shown (reading the CSV
+  back for memory, opening the database for SQLite)
+- get: point lookups by itemID
+- search: an exact and a prefix search on an indexed field
+- scan: walking every record
+
+Usage:
+python bench_backends.py [--sizes 1e4,1e5,1e6] [--lookups 10000]
+
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import LAST_NAMES, parse_sizes, synthetic_rows
+from csv_loader import CSV_HEADER, read_storage_csv
+from sqlite_store import SqliteStore
+from storage_store import StorageStore
+
+
+def store_rows(count):
+    return [(int(itemID), product, int(qty), first, last, phone, mail)
+            for itemID, product, qty, first, last, phone, mail in synthetic_rows(count)]
+
+
+def timed(work):
+    start = time.perf_counter()
+    result = work()
+    return time.perf_counter() - start, result
+
+
+def measure(store, reopen, rows, lookup_ids):
+    # returns the seconds each step took, in the order of the table columns
+    load, _ = timed(lambda: store.put_many(rows))
+    commit = getattr(store, "commit", None)
+    if commit is not None:
+        load += timed(commit)[0]
+
+    opened, store = timed(reopen)
+
+    get, _ = timed(lambda: [store.get(itemID) for itemID in lookup_ids])
+    exact, _ = timed(lambda: store.search_ids("last_name", LAST_NAMES[42]))
+    prefix, _ = timed(lambda: store.search_ids("last_name", LAST_NAMES[42][:4], prefix=True))
+    scan, count = timed(lambda: sum(1 for _ in store.records()))
+    assert count == len(rows)
+    return load, opened, get / len(lookup_ids), exact, prefix, scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**4, 10**5, 10**6])
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'backend':>8} {'load (s)':>9} {'open (s)':>9} {'get (us)':>9} "
+          f"{'exact (ms)':>11} {'prefix (ms)':>12} {'scan (s)':>9}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            rows = store_rows(count)
+            lookup_ids = random.Random(count).choices([row[0] for row in rows], k=args.lookups)
+
+            # the memory backend starts by reading the CSV it was saved to
+            csv_path = os.path.join(folder, f'memory{count}.csv')
+            with open(csv_path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(CSV_HEADER)
+                writer.writerows(rows)
+
+            def reopen_memory():
+                store = StorageStore()
+                store.put_many(read_storage_csv(csv_path))
+                return store
+
+            db_path = os.path.join(folder, f'sqlite{count}.db')
+
+            def reopen_sqlite():
+                return SqliteStore(db_path)
+
+            for name, store, reopen in (("memory", StorageStore(), reopen_memory),
+                                        ("sqlite", SqliteStore(db_path), reopen_sqlite)):
+                load, opened, get, exact, prefix, scan = measure(store, reopen, rows, lookup_ids)
+                print(f"{count:>9} {name:>8} {load:>9.2f} {opened:>9.3f} {get * 1e6:>9.1f} "
+                      f"{exact * 1000:>11.3f} {prefix * 1000:>12.3f} {scan:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Change export benchmark: what a downstream sync costs against a full re-read of the storage.
+
+Builds a change log of --changes saved changes (mostly adds, then deletes and quantity
+changes) and the ProjectStorage.csv they leave behind. It then times, for every --recent
+count, exporting the changes made after the last sync as CSV and as JSON Lines, next to
+reading the whole CSV back the way a mirror has to without the change log.
+
+Usage:
+python bench_changes.py [--changes 1e5,1e6] [--recent 10,1000,100000]
+
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from changes import ChangeLog
+from csv_loader import read_storage_csv, write_storage_csv
+
+
+def build(folder, count):
+    # a change log of `count` changes and the CSV of the items they leave
+    log = ChangeLog(os.path.join(folder, f'storage{count}.changes'))
+    rng = random.Random(count)
+    items = {}
+    for row in synthetic_rows(count):
+        row = (int(row[0]), row[1], int(row[2]), *row[3:])
+        choice = rng.random()
+        if choice < 0.8 or not items:
+            log.record_add(row)
+            items[row[0]] = row
+        elif choice < 0.9:
+            itemID = rng.choice(list(items)) if len(items) < 1000 else next(iter(items))
+            log.record_delete(itemID)
+            del items[itemID]
+        else:
+            itemID = next(reversed(items))
+            log.record_quantity(itemID, 7)
+            items[itemID] = items[itemID][:2] + (7,) + items[itemID][3:]
+    log.flush()
+    path = os.path.join(folder, f'storage{count}.csv')
+    write_storage_csv(path, items.values())
+    return log, path
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--changes", type=parse_sizes, default=[10**5, 10**6])
+    parser.add_argument("--recent", type=parse_sizes, default=[10, 1000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'changes':>9} {'recent':>8} {'csv (ms)':>9} {'jsonl (ms)':>11} {'full read (ms)':>15}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.changes:
+            log, path = build(folder, count)
+            full = timed(lambda: sum(1 for _row in read_storage_csv(path)))
+            for recent in args.recent:
+                since = max(log.saved_sequence - recent, 0)
+                as_csv = timed(lambda: log.export(io.StringIO(), since, 'csv'))
+                as_jsonl = timed(lambda: log.export(io.StringIO(), since, 'jsonl'))
+                print(f"{count:>9} {recent:>8} {as_csv:>9.2f} {as_jsonl:>11.2f} {full:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compression benchmark: file size and time of every codec and level for a storage CSV.
+
+It generates --rows items (see generate_data.py) and writes them once as a plain CSV, then
+once for every --codecs codec at every --levels level (all the levels the codec takes by
+default). For each file it prints the size, how much smaller than the plain file it is,
+and how long writing it (write_storage_csv) and reading it back (read_storage_csv) took.
+
+Usage:
+python bench_compression.py [--rows 1e5] [--codecs gzip,bz2,lzma] [--levels 1,6,9] [--repeat 0.3]
+
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_utils import parse_sizes
+from csv_loader import COMPRESSION_LEVELS, COMPRESSIONS, read_storage_csv, write_storage_csv
+from generate_data import generate_rows
+
+
+def timed(path, rows, compression, level):
+    # (size, write seconds, read seconds) of one file
+    start = time.perf_counter()
+    write_storage_csv(path, rows, compression, level)
+    written = time.perf_counter() - start
+    start = time.perf_counter()
+    for _row in read_storage_csv(path):
+        pass
+    read = time.perf_counter() - start
+    return os.path.getsize(path), written, read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_sizes, default=[10**5])
+    parser.add_argument("--codecs", type=lambda text: text.split(","), default=list(COMPRESSIONS))
+    parser.add_argument("--levels", type=lambda text: [int(level) for level in text.split(",")],
+                        help="levels to try; a codec skips the ones it does not take (default: all of them)")
+    parser.add_argument("--repeat", type=float, default=0.3, help="share of items going to a returning customer")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for codec in args.codecs:
+        if codec not in COMPRESSIONS:
+            parser.error(f"unknown codec {codec!r}; use {', '.join(COMPRESSIONS)}")
+
+    print(f"{'rows':>8} {'codec':>6} {'level':>5} {'size (KiB)':>11} {'ratio':>7} {'write (s)':>10} {'read (s)':>9}")
+    for rows in args.rows:
+        items = list(generate_rows(rows, args.repeat, args.seed))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'ProjectStorage.csv')
+            plain, written, read = timed(path, items, 'none', None)
+            print(f"{rows:>8} {'none':>6} {'-':>5} {plain / 1024:>11.0f} {1:>7.2f} {written:>10.3f} {read:>9.3f}", flush=True)
+            for codec in args.codecs:
+                levels = COMPRESSION_LEVELS[codec]
+                for level in args.levels or levels:
+                    if level not in levels:
+                        continue
+                    size, written, read = timed(path, items, codec, level)
+                    print(f"{rows:>8} {codec:>6} {level:>5} {size / 1024:>11.0f} {plain / size:>7.2f} {written:>10.3f} {read:>9.3f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
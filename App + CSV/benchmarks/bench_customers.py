@@ -0,0 +1,59 @@
+"""
+Customer lookup benchmark: the customer -> items table against scanning every item.
+
+For every dataset size it builds a StorageStore where every customer owns --ratio items and
+times, averaged over --lookups random customers,
+- scan: going through every record and keeping the customer's items
+- lookup: StorageCore.find_customers by email (email index, then the customer's item set)
+
+Usage:
+python bench_customers.py [--sizes 1e5,1e6] [--ratio 50] [--lookups 200]
+
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from storage_core import StorageCore
+
+
+def scan(store, email):
+    email = email.casefold()
+    return [record for record in store.records() if record.email.casefold() == email]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6])
+    parser.add_argument("--ratio", type=int, default=50, help="items per customer")
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'customers':>10} {'scan (ms)':>10} {'lookup (us)':>12}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            core = StorageCore(os.path.join(folder, f'storage{count}.csv'), 'memory')
+            core.store.put_many((int(itemID), product, int(qty), first, last, phone, mail)
+                                for itemID, product, qty, first, last, phone, mail in synthetic_rows(count, args.ratio))
+            emails = [record.email for record in core.store.records_for(random.Random(count).choices(list(core.store.item_ids()), k=args.lookups))]
+
+            # scanning is slow, so it only gets a few of the lookups
+            scanned = emails[:5]
+            start = time.perf_counter()
+            for email in scanned:
+                scan(core.store, email)
+            scan_ms = (time.perf_counter() - start) * 1000 / len(scanned)
+
+            start = time.perf_counter()
+            for email in emails:
+                core.find_customers("email", email)
+            lookup_us = (time.perf_counter() - start) * 1e6 / len(emails)
+
+            print(f"{count:>9} {core.store.customer_count():>10} {scan_ms:>10.1f} {lookup_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Parallel ingest benchmark: how bulk import throughput scales with worker processes.
+
+Writes --rows synthetic rows split over --files CSV files (one file means the import is cut
+into byte ranges of that file), then for every worker count times BulkImporter.prepare,
+which parses and validates every row and resolves duplicate itemIDs, and prints the rows
+per second and the speed-up over one worker. Every run must stage the same rows.
+
+Usage:
+python bench_ingest.py [--rows 1e6] [--files 1,20] [--workers 1,2,4,8]
+
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from bulk_import import BulkImporter
+from csv_loader import write_storage_csv
+
+
+def write_files(folder, rows, files):
+    paths = [os.path.join(folder, f'site{number}.csv') for number in range(files)]
+    per_file = -(-rows // files)
+    generated = synthetic_rows(rows)
+    for path in paths:
+        write_storage_csv(path, (row for _count, row in zip(range(per_file), generated)))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_sizes, default=[10**6])
+    parser.add_argument("--files", type=parse_sizes, default=[1, 20])
+    parser.add_argument("--workers", type=parse_sizes, default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'rows':>9} {'files':>6} {'workers':>8} {'seconds':>8} {'rows/s':>10} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in args.rows:
+            for files in args.files:
+                paths = write_files(folder, rows, files)
+                baseline = staged = None
+                for workers in args.workers:
+                    importer = BulkImporter(paths, set().__contains__, os.path.join(folder, 'rejects.csv'), workers=workers)
+                    start = time.perf_counter()
+                    importer.prepare()
+                    seconds = time.perf_counter() - start
+                    if staged is None:
+                        staged = importer.rows
+                    elif importer.rows != staged:
+                        raise RuntimeError(f"{workers} workers staged different rows")
+                    baseline = baseline or seconds
+                    print(f"{rows:>9} {files:>6} {workers:>8} {seconds:>8.2f} {rows / seconds:>10,.0f} {baseline / seconds:>9.2f}")
+                for path in paths:
+                    os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
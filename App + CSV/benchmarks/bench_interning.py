@@ -0,0 +1,86 @@
+"""
+Interning benchmark: memory of the text fields with and without the product pool and customer table.
+
+Writes a storage CSV where every customer owns --ratio consecutive items, reads it back the
+way read_csv does (so every field arrives as a fresh string) and measures, with tracemalloc,
+- per-row: the text fields kept as five lists with one string per row (StorageStore's
+  layout before the customer table)
+- interned: a product pool and a customer table with one integer reference per row per table
+- StorageStore: the whole store as it is now, as loaded (its indexes are only built when a
+  field is searched; see bench_store_memory.py for their cost)
+
+Usage:
+python bench_interning.py [--sizes 1e5,1e6] [--ratio 50]
+
+"""
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from array import array
+
+from bench_utils import parse_sizes, synthetic_rows
+from csv_loader import read_storage_csv, write_storage_csv
+from storage_store import StorageStore
+
+
+def per_row_columns(path):
+    products, first_names, last_names, phone_numbers, emails = [], [], [], [], []
+    for _itemID, product, _quantity, first, last, phone, mail in read_storage_csv(path):
+        products.append(product)
+        first_names.append(first)
+        last_names.append(last)
+        phone_numbers.append(phone)
+        emails.append(mail)
+    return products, first_names, last_names, phone_numbers, emails
+
+
+def interned_columns(path):
+    product_refs, customer_refs = array('q'), array('q')
+    product_pool, customers = {}, {}
+    for _itemID, product, _quantity, first, last, phone, mail in read_storage_csv(path):
+        product_refs.append(product_pool.setdefault(product, len(product_pool)))
+        customer_refs.append(customers.setdefault((first, last, phone, mail), len(customers)))
+    return product_refs, customer_refs, list(product_pool), list(customers)
+
+
+def whole_store(path):
+    store = StorageStore()
+    store.put_many(read_storage_csv(path))
+    return store
+
+
+def measure(builder, path):
+    # bytes still allocated once the structure is built
+    gc.collect()
+    tracemalloc.start()
+    result = builder(path)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6])
+    parser.add_argument("--ratio", type=int, default=50, help="items per customer")
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'customers':>10} {'per-row (MB)':>13} {'interned (MB)':>14} {'saved (MB)':>11} {'StorageStore (MB)':>18}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            path = os.path.join(folder, 'ProjectStorage.csv')
+            write_storage_csv(path, synthetic_rows(count, args.ratio))
+            per_row = measure(per_row_columns, path)
+            interned = measure(interned_columns, path)
+            store = measure(whole_store, path)
+            customers = -(-count // args.ratio)
+            print(f"{count:>9} {customers:>10} {per_row / 2**20:>13.1f} {interned / 2**20:>14.1f} "
+                  f"{(per_row - interned) / 2**20:>11.1f} {store / 2**20:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
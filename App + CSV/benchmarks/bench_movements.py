@@ -0,0 +1,77 @@
+"""
+Stock movement benchmark: in-place quantity updates against delete and re-add.
+
+For every dataset size it times --moves random check-outs
+- readd: the old way, deleting the item and adding it back with the new quantity
+- single: one StorageCore.check_out per movement
+- batch: every movement in one StorageCore.move_stock call
+and the save that writes them to the journal and movement log.
+
+Usage:
+python bench_movements.py [--sizes 1e5,1e6] [--moves 10000]
+
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from movements import CHECK_OUT
+from storage_core import StorageCore
+
+
+def make_core(path, count):
+    core = StorageCore(path, 'memory')
+    core.store.put_many((int(itemID), product, int(qty) + 10**6, first, last, phone, mail)
+                        for itemID, product, qty, first, last, phone, mail in synthetic_rows(count))
+    return core
+
+
+def readd(core, item_ids):
+    # what changing a quantity took before: delete the item and add it back
+    store = core.store
+    for itemID in item_ids:
+        record = store.get(itemID)
+        core.delete_item(itemID)
+        core.add_item(str(itemID), record.product, str(record.quantity - 1), record.first_name,
+                      record.last_name, record.phone_number, record.email)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6])
+    parser.add_argument("--moves", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'moves':>7} {'readd (ms)':>11} {'single (ms)':>12} {'batch (ms)':>11} {'save (ms)':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            core = make_core(os.path.join(folder, f'storage{count}.csv'), count)
+            item_ids = random.Random(count).choices(list(core.store.item_ids()), k=args.moves)
+            # the re-add path can only take each item once per pass
+            unique_ids = list(dict.fromkeys(item_ids))
+
+            start = time.perf_counter()
+            readd(core, unique_ids)
+            readd_ms = (time.perf_counter() - start) * 1000 * len(item_ids) / len(unique_ids)
+
+            start = time.perf_counter()
+            for itemID in item_ids:
+                core.check_out(itemID, 1)
+            single_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            core.move_stock([(itemID, CHECK_OUT, 1) for itemID in item_ids])
+            batch_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            core.save()
+            save_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{count:>9} {len(item_ids):>7} {readd_ms:>11.1f} {single_ms:>12.1f} {batch_ms:>11.1f} {save_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
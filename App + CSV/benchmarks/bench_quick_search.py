@@ -0,0 +1,80 @@
+"""
+Quick Search benchmark: the latency of every keystroke against the --budget.
+
+For every --rows size it loads generated items (see generate_data.py) into a StorageStore,
+times building the trigram indexes, then types --queries values one character at a time
+and times the Quick Search after each keystroke. Half of the values are names and emails
+of stored customers as they are; the other half have two letters swapped, so the fuzzy
+matching is timed too. It prints the median, 99th percentile and slowest keystroke, and
+what one search costs by scanning every item instead.
+
+Usage:
+python bench_quick_search.py [--rows 1e5,1e6] [--queries 50] [--budget 50]
+
+"""
+import argparse
+import random
+import time
+
+from bench_utils import parse_sizes
+from generate_data import customer_fields, generate_rows
+from storage_store import QUICK_SEARCH_FIELDS, StorageStore
+
+# Items each search returns, as in the Quick Search box
+LIMIT = 50
+
+
+def typed_values(rows, count, seed):
+    # names and emails of stored customers; every other one with two letters swapped
+    rng = random.Random(seed)
+    values = []
+    for number in range(count):
+        value = customer_fields(rng.randrange(rows // 2))[rng.choice((0, 1, 3))]
+        if number % 2 and len(value) > 3:
+            swap = rng.randrange(1, len(value) - 2)
+            value = value[:swap] + value[swap + 1] + value[swap] + value[swap + 2:]
+        values.append(value)
+    return values
+
+
+def scan(store, text):
+    # what the search costs without an index: look at every item's fields
+    text = text.casefold()
+    return [record for record in store.records() if any(text in getattr(record, field).casefold() for field in QUICK_SEARCH_FIELDS)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_sizes, default=[10**5, 10**6])
+    parser.add_argument("--queries", type=int, default=50, help="values typed one character at a time")
+    parser.add_argument("--budget", type=float, default=50, help="milliseconds a keystroke may take")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'build (s)':>10} {'keys':>6} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'over':>5} {'scan (ms)':>10}")
+    for rows in args.rows:
+        store = StorageStore()
+        store.add_many(generate_rows(rows, 0.3, args.seed))
+        start = time.perf_counter()
+        store.prepare_quick_search()
+        build = time.perf_counter() - start
+
+        latencies = []
+        for value in typed_values(rows, args.queries, args.seed):
+            for length in range(1, len(value) + 1):
+                start = time.perf_counter()
+                store.quick_search(value[:length], LIMIT)
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+
+        start = time.perf_counter()
+        scan(store, typed_values(rows, 1, args.seed)[0])
+        scanned = (time.perf_counter() - start) * 1000
+
+        over = sum(1 for latency in latencies if latency > args.budget)
+        print(f"{rows:>8} {build:>10.2f} {len(latencies):>6} {latencies[len(latencies) // 2]:>9.2f} "
+              f"{latencies[int(len(latencies) * 0.99)]:>9.2f} {latencies[-1]:>9.2f} {over:>5} {scanned:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Most-recent benchmark: full scan against the recency index.
+
+For every store size it times producing the text of the newest N items
+- scan: the old most_recent_items, formatting every item and reversing the whole list
+- index: StorageStore.most_recent(N), formatting only those N items
+
+Usage:
+python bench_recent.py [--sizes 1e4,1e5,1e6] [--count 10]
+
+"""
+import argparse
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from storage_store import StorageStore
+
+
+def make_store(count):
+    store = StorageStore()
+    for itemID, product, qty, first, last, phone, mail in synthetic_rows(count):
+        store.add(int(itemID), product, int(qty), first, last, phone, mail)
+    return store
+
+
+def format_record(record):
+    return f"\nitemID : {record.itemID}\nProduct: {record.product}\nQuanity: {record.quantity}\nFull Name: {record.first_name} {record.last_name}\nPhone Number: {record.phone_number}\nEmail: {record.email}\n"
+
+
+def full_scan(store, count):
+    # what most_recent_items did before the recency index
+    recent_list = [format_record(record) for record in store.records()]
+    recent_list.reverse()
+    return recent_list[:count]
+
+
+def indexed(store, count):
+    return [format_record(record) for record in store.most_recent(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**4, 10**5, 10**6])
+    parser.add_argument("--count", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'N':>5} {'scan (ms)':>10} {'index (ms)':>11}")
+    for size in args.sizes:
+        store = make_store(size)
+
+        start = time.perf_counter()
+        scanned = full_scan(store, args.count)
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(100):
+            newest = indexed(store, args.count)
+        index = (time.perf_counter() - start) / 100
+        assert newest == scanned
+
+        print(f"{size:>9} {args.count:>5} {scan * 1000:>10.1f} {index * 1000:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
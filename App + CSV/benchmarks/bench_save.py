@@ -0,0 +1,80 @@
+"""
+Save latency benchmark: full CSV rewrite against the journal.
+
+For every dataset size and edit count it times
+- rewrite: the old write_csv, truncating the CSV and writing every item
+- journal: appending the edits to the journal and fsyncing it (what a save costs now)
+- compact: merging the journal into the snapshot through a temp file and os.replace
+
+Usage:
+python bench_save.py [--sizes 1e4,1e5,1e6] [--edits 1,100,10000]
+
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from csv_loader import CSV_HEADER
+from journal import Journal
+from storage_store import StorageStore
+
+
+def make_store(count):
+    store = StorageStore()
+    for itemID, product, qty, first, last, phone, mail in synthetic_rows(count):
+        store.add(int(itemID), product, int(qty), first, last, phone, mail)
+    return store
+
+
+def full_rewrite(store, path):
+    # the save path before the journal existed
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(store.records())
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**4, 10**5, 10**6])
+    parser.add_argument("--edits", type=parse_sizes, default=[1, 100, 10000])
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'edits':>7} {'rewrite (ms)':>13} {'journal (ms)':>13} {'compact (ms)':>13}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'ProjectStorage.csv')
+        for count in args.sizes:
+            store = make_store(count)
+            for edits in args.edits:
+                full_rewrite(store, path)
+                journal = Journal(path, compact_threshold=edits + 1)
+
+                # each edit deletes an item and adds a new one in its place
+                for n, record in enumerate(store.records()):
+                    if n >= edits:
+                        break
+                    journal.record_delete(record.itemID)
+                    journal.record_add((count + n + 1, *record[1:]))
+
+                start = time.perf_counter()
+                full_rewrite(store, path)
+                rewrite = time.perf_counter() - start
+
+                start = time.perf_counter()
+                journal.flush()
+                flush = time.perf_counter() - start
+
+                start = time.perf_counter()
+                journal.compact()
+                compact = time.perf_counter() - start
+
+                print(f"{count:>9} {edits:>7} {rewrite * 1000:>13.2f} {flush * 1000:>13.2f} {compact * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Search benchmark: secondary indexes against a linear scan.
+
+Builds a store of synthetic items and times a few typical searches, both through
+StorageStore.search_ids and by scanning every record the way show_items walks them.
+
+Usage:
+python bench_search.py [--sizes 1e6] [--repeat 1000]
+
+"""
+import argparse
+import time
+
+from bench_utils import FIRST_NAMES, LAST_NAMES, PRODUCTS, parse_sizes, synthetic_rows
+from storage_store import StorageStore
+
+
+def make_store(count):
+    store = StorageStore()
+    for itemID, product, qty, first, last, phone, mail in synthetic_rows(count):
+        store.add(int(itemID), product, int(qty), first, last, phone, mail)
+    return store
+
+
+def linear_scan(store, field, value, prefix):
+    # what finding anything but an itemID cost before the indexes: look at every record
+    value = value.casefold()
+    found = set()
+    for record in store.records():
+        text = getattr(record, field).casefold()
+        if text.startswith(value) if prefix else text == value:
+            found.add(record.itemID)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**6])
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        store = make_store(count)
+        queries = [
+            ("email", f"{FIRST_NAMES[count // 2 % len(FIRST_NAMES)].lower()}{count // 2}@mail.com", False),
+            ("phone_number", "123-555-0123", False),
+            ("last_name", LAST_NAMES[42], False),
+            ("last_name", LAST_NAMES[42][:5], True),
+            ("product", PRODUCTS[0], False),
+            ("email", "kalo12", True),
+        ]
+
+        print(f"\n{count} items")
+        print(f"{'query':>34} {'hits':>7} {'index (ms)':>11} {'scan (ms)':>10}")
+        for field, value, prefix in queries:
+            store.search_ids(field, value, prefix)  # builds the sorted keys on the first prefix search
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                hits = store.search_ids(field, value, prefix)
+            indexed = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            scanned = linear_scan(store, field, value, prefix)
+            scan = time.perf_counter() - start
+            assert scanned == hits
+
+            label = f"{field} {'starts with' if prefix else '='} {value}"
+            print(f"{label[:34]:>34} {len(hits):>7} {indexed * 1000:>11.4f} {scan * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
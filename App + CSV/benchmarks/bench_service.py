@@ -0,0 +1,119 @@
+"""
+HTTP service load generator: requests per second and latency of the local JSON service.
+
+Starts a StorageService on a free localhost port over a store of --items synthetic items,
+then runs --clients client threads for --seconds each. Every client keeps one HTTP/1.1
+connection alive and sends a mix of requests:
+- find: GET /items/ITEMID for a random item
+- search: GET /search by the email of a random item
+- list: GET /items for a random page of 50
+- add: POST /items with a new item
+- batch: POST /items/find with 50 random itemIDs
+and prints the requests per second and the p50 and p99 latency of every kind and of all of them.
+
+Usage:
+python bench_service.py [--items 1e5] [--clients 1,4,16] [--seconds 5] [--workers 16]
+
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from storage_core import StorageCore
+from storage_service import start_in_thread
+
+# Share of each kind of request in the mix
+MIX = (("find", 0.5), ("search", 0.2), ("list", 0.1), ("add", 0.1), ("batch", 0.1))
+
+
+def percentile(latencies, share):
+    ordered = sorted(latencies)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)] if ordered else 0.0
+
+
+def client(port, number, item_ids, emails, new_ids, seconds, latencies):
+    rng = random.Random(number)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    kinds, weights = zip(*MIX)
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        body = None
+        if kind == "find":
+            method, path = "GET", f"/items/{rng.choice(item_ids)}"
+        elif kind == "search":
+            method, path = "GET", f"/search?field=email&value={rng.choice(emails)}"
+        elif kind == "list":
+            method, path = "GET", f"/items?start={rng.randrange(len(item_ids))}&count=50"
+        elif kind == "add":
+            method, path = "POST", "/items"
+            body = json.dumps({"itemID": next(new_ids), "product": "Widget", "quantity": 5, "first_name": "Load",
+                               "last_name": "Test", "phone_number": "555-555-5555", "email": f"load{number}@example.com"})
+        else:
+            method, path = "POST", "/items/find"
+            body = json.dumps({"itemIDs": rng.choices(item_ids, k=50)})
+
+        start = time.perf_counter()
+        connection.request(method, path, body, {"Content-Type": "application/json"} if body else {})
+        response = connection.getresponse()
+        response.read()
+        latencies[kind].append(time.perf_counter() - start)
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path} answered {response.status}")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=lambda text: int(float(text)), default=10**5)
+    parser.add_argument("--clients", type=parse_sizes, default=[1, 4, 16])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        core = StorageCore(os.path.join(folder, 'ProjectStorage.csv'), 'memory')
+        core.put_loaded((int(itemID), product, int(qty), first, last, phone, mail)
+                        for itemID, product, qty, first, last, phone, mail in synthetic_rows(args.items))
+        item_ids = list(core.store.item_ids())
+        emails = [record.email for record in core.records_for(random.Random(0).sample(item_ids, min(1000, len(item_ids))))]
+        service = start_in_thread(core, workers=args.workers)
+        port = service.server_address[1]
+        # itemIDs for the added items, shared by every client
+        new_ids = itertools.count(10**12)
+
+        print(f"{'clients':>7} {'kind':>7} {'requests':>9} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        try:
+            for clients in args.clients:
+                latencies = [{kind: [] for kind, _share in MIX} for _client in range(clients)]
+                threads = [threading.Thread(target=client, args=(port, number, item_ids, emails, new_ids, args.seconds, latencies[number]))
+                           for number in range(clients)]
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - start
+
+                everything = []
+                for kind, _share in MIX:
+                    times = [latency for per_client in latencies for latency in per_client[kind]]
+                    everything += times
+                    print(f"{clients:>7} {kind:>7} {len(times):>9} {len(times) / elapsed:>9.0f} "
+                          f"{percentile(times, 0.5) * 1000:>9.2f} {percentile(times, 0.99) * 1000:>9.2f}")
+                print(f"{clients:>7} {'all':>7} {len(everything):>9} {len(everything) / elapsed:>9.0f} "
+                      f"{percentile(everything, 0.5) * 1000:>9.2f} {percentile(everything, 0.99) * 1000:>9.2f}")
+        finally:
+            service.shutdown()
+            service.server_close()
+
+
+if __name__ == "__main__":
+    main()
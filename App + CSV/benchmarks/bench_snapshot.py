@@ -0,0 +1,73 @@
+"""
+Session load benchmark: the binary snapshot against parsing ProjectStorage.csv.
+
+For every dataset size it writes the same items as a CSV and as a snapshot, then times
+- csv parse: reading every row with read_storage_csv (what read_csv does on load)
+- csv load: the same plus putting every row in a StorageStore
+- open: mapping the snapshot and checking its header and size (the checksum is checked when it is written)
+- open+page: opening and decoding the first page of the table
+- get: looking up an itemID in the open snapshot (binary search over the mapped file)
+- decode: decoding every record of the snapshot
+- snap load: decoding every record into a StorageStore
+and prints the file sizes.
+
+Usage:
+python bench_snapshot.py [--sizes 1e5,1e6,1e7]
+
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import parse_sizes, synthetic_rows
+from csv_loader import read_storage_csv, write_storage_csv
+from paged_view import PAGE_SIZE
+from snapshot import SnapshotReader, csv_to_snapshot
+from storage_store import StorageStore
+
+
+def seconds(work):
+    start = time.perf_counter()
+    work()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6, 10**7])
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'csv MB':>7} {'snap MB':>8} {'csv parse (s)':>14} {'csv load (s)':>13} {'open (ms)':>10} "
+          f"{'open+page (ms)':>15} {'get (us)':>9} {'decode (s)':>11} {'snap load (s)':>14}")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            csv_path = os.path.join(folder, 'ProjectStorage.csv')
+            path = os.path.join(folder, 'ProjectStorage.snapshot')
+            write_storage_csv(csv_path, ((int(itemID), product, int(qty), first, last, phone, mail)
+                                         for itemID, product, qty, first, last, phone, mail in synthetic_rows(count)))
+            csv_to_snapshot(csv_path, path)
+
+            parse = seconds(lambda: sum(1 for _ in read_storage_csv(csv_path)))
+            csv_load = seconds(lambda: StorageStore().put_many(read_storage_csv(csv_path)))
+            opened = seconds(lambda: SnapshotReader(path).close())
+
+            def open_page():
+                with SnapshotReader(path) as snapshot:
+                    snapshot.page(0, PAGE_SIZE)
+            first_page = seconds(open_page)
+
+            with SnapshotReader(path) as snapshot:
+                item_ids = [snapshot.record(position).itemID for position in random.Random(count).choices(range(count), k=1000)]
+                get = seconds(lambda: [snapshot.get(itemID) for itemID in item_ids]) / len(item_ids)
+                decode = seconds(lambda: sum(1 for _ in snapshot.rows()))
+            with SnapshotReader(path) as snapshot:
+                snap_load = seconds(lambda: StorageStore().put_many(snapshot.rows()))
+
+            print(f"{count:>9} {os.path.getsize(csv_path) / 2**20:>7.1f} {os.path.getsize(path) / 2**20:>8.1f} {parse:>14.2f} "
+                  f"{csv_load:>13.2f} {opened * 1000:>10.1f} {first_page * 1000:>15.1f} {get * 1e6:>9.1f} {decode:>11.2f} {snap_load:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Stock report benchmark: the store's running product totals against rescanning every item.
+
+For every dataset size it times the parts of the stock report
+- total: units on hand
+- products: units and items of every product
+- top: the 10 products with the most units
+- low stock: the items with at most --threshold units (vectorized when NumPy is installed)
+and the same figures worked out by walking every record, the way they had to be before.
+
+Usage:
+python bench_stock.py [--sizes 1e5,1e6,1e7] [--threshold 5]
+
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from bench_utils import parse_sizes, synthetic_rows
+from storage_store import StorageStore
+import storage_store
+
+
+def make_store(count):
+    store = StorageStore()
+    for itemID, product, qty, first, last, phone, mail in synthetic_rows(count):
+        store.add(int(itemID), product, int(qty), first, last, phone, mail)
+    return store
+
+
+def rescan(store, threshold):
+    # every figure from one pass over the records
+    totals = defaultdict(lambda: [0, 0])
+    low_stock = []
+    for record in store.records():
+        total = totals[record.product.casefold()]
+        total[0] += record.quantity
+        total[1] += 1
+        if record.quantity <= threshold:
+            low_stock.append(record.itemID)
+    top = sorted(totals.values(), reverse=True)[:10]
+    return sum(total[0] for total in totals.values()), len(totals), top, low_stock
+
+
+def milliseconds(work):
+    start = time.perf_counter()
+    result = work()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6, 10**7])
+    parser.add_argument("--threshold", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"NumPy: {'yes' if storage_store.numpy is not None else 'no'}")
+    print(f"{'items':>9} {'total (ms)':>11} {'products (ms)':>14} {'top (ms)':>9} {'low stock (ms)':>15} {'rescan (ms)':>12}")
+    for count in args.sizes:
+        store = make_store(count)
+        total_ms, total = milliseconds(store.total_quantity)
+        products_ms, products = milliseconds(store.product_totals)
+        top_ms, _ = milliseconds(lambda: store.top_products(10))
+        low_ms, low_stock = milliseconds(lambda: store.low_stock_ids(args.threshold))
+        rescan_ms, expected = milliseconds(lambda: rescan(store, args.threshold))
+        assert (total, len(products), low_stock) == (expected[0], expected[1], expected[3])
+        print(f"{count:>9} {total_ms:>11.3f} {products_ms:>14.3f} {top_ms:>9.3f} {low_ms:>15.1f} {rescan_ms:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory benchmark: the old six-dict layout against StorageStore.
+
+The store is measured as loaded, with no secondary indexes (they are built on the first
+search of their field), and again with the index of every INDEXED_FIELDS field built, as
+after searches of every field or the Quick Search's preparation.
+
+Usage:
+python bench_store_memory.py [--sizes 1e5,1e6,1e7]
+
+"""
+import argparse
+import gc
+import tracemalloc
+
+from bench_utils import parse_sizes, synthetic_rows
+from storage_store import INDEXED_FIELDS, StorageStore
+
+
+def build_dicts(count):
+    # the layout ProjectOne.py used before StorageStore: six dicts keyed by the itemID string
+    storage_items, quantity, first_name, last_name, phone_number, email = {}, {}, {}, {}, {}, {}
+    for itemID, product, qty, first, last, phone, mail in synthetic_rows(count):
+        storage_items[itemID] = product
+        quantity[itemID] = qty
+        first_name[itemID] = first
+        last_name[itemID] = last
+        phone_number[itemID] = phone
+        email[itemID] = mail
+    return storage_items, quantity, first_name, last_name, phone_number, email
+
+
+def build_store(count):
+    store = StorageStore()
+    for itemID, product, qty, first, last, phone, mail in synthetic_rows(count):
+        store.add(int(itemID), product, int(qty), first, last, phone, mail)
+    return store
+
+
+def build_indexed_store(count):
+    store = build_store(count)
+    for field in INDEXED_FIELDS:
+        store.index(field)
+    return store
+
+
+def measure(builder, count):
+    # bytes still allocated once the structure is built
+    gc.collect()
+    tracemalloc.start()
+    result = builder(count)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=[10**5, 10**6, 10**7])
+    args = parser.parse_args()
+
+    print(f"{'items':>10} {'six dicts (MB)':>15} {'StorageStore (MB)':>18} {'saved':>7} {'+ indexes (MB)':>15} {'saved':>7}")
+    for count in args.sizes:
+        dicts = measure(build_dicts, count)
+        store = measure(build_store, count)
+        indexed = measure(build_indexed_store, count)
+        print(f"{count:>10} {dicts / 2**20:>15.1f} {store / 2**20:>18.1f} {1 - store / dicts:>7.0%} "
+              f"{indexed / 2**20:>15.1f} {1 - indexed / dicts:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+
+# the benchmarks import the app modules from the folder above this one
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+
+# syllables the synthetic product and customer names are built from
+SYLLABLES = ["ka", "lo", "mi", "ra", "ten", "jo", "bel", "dar", "vin", "sa", "mor", "li", "gan", "pe", "tor", "an", "wel", "su", "ric", "no"]
+
+
+def make_name(number, parts):
+    """Build a capitalized, letters-only name from `parts` syllables picked by number."""
+    syllables = []
+    for _ in range(parts):
+        number, digit = divmod(number, len(SYLLABLES))
+        syllables.append(SYLLABLES[digit])
+    return "".join(syllables).capitalize()
+
+
+PRODUCTS = ["Apple", "Car", "TV", "Phone", "Laptop", "Chair", "Table", "Lamp", "Bike", "Desk"] + [make_name(k, 2) for k in range(390)]
+FIRST_NAMES = [make_name(k, 2) for k in range(400)]
+LAST_NAMES = [make_name(k, 3) for k in range(8000)]
+
+
+def synthetic_rows(count, items_per_customer=1):
+    """
+    Yield `count` CSV-like rows in ProjectStorage.csv column order.
+
+    The itemID, quantity, phone number and email are fresh strings for every row, the same
+    way csv.reader hands them out. Product and names come from small shared pools.
+
+    Parameters:
+    - count (int): The number of rows to generate.
+    - items_per_customer (int): How many consecutive rows share one customer (name, phone and email).
+
+    """
+    for i in range(count):
+        customer = i // items_per_customer
+        first = FIRST_NAMES[customer % len(FIRST_NAMES)]
+        last = LAST_NAMES[(customer * 7919) % len(LAST_NAMES)]
+        yield [
+            str(i + 1),
+            PRODUCTS[(i // 7) % len(PRODUCTS)],
+            str(i % 500),
+            first,
+            last,
+            f"{customer % 1000:03d}-555-{customer % 10000:04d}",
+            f"{first.lower()}{customer}@mail.com",
+        ]
+
+
+def parse_sizes(text):
+    """Turn a comma separated list such as "1e5,1e6" into a list of ints."""
+    return [int(float(size)) for size in text.split(",")]
@@ -0,0 +1,81 @@
+"""
+Validation micro-benchmark: the old inline add_item checks against validation.py.
+
+Times checking the same synthetic rows (plus some invalid ones) three ways
+- inline: the checks add_item used to run, rebuilding allowed_chars and scanning the email several times
+- validate_item: one call per row
+- validate_batch: one call for all rows
+
+Usage:
+python bench_validation.py [--rows 200000]
+
+"""
+import argparse
+import re
+import time
+
+from bench_utils import synthetic_rows
+from validation import validate_batch, validate_item
+
+
+def inline_checks(itemID, product, Quantity, FirstName, LastName, PhoneNumber, Email):
+    # the checks add_item ran before validation.py, returning instead of showing a messagebox
+    if not itemID or not product or not FirstName or not LastName or not PhoneNumber or not Email:
+        return "Incomplete Information"
+    if not itemID.isdigit():
+        return "Invalid ItemID"
+    if not Quantity.isdigit():
+        return "Invalid Quanity"
+    if not FirstName.isalpha():
+        return "Invalid First Name"
+    if not LastName.isalpha():
+        return "Invalid Last Name"
+    if not product.isalpha():
+        return "Invalid Product Name"
+    allowed_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789@.")
+    if '@' not in Email or not Email.endswith('.com'):
+        return "Invalid Email Address"
+    if Email.count('@') != 1 or Email.count('.') != 1 or Email.index('@') > Email.index('.'):
+        return "Invalid Email Address"
+    local_part, domain_part = Email.split('@')
+    if not all(char in allowed_chars for char in local_part) or not all(char in allowed_chars for char in domain_part):
+        return "Invalid Email Address"
+    if not re.match(r'^\d{3}-\d{3}-\d{4}$', PhoneNumber):
+        return "Invalid Phone Number"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_rows(args.rows))
+    # break every 50th row in a different field
+    for n in range(0, len(rows), 50):
+        rows[n][n // 50 % 7] = "x-y"
+
+    timings = []
+    start = time.perf_counter()
+    inline = [inline_checks(*row) for row in rows]
+    timings.append(("inline", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    single = [validate_item(*row) for row in rows]
+    timings.append(("validate_item", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    batch = validate_batch(rows)
+    timings.append(("validate_batch", time.perf_counter() - start))
+
+    # all three must agree on which rows are invalid
+    assert [n for n, error in enumerate(inline) if error] == [n for n, error in enumerate(single) if error] == [n for n, _error in batch]
+
+    print(f"{len(rows)} rows, {len(batch)} invalid")
+    print(f"{'path':>15} {'total (ms)':>11} {'rows/s':>12}")
+    for name, seconds in timings:
+        print(f"{name:>15} {seconds * 1000:>11.1f} {len(rows) / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
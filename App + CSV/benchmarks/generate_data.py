@@ -0,0 +1,75 @@
+"""
+Synthetic data generator: a realistic ProjectStorage.csv of any size.
+
+Writes --rows items with the current CSV_HEADER, every one of them valid for add_item
+(letters-only products and names, xxx-xxx-xxxx phone numbers, letters-and-digits .com
+emails). --repeat is the share of items that belong to a customer who already has one,
+so 0 gives every item its own customer and 0.9 about ten items per customer; repeat
+customers are picked at random, so some end up with many items. The same --seed always
+writes the same file.
+
+Usage:
+python generate_data.py OUTPUT [--rows 1e5] [--repeat 0.3] [--seed 0] [--first-id 1]
+
+"""
+import argparse
+import random
+
+from bench_utils import FIRST_NAMES, LAST_NAMES, PRODUCTS
+from csv_loader import write_storage_csv
+
+
+def customer_fields(number):
+    """Return (first_name, last_name, phone_number, email) of customer `number`, all valid and unique to it."""
+    first = FIRST_NAMES[number % len(FIRST_NAMES)]
+    last = LAST_NAMES[(number * 7919) % len(LAST_NAMES)]
+    phone = f"{number // 10**7 % 1000:03d}-{number // 10**4 % 1000:03d}-{number % 10**4:04d}"
+    return first, last, phone, f"{first.lower()}{number}@mail.com"
+
+
+def generate_rows(count, repeat=0.0, seed=0, first_id=1):
+
+    """
+    Yield `count` valid item rows in CSV_HEADER order, with integer itemID and quantity.
+
+    Parameters:
+    - count (int): The number of rows.
+    - repeat (float): The share of rows, 0 to 1, that go to a customer who already has an item.
+    - seed (int): Seeds the random choices, so a seed always gives the same rows.
+    - first_id (int): The itemID of the first row; the others follow it.
+
+    Example:
+    write_storage_csv('ProjectStorage.csv', generate_rows(10**6, repeat=0.5))
+
+    """
+
+    if not 0 <= repeat <= 1:
+        raise ValueError("repeat must be between 0 and 1.")
+    rng = random.Random(seed)
+    customers = 0
+    for itemID in range(first_id, first_id + count):
+        if customers and rng.random() < repeat:
+            customer = rng.randrange(customers)
+        else:
+            customer = customers
+            customers += 1
+        # a few products are far more common than the rest, as in a real storage
+        product = PRODUCTS[min(int(rng.expovariate(1 / 25)), len(PRODUCTS) - 1)]
+        yield (itemID, product, rng.randrange(1000), *customer_fields(customer))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output")
+    parser.add_argument("--rows", type=lambda text: int(float(text)), default=10**5)
+    parser.add_argument("--repeat", type=float, default=0.3, help="share of items going to a returning customer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--first-id", type=int, default=1)
+    args = parser.parse_args()
+
+    written = write_storage_csv(args.output, generate_rows(args.rows, args.repeat, args.seed, args.first_id))
+    print(f"Wrote {written} items to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
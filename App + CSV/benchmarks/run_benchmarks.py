@@ -0,0 +1,207 @@
+"""
+Benchmark runner: times every storage operation on generated data and writes JSON results.
+
+For every --rows size it generates a storage CSV (see generate_data.py) and runs each
+operation the app does, headless through StorageCore:
+- load: read the CSV into a new StorageCore (read_csv)
+- save: save 1000 new items through the journal (write_csv)
+- export: write every item to a CSV
+- page: the first and a middle page of 50 (show_items)
+- most_recent: the 10 most recent items (most_recent_items)
+- validate: validate_item on generated fields (add_item's checks)
+- add_item: validate and add items
+- find_item, search_email, find_customer: lookups of random existing items and customers
+- quick_search: the Quick Search for the start of random customers' emails, with its
+  trigram indexes built beforehand
+- stock_report: units, product totals and low stock
+Each operation runs --repeat times and keeps its fastest time, then runs once more under
+tracemalloc for its peak memory (kept apart, as tracing slows everything down).
+
+The results go to --output as JSON with the commit and Python version they came from.
+With --compare OLD.json it also prints how each time changed since OLD.json and exits
+with status 1 if any operation got more than --threshold times slower.
+
+Usage:
+python run_benchmarks.py [--rows 1e4,1e5] [--repeat 3] [--repeat-customers 0.3]
+                         [--output results.json] [--compare baseline.json] [--threshold 1.5]
+
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_utils import APP_DIR, parse_sizes
+from csv_loader import write_storage_csv
+from generate_data import customer_fields, generate_rows
+from storage_core import StorageCore
+from validation import validate_item
+
+# Lookups, pages and validations done by one run of the operations that are too quick to time once
+LOOKUPS = 1000
+
+# Items added by one run of save and add_item
+ADDS = 1000
+
+
+def operations(path, rows, seed):
+    # (name, setup, run): setup() prepares what run(prepared) needs, untimed; run returns
+    # the number of operations it did
+    core = StorageCore(path)
+    core.load()
+    rng = random.Random(seed)
+    item_ids = rng.sample(range(1, rows + 1), min(LOOKUPS, rows))
+    emails = [record.email for record in core.records_for(item_ids)]
+    # the first itemID of every batch of new items
+    new_batches = itertools.count(rows + 1, ADDS)
+    fields = [[str(value) for value in row] for row in generate_rows(LOOKUPS, seed=seed + 1)]
+
+    def load(_prepared):
+        StorageCore(path).load()
+        return 1
+
+    def save_setup():
+        for row in generate_rows(ADDS, seed=seed, first_id=next(new_batches)):
+            core.add_item(*(str(value) for value in row))
+
+    def add_setup():
+        first = next(new_batches)
+        return [(first + number, *row[1:]) for number, row in enumerate(fields[:ADDS])]
+
+    def add(items):
+        for item in items:
+            core.add_item(*(str(value) for value in item))
+        return len(items)
+
+    def stock_report(_prepared):
+        core.stock_report()
+        return 1
+
+    def page(_prepared):
+        middle = len(core) // 2
+        for _count in range(LOOKUPS // 2):
+            core.page(0, 50)
+            core.page(middle, 50)
+        return LOOKUPS
+
+    def each(function, values):
+        def run(_prepared):
+            for value in values:
+                function(value)
+            return len(values)
+        return run
+
+    export_path = os.path.join(os.path.dirname(path), 'export.csv')
+    customers = [customer_fields(rng.randrange(rows))[3] for _count in range(LOOKUPS)]
+    return [
+        ("load", None, load),
+        ("save", save_setup, lambda _prepared: core.save()),
+        ("export", None, lambda _prepared: core.export(export_path)),
+        ("page", None, page),
+        ("most_recent", None, each(lambda _value: core.most_recent(10), range(LOOKUPS))),
+        ("validate", None, each(lambda row: validate_item(*row), fields)),
+        ("add_item", add_setup, add),
+        ("find_item", None, each(core.find_item, item_ids)),
+        ("search_email", None, each(lambda email: core.search("email", email), emails)),
+        ("find_customer", None, each(lambda email: core.find_customers("email", email), customers)),
+        ("quick_search", core.prepare_quick_search, each(core.quick_search, [email[:6] for email in customers])),
+        ("stock_report", None, stock_report),
+    ]
+
+
+def measure(setup, run, repeat):
+    """Return (operations, fastest seconds, peak bytes) of `repeat` timed runs and one traced run."""
+    best = None
+    for _count in range(repeat):
+        prepared = setup() if setup else None
+        start = time.perf_counter()
+        done = run(prepared)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    prepared = setup() if setup else None
+    tracemalloc.start()
+    try:
+        run(prepared)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return done, best, peak
+
+
+def commit():
+    # the commit the results came from, if the app is in a git checkout
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print how every time changed since the results in `baseline_path`. Returns the slower ones."""
+    with open(baseline_path) as file:
+        baseline = {(result["rows"], result["operation"]): result for result in json.load(file)["results"]}
+
+    slower = []
+    print(f"\n{'rows':>8} {'operation':>14} {'before (us)':>12} {'now (us)':>10} {'ratio':>7}")
+    for result in results:
+        before = baseline.get((result["rows"], result["operation"]))
+        if before is None:
+            continue
+        ratio = result["seconds_per_operation"] / before["seconds_per_operation"]
+        flag = "  slower" if ratio > threshold else ""
+        print(f"{result['rows']:>8} {result['operation']:>14} {before['seconds_per_operation'] * 1e6:>12.1f} "
+              f"{result['seconds_per_operation'] * 1e6:>10.1f} {ratio:>7.2f}{flag}")
+        if ratio > threshold:
+            slower.append(result)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_sizes, default=[10**4, 10**5])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of every operation; the fastest is kept")
+    parser.add_argument("--repeat-customers", type=float, default=0.3, help="share of items going to a returning customer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slow-down that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>8} {'operation':>14} {'ops':>6} {'seconds':>9} {'us/op':>10} {'peak (KiB)':>11}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'ProjectStorage.csv')
+            write_storage_csv(path, generate_rows(rows, args.repeat_customers, args.seed))
+            for name, setup, run in operations(path, rows, args.seed):
+                done, seconds, peak = measure(setup, run, args.repeat)
+                results.append({"rows": rows, "operation": name, "operations": done, "seconds": seconds,
+                                "seconds_per_operation": seconds / done, "peak_bytes": peak})
+                print(f"{rows:>8} {name:>14} {done:>6} {seconds:>9.4f} {seconds / done * 1e6:>10.1f} {peak / 1024:>11.0f}", flush=True)
+
+    with open(args.output, 'w') as file:
+        json.dump({
+            "commit": commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+            "repeat_customers": args.repeat_customers,
+            "results": results,
+        }, file, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}.")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
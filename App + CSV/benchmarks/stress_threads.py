@@ -0,0 +1,197 @@
+"""
+Thread stress test: several threads adding, deleting, moving stock, reading and saving at once.
+
+Every item's fields are worked out from its itemID (and its quantity stays a multiple of
+--step), so a reader that sees a record built half from one item and half from another, or a
+quantity between two moves, reports it straight away. The threads share one StorageCore:
+- writers: each adds, deletes and checks stock in and out for its own range of itemIDs
+- readers: find, search, quick search, page through, count and report on the whole store
+- saver: saves every few milliseconds, like the Autosaver
+- exporter: exports the storage to a CSV and checks every row of it
+Once the time is up it checks the store against what the writers did, then saves, loads
+the storage again into a new StorageCore and checks that the two agree.
+
+Exits with status 1 if anything was wrong.
+
+Usage:
+python stress_threads.py [--backend memory] [--seconds 5] [--writers 4] [--readers 4]
+
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import bench_utils  # noqa: F401 (puts the app folder on sys.path)
+from csv_loader import read_storage_csv
+from movements import CHECK_IN, CHECK_OUT
+from storage_core import BACKENDS, StorageCore, StorageError
+
+# itemIDs each writer owns
+RANGE = 1000000
+
+
+def letters(number):
+    # names may only hold letters, so numbers are spelled a-z
+    text = ""
+    while True:
+        number, digit = divmod(number, 26)
+        text += "abcdefghijklmnopqrstuvwxyz"[digit]
+        if not number:
+            return text
+
+
+def fields_for(itemID):
+    # everything but the quantity follows from the itemID
+    return ("Product" + letters(itemID % 97), "First" + letters(itemID % 13), "Last" + letters(itemID % 31),
+            f"555-{itemID % 1000:03}-{itemID % 10000:04}", f"user{itemID}@example.com")
+
+
+def check_record(record, step, problems):
+    product, first_name, last_name, phone_number, email = fields_for(record.itemID)
+    if (record.product, record.first_name, record.last_name, record.phone_number, record.email) != (product, first_name, last_name, phone_number, email):
+        problems.append(f"torn record {record}")
+    elif record.quantity % step:
+        problems.append(f"half-applied movement {record}")
+
+
+def writer(core, number, stop, step, expected, problems):
+    rng = random.Random(number)
+    mine = {}
+    next_id = number * RANGE
+    try:
+        while not stop.is_set():
+            choice = rng.random()
+            if choice < 0.45 or not mine:
+                quantity = step * rng.randrange(1, 50)
+                product, first_name, last_name, phone_number, email = fields_for(next_id)
+                core.add_item(str(next_id), product, str(quantity), first_name, last_name, phone_number, email)
+                mine[next_id] = quantity
+                next_id += 1
+            elif choice < 0.65:
+                itemID = rng.choice(list(mine))
+                core.delete_item(itemID)
+                del mine[itemID]
+            else:
+                # two moves of half a step each, applied together, so the quantity stays a multiple of step
+                itemID = rng.choice(list(mine))
+                kind = CHECK_IN if rng.random() < 0.5 or mine[itemID] < step else CHECK_OUT
+                moved = core.move_stock([(itemID, kind, step // 2), (itemID, kind, step - step // 2)])
+                mine[itemID] = moved[-1]
+    except Exception as error:
+        problems.append(f"writer {number}: {error!r}")
+    expected.update(mine)
+
+
+def reader(core, number, stop, step, problems):
+    rng = random.Random(-number - 1)
+    reads = 0
+    try:
+        while not stop.is_set():
+            choice = rng.random()
+            if choice < 0.3:
+                itemID = rng.randrange(RANGE * 4)
+                try:
+                    check_record(core.find_item(itemID), step, problems)
+                except StorageError:
+                    pass
+            elif choice < 0.4:
+                _total, records = core.search("email", f"user{rng.randrange(RANGE * 4)}@example.com")
+                for record in records:
+                    check_record(record, step, problems)
+            elif choice < 0.5:
+                for record in core.quick_search(f"user{rng.randrange(RANGE * 4)}"):
+                    check_record(record, step, problems)
+            elif choice < 0.8:
+                size = len(core)
+                for record in core.page(rng.randrange(size + 1), 50):
+                    check_record(record, step, problems)
+            elif choice < 0.9:
+                report = core.stock_report(5, step)
+                if report["total_units"] % step:
+                    problems.append(f"total units {report['total_units']} caught part of a movement")
+            else:
+                for record in core.most_recent(20):
+                    check_record(record, step, problems)
+            reads += 1
+    except Exception as error:
+        problems.append(f"reader {number}: {error!r}")
+    return reads
+
+
+def saver(core, stop, problems):
+    try:
+        while not stop.is_set():
+            core.save()
+            time.sleep(0.005)
+    except Exception as error:
+        problems.append(f"saver: {error!r}")
+
+
+def exporter(core, folder, stop, step, problems):
+    path = os.path.join(folder, 'export.csv')
+    try:
+        while not stop.is_set():
+            core.export(path)
+            for row in read_storage_csv(path):
+                if tuple(row[i] for i in (1, 3, 4, 5, 6)) != fields_for(row[0]) or row[2] % step:
+                    problems.append(f"torn export row {row}")
+                    return
+    except Exception as error:
+        problems.append(f"exporter: {error!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="memory", choices=BACKENDS)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--step", type=int, default=10, help="every quantity is a multiple of this")
+    args = parser.parse_args()
+
+    # switch threads often so the operations really interleave
+    sys.setswitchinterval(1e-5)
+
+    problems = []
+    expected = {}
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'ProjectStorage.csv')
+        core = StorageCore(path, args.backend)
+        stop = threading.Event()
+        threads = [threading.Thread(target=writer, args=(core, number + 1, stop, args.step, expected, problems))
+                   for number in range(args.writers)]
+        threads += [threading.Thread(target=reader, args=(core, number, stop, args.step, problems)) for number in range(args.readers)]
+        threads.append(threading.Thread(target=saver, args=(core, stop, problems)))
+        threads.append(threading.Thread(target=exporter, args=(core, folder, stop, args.step, problems)))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        stored = {record.itemID: record.quantity for record in core.page(0, len(core))}
+        if stored != expected:
+            problems.append(f"store holds {len(stored)} items, the writers left {len(expected)}")
+        core.save()
+        reloaded = StorageCore(path, args.backend)
+        reloaded.load()
+        if {record.itemID: record.quantity for record in reloaded.page(0, len(reloaded))} != stored:
+            problems.append("the saved storage does not match the store")
+        movements = sum(1 for _movement in core.movements.read())
+        if args.backend == 'sqlite':
+            reloaded.store.close()
+            core.store.close()
+
+    print(f"{args.backend}: {len(expected)} items left, {movements} movements logged, {len(problems)} problems")
+    for problem in problems[:20]:
+        print("  " + problem)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
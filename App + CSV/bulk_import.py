@@ -0,0 +1,391 @@
+import csv
+import io
+import locale
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from csv_loader import CSV_HEADER, column_positions, detect_compression, open_storage_file
+from validation import validate_batch
+
+
+# Rows validated together
+IMPORT_BATCH_SIZE = 10000
+
+# Worker processes that parse and validate an import; 1 keeps everything on the import's thread
+IMPORT_WORKERS = os.cpu_count() or 1
+
+# How worker processes are started: a fresh interpreter rather than a fork of the app, which
+# runs the window, the autosaver and the service on other threads (a fork copies their locks
+# in whatever state they are in)
+WORKER_START_METHOD = 'spawn'
+
+# Imports smaller than this are not worth starting worker processes for, and files are only
+# split into byte ranges of at least this size
+PARALLEL_MIN_BYTES = 4 * 2**20
+
+# Where rejected rows are written, next to ProjectStorage.csv
+REJECTS_PATH = 'ImportRejects.csv'
+
+# Columns of the rejects file: the item's columns, then where the row came from and why it was rejected
+REJECTS_HEADER = CSV_HEADER + ['Source File', 'Line', 'Reason']
+
+# Why a row whose itemID is already stored, or earlier in the import, is rejected
+ITEM_ID_IN_USE = "ItemID is already in use."
+
+
+class BulkImporter(threading.Thread):
+
+    """
+    Bulk import of one or more CSV files into the storage system.
+
+    An import runs in two steps. `prepare` (the thread's work when started) streams every file
+    with a plain csv.reader, validates the rows IMPORT_BATCH_SIZE at a time with
+    `validate_batch`, and rejects rows whose itemID is already in the store or earlier in the
+    import. Valid rows are only staged. `commit` then adds all staged rows to the store in one
+    go, on the caller's thread, so the store never holds half an import.
+
+    Rejected rows are written to `rejects_path` with the file, line and reason, instead of
+    popping a messagebox for each.
+
+    With more than one worker, and at least PARALLEL_MIN_BYTES to read, the files are cut
+    into byte ranges at line boundaries (see `split_ranges`) and parsed and validated in a
+    process pool. The ranges are merged back in file and line order, so the outcome is the
+    same as reading the files one after another: when an itemID appears more than once, the
+    first row wins and the later ones are rejected, whatever order the workers finish in.
+    A compressed file (gzip, bz2 or lzma, see open_storage_file) cannot be cut into byte
+    ranges, so an import with one is read in a single stream instead.
+
+    Parameters:
+    - paths (list): The CSV files to import, in order.
+    - in_use (callable): Returns whether an itemID is already in the store (e.g. store.__contains__).
+    - rejects_path (str): The CSV file rejected rows are written to.
+    - batch_size (int): The number of rows validated together.
+    - workers (int): The number of worker processes.
+
+    Example:
+    importer = BulkImporter(['site1.csv', 'site2.csv'], store.__contains__)
+    importer.prepare()
+    importer.commit(store)
+    print(importer.summary())
+
+    """
+
+    def __init__(self, paths, in_use, rejects_path=REJECTS_PATH, batch_size=IMPORT_BATCH_SIZE, workers=IMPORT_WORKERS):
+        super().__init__(daemon=True)
+        self.paths = list(paths)
+        self.in_use = in_use
+        self.rejects_path = rejects_path
+        self.batch_size = batch_size
+        self.workers = workers
+
+        # valid rows waiting for `commit`, as store tuples
+        self.rows = []
+        self._staged_ids = set()
+
+        # progress and results
+        self.files_done = 0
+        self.rows_read = 0
+        self.rejected = 0
+        self.imported = 0
+        self.seconds = 0.0
+        self.error = None
+        self.finished = threading.Event()
+        self._cancelled = threading.Event()
+        self._rejects = None
+        self._rejects_file = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop preparing; nothing is committed for a cancelled import."""
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            self.prepare()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.finished.set()
+
+    def prepare(self):
+        """Read, validate and stage every file. Returns the number of staged rows."""
+        start = time.perf_counter()
+        try:
+            if self.workers > 1 and sum(os.path.getsize(path) for path in self.paths) >= PARALLEL_MIN_BYTES \
+                    and not any(self._compressed(path) for path in self.paths):
+                self._prepare_parallel()
+            else:
+                for path in self.paths:
+                    self._prepare_file(path)
+                    if self.cancelled:
+                        break
+                    self.files_done += 1
+        finally:
+            self._close_rejects()
+            self.seconds += time.perf_counter() - start
+        return len(self.rows)
+
+    @staticmethod
+    def _compressed(path):
+        with open(path, 'rb') as file:
+            return detect_compression(file) is not None
+
+    def _prepare_file(self, path):
+        with open_storage_file(path) as file:
+            csv_reader = csv.reader(file)
+            header = next(csv_reader, None)
+            if header is None:
+                return
+            positions = column_positions(header, path)
+            needed = max(positions) + 1
+
+            batch, lines = [], []
+            for line_number, row in enumerate(csv_reader, start=2):
+                # skip blank lines
+                if not row:
+                    continue
+                # a short row is kept as an empty one, which validates as incomplete
+                batch.append([row[i] for i in positions] if len(row) >= needed else [])
+                lines.append(line_number)
+
+                if len(batch) >= self.batch_size:
+                    self._check_batch(path, batch, lines)
+                    batch, lines = [], []
+                    if self.cancelled:
+                        return
+            if batch:
+                self._check_batch(path, batch, lines)
+
+    def _prepare_parallel(self):
+        with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(WORKER_START_METHOD)) as pool:
+            # every range of every file is queued up front, then merged strictly in order
+            plans = []
+            for path in self.paths:
+                header, ranges = split_ranges(path, self.workers)
+                if header is None:
+                    plans.append((path, []))
+                    continue
+                positions = column_positions(header, path)
+                plans.append((path, [pool.submit(parse_range, path, start, end, positions, self.batch_size) for start, end in ranges]))
+
+            try:
+                for path, futures in plans:
+                    line = 2
+                    for future in futures:
+                        entries, records = future.result()
+                        self._merge_range(path, line, entries)
+                        line += records
+                        if self.cancelled:
+                            return
+                    self.files_done += 1
+            finally:
+                pool.shutdown(cancel_futures=True)
+
+    def _merge_range(self, path, first_line, entries):
+        # stage the valid rows of one range and reject the rest, like _check_batch does
+        staged_ids = self._staged_ids
+        in_use = self.in_use
+        for entry in entries:
+            if len(entry) == 3:
+                offset, fields, message = entry
+                self.rows_read += 1
+                self._reject(fields, path, first_line + offset, message)
+                continue
+            offset, row = entry
+            self.rows_read += 1
+            itemID = row[0]
+            if itemID in staged_ids or in_use(itemID):
+                self._reject([str(value) for value in row], path, first_line + offset, ITEM_ID_IN_USE)
+            else:
+                staged_ids.add(itemID)
+                self.rows.append(row)
+
+    def _check_batch(self, path, batch, lines):
+        self.rows_read += len(batch)
+        errors = dict(validate_batch(batch))
+        staged_ids = self._staged_ids
+        in_use = self.in_use
+        for position, fields in enumerate(batch):
+            error = errors.get(position)
+            if error is not None:
+                self._reject(fields, path, lines[position], error.message)
+                continue
+            itemID = int(fields[0])
+            if itemID in staged_ids or in_use(itemID):
+                self._reject(fields, path, lines[position], ITEM_ID_IN_USE)
+            else:
+                staged_ids.add(itemID)
+                self.rows.append((itemID, fields[1], int(fields[2]), fields[3], fields[4], fields[5], fields[6]))
+
+    def _reject(self, fields, path, line, reason):
+        # the rejects file is only created once there is something to put in it
+        if self._rejects is None:
+            self._rejects_file = open(self.rejects_path, 'a' if self.rejected else 'w', newline='')
+            self._rejects = csv.writer(self._rejects_file)
+            if not self.rejected:
+                self._rejects.writerow(REJECTS_HEADER)
+        padded = list(fields) + [''] * (len(CSV_HEADER) - len(fields))
+        self._rejects.writerow(padded + [path, line, reason])
+        self.rejected += 1
+
+    def _close_rejects(self):
+        if self._rejects_file is not None:
+            self._rejects_file.close()
+            self._rejects_file = self._rejects = None
+
+    def commit(self, store, journal=None, changes=None):
+        """
+        Add every staged row to the store in one go.
+
+        Rows whose itemID was added to the store while the import was being prepared are
+        rejected now. The rows go in through `store.add_many`, which adds all of them or none.
+
+        Parameters:
+        - store (StorageStore or SqliteStore): The store to add the rows to.
+        - journal (Journal): Records the added rows for the next save, if given.
+        - changes (ChangeLog): Numbers the added rows for downstream systems, if given.
+
+        Returns the number of rows imported.
+
+        """
+        start = time.perf_counter()
+        rows = self.rows
+        if any(row[0] in store for row in rows):
+            rows = []
+            for row in self.rows:
+                if row[0] in store:
+                    self._reject(row, '', '', ITEM_ID_IN_USE)
+                else:
+                    rows.append(row)
+            self._close_rejects()
+
+        store.add_many(rows)
+        if journal is not None:
+            for row in rows:
+                journal.record_add(row)
+        if changes is not None:
+            for row in rows:
+                changes.record_add(row)
+
+        self.imported = len(rows)
+        self.rows = []
+        self._staged_ids = set()
+        self.seconds += time.perf_counter() - start
+        return self.imported
+
+    def summary(self):
+        """Describe the import in a few lines for the summary dialog."""
+        rate = self.rows_read / self.seconds if self.seconds else 0.0
+        lines = [
+            f"Imported {self.imported} of {self.rows_read} rows from {self.files_done} of {len(self.paths)} file(s).",
+            f"Took {self.seconds:.2f} seconds ({rate:,.0f} rows per second).",
+        ]
+        if self.rejected:
+            lines.append(f"Rejected {self.rejected} rows; see {self.rejects_path} for the reasons.")
+        return "\n".join(lines)
+
+
+def split_ranges(path, parts):
+
+    """
+    Cut a CSV file into about `parts` byte ranges that start and end at line boundaries.
+
+    Ranges are at least PARALLEL_MIN_BYTES long, so a small file stays in one piece. The
+    header line is left out of every range. A field with a quoted line break that happens to
+    straddle a cut is split in two; both halves then fail validation and are rejected, so
+    nothing is imported wrongly.
+
+    Parameters:
+    - path (str): The CSV file.
+    - parts (int): The number of ranges wanted.
+
+    Returns (header, ranges): the parsed header row (None for an empty file) and a list of
+    (start, end) byte offsets.
+
+    """
+
+    with open(path, 'rb') as file:
+        header_line = file.readline()
+        if not header_line.strip():
+            return None, []
+        data_start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        parts = max(1, min(parts, (size - data_start) // PARALLEL_MIN_BYTES))
+
+        bounds = [data_start]
+        for part in range(1, parts):
+            # move to the start of the first line at or after the cut
+            file.seek(data_start + (size - data_start) * part // parts - 1)
+            file.readline()
+            cut = file.tell()
+            if bounds[-1] < cut < size:
+                bounds.append(cut)
+        bounds.append(size)
+
+    header = next(csv.reader([header_line.decode(locale.getpreferredencoding(False))]))
+    return header, list(zip(bounds, bounds[1:]))
+
+
+def parse_range(path, start, end, positions, batch_size=IMPORT_BATCH_SIZE):
+
+    """
+    Parse and validate one byte range of a CSV file, in a worker process.
+
+    Parameters:
+    - path (str): The CSV file.
+    - start, end (int): The byte range, from `split_ranges`.
+    - positions (list): Where each CSV_HEADER column is in the file (see column_positions).
+    - batch_size (int): The number of rows validated together.
+
+    Returns (entries, records). `entries` holds, in file order, (offset, row) for a valid
+    row as a store tuple and (offset, fields, reason) for a rejected one, where offset counts
+    records from the start of the range. `records` is the number of records in the range,
+    blank lines included, for numbering the lines of the next range.
+
+    """
+
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    csv_reader = csv.reader(io.StringIO(data.decode(locale.getpreferredencoding(False)), newline=''))
+    needed = max(positions) + 1
+
+    entries = []
+    batch, offsets = [], []
+    records = 0
+    # products and names repeat from row to row; sharing one string per value lets pickle
+    # send each of them back to the parent once
+    shared = {}
+    share = shared.setdefault
+
+    def check(batch, offsets):
+        errors = dict(validate_batch(batch))
+        for position, fields in enumerate(batch):
+            error = errors.get(position)
+            if error is None:
+                product, first_name, last_name = fields[1], fields[3], fields[4]
+                row = (int(fields[0]), share(product, product), int(fields[2]), share(first_name, first_name),
+                       share(last_name, last_name), fields[5], fields[6])
+                entries.append((offsets[position], row))
+            else:
+                entries.append((offsets[position], fields, error.message))
+
+    for offset, row in enumerate(csv_reader):
+        records += 1
+        if not row:
+            continue
+        batch.append([row[i] for i in positions] if len(row) >= needed else [])
+        offsets.append(offset)
+        if len(batch) >= batch_size:
+            check(batch, offsets)
+            batch, offsets = [], []
+    if batch:
+        check(batch, offsets)
+    return entries, records
+
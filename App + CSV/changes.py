@@ -0,0 +1,297 @@
+import csv
+import io
+import json
+import os
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from csv_loader import CSV_HEADER
+
+
+# Kinds of change, as stored in the log
+CHANGE_ADD = 'add'
+CHANGE_DELETE = 'delete'
+CHANGE_QUANTITY = 'quantity'
+
+# One change: its sequence number, when it was made, its kind and the item's fields in
+# CSV_HEADER order. A delete only carries the itemID and a quantity change the itemID and
+# the new quantity; the fields it does not carry are None.
+CHANGE_HEADER = ["sequence", "time", "change"] + CSV_HEADER
+Change = namedtuple("Change", ["sequence", "time", "change", "itemID", "product", "quantity", "first_name", "last_name", "phone_number", "email"])
+
+# Formats `ChangeLog.export` writes: CSV with CHANGE_HEADER, or one JSON object per line
+CHANGE_FORMATS = ('csv', 'jsonl')
+
+# Below this many bytes between the bounds, `ChangeLog.read` stops bisecting and scans
+SCAN_BYTES = 64 * 2**10
+
+
+def change_json(change):
+    """Return a Change as a dict for JSON, without the fields it does not carry."""
+    return {name: value for name, value in zip(Change._fields, change) if value is not None}
+
+
+@contextmanager
+def locked(file):
+    """Hold an exclusive lock on an open file until the block ends, waiting for other processes that hold it."""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield file
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        # msvcrt locks a byte range from the current position; every writer locks the first byte
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield file
+        finally:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def read_tail(file):
+    """Return (bytes, sequence) of an open change log: its size without a torn last line, and the sequence number of its last line."""
+    end = file.seek(0, os.SEEK_END)
+    # read back from the end until the chunk holds the last whole line
+    chunk = 4096
+    while True:
+        start = max(end - chunk, 0)
+        file.seek(start)
+        data = file.read(end - start)
+        last = data.rfind(b'\n')
+        first = data.rfind(b'\n', 0, last) if last > 0 else -1
+        if first >= 0 or start == 0:
+            break
+        chunk *= 2
+    if last < 0:
+        return 0, 0
+    return start + last + 1, int(data[first + 1:last].split(b',', 1)[0])
+
+
+class ChangeLog:
+
+    """
+    Append-only log of every change to the items, numbered for downstream systems.
+
+    Every add, delete and quantity change gets the next sequence number and is written as
+    one CSV line in CHANGE_HEADER order to '<storage>.changes' (without a header). Like the
+    MovementLog, changes are buffered in memory, appended by each save and never rewritten,
+    so a system mirroring the storage can ask for everything after the last sequence number
+    it has seen instead of reading the whole ProjectStorage.csv again. Sequence numbers
+    grow with the file, so `read` finds where to start by bisecting it, and an export costs
+    O(changes since) whatever the size of the storage.
+
+    Only saved changes are read back, and a change only gets its sequence number when a save
+    writes it. The save locks the file and carries on from the last line in it, so the
+    window, the service and the command line can all save to the same log without handing
+    out a number twice or losing each other's changes.
+
+    Parameters:
+    - path (str): The log file, e.g. 'ProjectStorage.changes'.
+
+    Example:
+    log = ChangeLog('ProjectStorage.changes')
+    log.record_delete(42)
+    log.flush()
+    log.export(sys.stdout, since=0, format='jsonl')
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        # lines recorded but not yet written to the log file
+        self._pending = io.StringIO()
+        self._writer = csv.writer(self._pending)
+        self.pending_entries = 0
+
+        # bytes of whole lines in the log file and its last sequence number, as of the last
+        # time this log opened or wrote it
+        try:
+            with open(self.path, 'rb') as file:
+                self.saved_bytes, self.saved_sequence = read_tail(file)
+        except FileNotFoundError:
+            self.saved_bytes, self.saved_sequence = 0, 0
+
+    @property
+    def last_sequence(self):
+        """The sequence number the last recorded change gets if nothing else saves to the log first."""
+        return self.saved_sequence + self.pending_entries
+
+    def _record(self, change, fields):
+        # numbered by `write`; the line is everything after the sequence number
+        self._writer.writerow((f"{time.time():.6f}", change, *fields))
+        self.pending_entries += 1
+
+    def record_add(self, record):
+        """
+        Record an added item.
+
+        Parameters:
+        - record (sequence): The item's fields in CSV_HEADER order.
+
+        """
+        return self._record(CHANGE_ADD, record)
+
+    def record_delete(self, itemID):
+        """Record a deleted item."""
+        return self._record(CHANGE_DELETE, (itemID, '', '', '', '', '', ''))
+
+    def record_quantity(self, itemID, quantity):
+        """Record an item's new quantity."""
+        return self._record(CHANGE_QUANTITY, (itemID, '', quantity, '', '', '', ''))
+
+    def flush(self):
+        """
+        Append the recorded changes to the log file and fsync it.
+
+        Returns the number of changes written.
+
+        """
+        return self.write(*self.take_pending())
+
+    def take_pending(self):
+        """Hand over the recorded changes as (text, entries) for `write` and start a new batch."""
+        batch = self._pending.getvalue(), self.pending_entries
+        self._pending.seek(0)
+        self._pending.truncate()
+        self.pending_entries = 0
+        return batch
+
+    def restore_pending(self, text, entries):
+        """Put a batch from `take_pending` that could not be written back in front of the current one."""
+        newer = self._pending.getvalue()
+        self._pending.seek(0)
+        self._pending.truncate()
+        self._pending.write(text + newer)
+        self.pending_entries += entries
+
+    def write(self, text, entries):
+        """
+        Number a batch from `take_pending`, append it to the log file and fsync it.
+
+        The file is locked while it is written, and the batch is numbered from the last line
+        in the file, which another process may have written since this log last looked.
+
+        Returns the number of changes written.
+
+        """
+        if not entries:
+            return 0
+
+        with open(self.path, 'a+b') as file, locked(file):
+            size, sequence = read_tail(file)
+            # a last line without its line break was left by a save that crashed (saves hold
+            # the lock), so it is dropped and every line starts with its sequence number
+            if file.seek(0, os.SEEK_END) != size:
+                file.truncate(size)
+            # every change is one line: item fields never hold line breaks (see validate_item)
+            lines = text.split('\r\n')[:-1]
+            data = ''.join(f"{number},{line}\r\n" for number, line in enumerate(lines, sequence + 1)).encode('utf-8')
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.saved_bytes = size + len(data)
+        self.saved_sequence = sequence + len(lines)
+        return entries
+
+    def read(self, since=0, limit=None):
+        """
+        Yield the saved changes with a sequence number above `since`, oldest first, as CSV lines.
+
+        Parameters:
+        - since (int): The last sequence number already seen; 0 for every change.
+        - limit (int): The most changes to yield; None for all of them.
+
+        """
+        if limit == 0:
+            return
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+
+        with file:
+            # up to the last whole line, including changes other processes saved
+            end, last = read_tail(file)
+            if since >= last:
+                return
+
+            # bisect for the first line after `since`; everything before `low` is at or below it
+            low, high = 0, end
+            while high - low > SCAN_BYTES:
+                middle = (low + high) // 2
+                file.seek(middle)
+                file.readline()
+                position = file.tell()
+                line = file.readline()
+                if position < end and line.endswith(b'\n') and int(line.split(b',', 1)[0]) <= since:
+                    low = position + len(line)
+                else:
+                    high = middle
+
+            file.seek(low)
+            position = low
+            yielded = 0
+            for line in file:
+                position += len(line)
+                if position > end:
+                    break
+                if int(line.split(b',', 1)[0]) <= since:
+                    continue
+                yield line.decode('utf-8')
+                yielded += 1
+                if yielded == limit:
+                    break
+
+    def changes(self, since=0, limit=None):
+        """Yield the saved changes after `since` as Change tuples (see `read`)."""
+        for sequence, when, change, itemID, product, quantity, first, last, phone, email in csv.reader(self.read(since, limit)):
+            yield Change(int(sequence), float(when), change, int(itemID), product or None,
+                         int(quantity) if quantity else None, first or None, last or None, phone or None, email or None)
+
+    def export(self, out, since=0, format='csv', limit=None):
+        """
+        Write the saved changes after `since` to an open text file.
+
+        CSV starts with a CHANGE_HEADER line and copies the log's lines as they are; JSON
+        Lines writes one object per change, leaving out the fields it does not carry.
+
+        Parameters:
+        - out (file): Where to write, opened with newline='' for CSV.
+        - since (int): The last sequence number already seen; 0 for every change.
+        - format (str): One of CHANGE_FORMATS.
+        - limit (int): The most changes to write; None for all of them.
+
+        Returns (changes, last), the number of changes written and the sequence number to
+        pass as `since` next time.
+
+        """
+        if format not in CHANGE_FORMATS:
+            raise ValueError(f"Unknown change format {format!r}; use one of {', '.join(CHANGE_FORMATS)}.")
+
+        written = 0
+        last = since
+        if format == 'csv':
+            csv.writer(out).writerow(CHANGE_HEADER)
+            for line in self.read(since, limit):
+                out.write(line)
+                written += 1
+                last = int(line.split(',', 1)[0])
+        else:
+            for change in self.changes(since, limit):
+                out.write(json.dumps(change_json(change)) + '\n')
+                written += 1
+                last = change.sequence
+        return written, last
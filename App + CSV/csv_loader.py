@@ -0,0 +1,394 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+import queue
+import shutil
+import tempfile
+import threading
+
+
+# Column names of ProjectStorage.csv, in the order StorageStore takes them
+CSV_HEADER = ['itemID', 'Product', 'Quantity', 'First Name', 'Last Name', 'Phonenumber', 'Email']
+
+# Rows handed over to the window in one go
+CHUNK_SIZE = 5000
+
+# Chunks allowed to wait in the queue before the reader pauses
+MAX_PENDING_CHUNKS = 8
+
+# Compressed formats a storage CSV can be read from and written to: the extension that picks
+# each one for a new file, the magic bytes that give it away in an existing one, the levels
+# it takes and the level used unless another is picked (gzip's own default, 9, is slow for
+# little gain, so 6 like the gzip command)
+COMPRESSIONS = ('gzip', 'bz2', 'lzma')
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.gzip': 'gzip', '.bz2': 'bz2', '.xz': 'lzma', '.lzma': 'lzma'}
+COMPRESSION_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'lzma'), (b'\x5d\x00\x00', 'lzma'))
+COMPRESSION_LEVELS = {'gzip': range(0, 10), 'bz2': range(1, 10), 'lzma': range(0, 10)}
+DEFAULT_COMPRESSION_LEVELS = {'gzip': 6, 'bz2': 9, 'lzma': 6}
+
+# Bytes a compressed file is read or written in at a time, so the codec works on large
+# chunks rather than on every row
+STREAM_BUFFER = 2**20
+
+# Permissions open() gives a new file: read and write for whoever the umask allows. The umask
+# can only be read by setting it, so it is read once, on import, rather than on every write.
+UMASK = os.umask(0)
+os.umask(UMASK)
+NEW_FILE_MODE = 0o666 & ~UMASK
+
+
+def compression_for_name(path):
+    """Return the compression a file name asks for by its extension ('ProjectStorage.csv.gz' -> 'gzip'), or None."""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def detect_compression(file):
+    """Return the compression of an open binary file from its first bytes, or None for a plain one. Leaves it at the start."""
+    start = file.read(6)
+    file.seek(0)
+    for magic, compression in COMPRESSION_MAGIC:
+        if start.startswith(magic):
+            return compression
+    return None
+
+
+def compression_for_write(path):
+    """Return the compression to write `path` with: the one its extension asks for, else the one the file already has."""
+    compression = compression_for_name(path)
+    if compression is None:
+        try:
+            with open(path, 'rb') as file:
+                compression = detect_compression(file)
+        except FileNotFoundError:
+            pass
+    return compression
+
+
+class StorageFile(io.TextIOWrapper):
+
+    """
+    Text stream over a storage CSV file that may be compressed (see `open_storage_file`).
+
+    Closing it finishes the compressed data and closes the file. `compressed_position` is
+    how far into the file itself (not the text) it has got, for progress bars.
+
+    """
+
+    def __init__(self, file, binary):
+        super().__init__(binary, newline='')
+        self.file = file
+
+    def compressed_position(self):
+        return self.file.tell()
+
+    def sync(self):
+        """Finish the compressed data and fsync the file, before it is moved into place."""
+        self.flush()
+        if self.buffer is not self.file:
+            # closes the codec, which writes its last block; the file stays open
+            self.buffer.close()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.file.close()
+
+
+def open_storage_file(file, mode='r', compression=None, level=None):
+
+    """
+    Open a storage CSV file as text, through a compression codec if it is compressed.
+
+    The codec reads and writes the file STREAM_BUFFER bytes at a time and the rows stream
+    through it, so a compressed file is never held in memory whole.
+
+    Parameters:
+    - file (str): The file name.
+    - mode (str): 'r' to read; the compression is told by the file's first bytes (see
+      `detect_compression`), whatever its name. 'w' to write.
+    - compression (str): When writing, one of COMPRESSIONS, or None for a plain file (see
+      `compression_for_write`).
+    - level (int): When writing, the compression level within COMPRESSION_LEVELS; None for
+      DEFAULT_COMPRESSION_LEVELS.
+
+    Returns a StorageFile. Raises ValueError for an unknown compression or a level it does
+    not take.
+
+    Example:
+    with open_storage_file('ProjectStorage.csv.gz') as text:
+        header = next(csv.reader(text))
+
+    """
+
+    if mode == 'w' and compression is not None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; use one of {', '.join(COMPRESSIONS)}.")
+        levels = COMPRESSION_LEVELS[compression]
+        if level is None:
+            level = DEFAULT_COMPRESSION_LEVELS[compression]
+        if level not in levels:
+            raise ValueError(f"{compression} compression levels go from {levels.start} to {levels.stop - 1}.")
+
+    binary = open(file, mode + 'b', buffering=STREAM_BUFFER)
+    try:
+        if mode == 'r':
+            compression = detect_compression(binary)
+            if compression == 'gzip':
+                codec = gzip.GzipFile(fileobj=binary, mode='rb')
+            elif compression == 'bz2':
+                codec = bz2.BZ2File(binary, 'rb')
+            elif compression == 'lzma':
+                codec = lzma.LZMAFile(binary, 'rb')
+            else:
+                return StorageFile(binary, binary)
+            return StorageFile(binary, io.BufferedReader(codec, STREAM_BUFFER))
+
+        if compression == 'gzip':
+            # no file name or time in the header, so the same rows always give the same bytes
+            codec = gzip.GzipFile(filename='', fileobj=binary, mode='wb', compresslevel=level, mtime=0)
+        elif compression == 'bz2':
+            codec = bz2.BZ2File(binary, 'wb', compresslevel=level)
+        elif compression == 'lzma':
+            codec = lzma.LZMAFile(binary, 'wb', preset=level)
+        else:
+            return StorageFile(binary, binary)
+        return StorageFile(binary, io.BufferedWriter(codec, STREAM_BUFFER))
+    except BaseException:
+        binary.close()
+        raise
+
+
+def column_positions(header, path):
+
+    """
+    Find where each CSV_HEADER column is in a file's header row.
+
+    Parameters:
+    - header (list): The first row of the file.
+    - path (str): The file name, used in the error message.
+
+    Returns the list of positions in CSV_HEADER order.
+    Raises ValueError if a column is missing.
+
+    """
+
+    missing = [name for name in CSV_HEADER if name not in header]
+    if missing:
+        raise ValueError(f"{path} is missing the column(s): {', '.join(missing)}")
+    return [header.index(name) for name in CSV_HEADER]
+
+
+def storage_rows(csv_reader, positions, path):
+
+    """
+    Yield the rows of a storage CSV as store tuples.
+
+    Each row becomes (itemID, product, quantity, first name, last name, phone number, email)
+    with integer itemID and quantity. Blank lines are skipped.
+
+    An itemID with leading zeros is refused rather than read as the number, since "007" and
+    "7" would then be the same item and a save would write it back as "7".
+
+    Parameters:
+    - csv_reader (csv.reader): A reader positioned just after the header row.
+    - positions (list): The column positions from `column_positions`.
+    - path (str): The file name, used in the error message.
+
+    Raises ValueError for a row that cannot be read.
+
+    """
+
+    i_item, i_product, i_quantity, i_first, i_last, i_phone, i_email = positions
+    for line_number, row in enumerate(csv_reader, start=2):
+        # skip blank lines
+        if not row:
+            continue
+        try:
+            item = row[i_item]
+            record = (int(item), row[i_product], int(row[i_quantity]), row[i_first], row[i_last], row[i_phone], row[i_email])
+        except (ValueError, IndexError):
+            raise ValueError(f"Line {line_number} of {path} is not a valid storage row.")
+        if item[0] == '0' and len(item) > 1:
+            raise ValueError(f"Line {line_number} of {path} has itemID {item}, which starts with 0. "
+                             "ItemIDs are stored as numbers; please write it without the leading zeros.")
+        yield record
+
+
+def read_storage_csv(path):
+
+    """
+    Yield every row of a storage CSV file as a store tuple, on the calling thread.
+
+    Parameters:
+    - path (str): The CSV file to read, plain or compressed (see `open_storage_file`).
+
+    Example:
+    store.put_many(read_storage_csv('ProjectStorage.csv'))
+
+    """
+
+    with open_storage_file(path) as file:
+        csv_reader = csv.reader(file)
+        header = next(csv_reader, None)
+        if header is None:
+            return
+        yield from storage_rows(csv_reader, column_positions(header, path), path)
+
+
+def copy_mode(path, temp_path):
+    # give a temp file made by mkstemp (always 0600) the permissions of the file it is about to
+    # replace, or the ones a new file would get if there is none yet
+    if os.path.exists(path):
+        shutil.copymode(path, temp_path)
+    else:
+        os.chmod(temp_path, NEW_FILE_MODE)
+
+
+def write_storage_csv(path, rows, compression=None, level=None):
+
+    """
+    Write rows to a storage CSV file with the CSV_HEADER header.
+
+    The file is written to a temp file first and then moved into place, so an existing
+    file is never left half written. A name ending in .gz, .bz2 or .xz (see
+    COMPRESSION_EXTENSIONS) writes a compressed file, as does rewriting a file that is
+    already compressed.
+
+    Parameters:
+    - path (str): The CSV file to write.
+    - rows (iterable): Store tuples or StorageRecords.
+    - compression (str): One of COMPRESSIONS, or 'none', in place of the one the name asks for.
+    - level (int): The compression level (see `open_storage_file`).
+
+    Returns the number of rows written.
+
+    """
+
+    if compression is None:
+        compression = compression_for_write(path)
+    elif compression == 'none':
+        compression = None
+    folder = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix='.export-', suffix='.tmp', dir=folder)
+    os.close(handle)
+    written = 0
+    try:
+        with open_storage_file(temp_path, 'w', compression, level) as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        copy_mode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return written
+
+
+class CsvLoader(threading.Thread):
+
+    """
+    Background reader that streams a storage CSV file in chunks.
+
+    The header is read once and the position of every column is resolved up front, so each
+    row is unpacked from a plain csv.reader list instead of a dict. Rows are converted to
+    (itemID, product, quantity, first name, last name, phone number, email) tuples with
+    integer itemID and quantity, then put on `chunks` in lists of `chunk_size` rows.
+    A None on the queue marks the end of the load, whether it finished, failed or was cancelled.
+
+    The reader never touches the store or any widget; the window drains `chunks` itself
+    (through `window.after` polling) so all updates stay on the Tk thread.
+
+    Parameters:
+    - path (str): The CSV file to read, plain or compressed (see `open_storage_file`).
+    - chunk_size (int): The number of rows per chunk.
+
+    Example:
+    loader = CsvLoader('ProjectStorage.csv')
+    loader.start()
+    loader.cancel()  # stops the load after the current chunk
+
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        super().__init__(daemon=True)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.chunks = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+
+        # progress, read by the window while the load runs
+        self.total_bytes = 0
+        self.bytes_read = 0
+        self.rows_read = 0
+
+        # set once the load is over; error holds the exception if it failed
+        self.error = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Ask the reader to stop after the chunk it is working on."""
+        self._cancelled.set()
+
+    def progress(self):
+        """Return how far through the file the reader is, from 0.0 to 1.0."""
+        if not self.total_bytes:
+            return 0.0
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    def _publish(self, chunk):
+        # wait for room in the queue, but give up as soon as the load is cancelled
+        while not self._cancelled.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        try:
+            self._read()
+        except Exception as error:
+            self.error = error
+        finally:
+            # the end marker always goes out so the window stops polling
+            self.chunks.put(None)
+
+    def _read(self):
+        with open_storage_file(self.path) as file:
+            # progress goes by the bytes of the file itself, compressed or not
+            self.total_bytes = os.fstat(file.fileno()).st_size
+            csv_reader = csv.reader(file)
+
+            # resolve every column position once from the header
+            header = next(csv_reader, None)
+            if header is None:
+                return
+            positions = column_positions(header, self.path)
+
+            chunk = []
+            for row in storage_rows(csv_reader, positions, self.path):
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    self.rows_read += len(chunk)
+                    self.bytes_read = file.compressed_position()
+                    if not self._publish(chunk):
+                        return
+                    chunk = []
+
+            if chunk and not self._cancelled.is_set():
+                self.rows_read += len(chunk)
+                self._publish(chunk)
+            self.bytes_read = self.total_bytes
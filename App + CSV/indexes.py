@@ -0,0 +1,493 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+# Quick search scores: an exact match, a match at the start of the value, at the start of
+# a word in it (e.g. after the @ of an email) and anywhere in it. Fuzzy matches score
+# FUZZY_WEIGHT times their trigram similarity, so they always rank below a substring match.
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+WORD_SCORE = 0.8
+SUBSTRING_SCORE = 0.7
+FUZZY_WEIGHT = 0.6
+
+# Lowest trigram similarity (shared trigrams over all trigrams of the two) of a fuzzy match
+FUZZY_THRESHOLD = 0.3
+
+# Bounds on the work of one quick search, so a query that matches nearly everything
+# (e.g. "mail" against every email) stays interactive: the most candidates checked for a
+# substring match, the most matches collected before ranking, trigrams held by more than
+# FUZZY_COMMON_KEYS keys or FUZZY_COMMON_SHARE of them are too common to help find fuzzy
+# matches (e.g. "com" in emails), and the most fuzzy candidates whose similarity is worked out
+SUBSTRING_SCAN_LIMIT = 200000
+MATCH_LIMIT = 2000
+FUZZY_COMMON_KEYS = 20000
+FUZZY_COMMON_SHARE = 0.05
+FUZZY_CANDIDATES = 200
+
+# Rebuild a TrigramIndex once this many of its keys have been removed (and half are gone)
+TRIGRAM_MIN_DEAD = 1024
+
+
+def normalize(value):
+    # searches ignore case, so every key is stored casefolded; a value that already is (an
+    # email, a phone number) is kept as it is, so the index shares the string with the row
+    key = value.casefold()
+    return value if key == value else key
+
+
+def trigrams(key):
+    """Return the set of trigrams of a key, padded with two spaces in front and one behind so the start and end count too."""
+    padded = "  " + key + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def match_score(query, key):
+    """Score how well `key` matches `query` as a substring (both casefolded), or return 0.0 if it does not contain it."""
+    position = key.find(query)
+    if position < 0:
+        return 0.0
+    if position == 0:
+        return EXACT_SCORE if len(key) == len(query) else PREFIX_SCORE
+    return SUBSTRING_SCORE if key[position - 1].isalnum() else WORD_SCORE
+
+
+class HashIndex:
+
+    """
+    Secondary index mapping a field value to the itemIDs that have it.
+
+    Keys are casefolded, so lookups ignore case. A value held by a single item maps straight
+    to its itemID and is only promoted to a set once a second item shares it, which keeps
+    unique fields such as email and phone number cheap to index.
+
+    Example:
+    index = HashIndex()
+    index.add("Apple", 453)
+    index.lookup("apple")  # {453}
+
+    """
+
+    def __init__(self):
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, value, itemID):
+        """Record that the item itemID has this value."""
+        key = normalize(value)
+        current = self._keys.get(key)
+        if current is None:
+            self._keys[key] = itemID
+            self._new_key(key)
+        elif type(current) is set:
+            current.add(itemID)
+        elif current != itemID:
+            self._keys[key] = {current, itemID}
+
+    def remove(self, value, itemID):
+        """Forget that the item itemID has this value."""
+        key = normalize(value)
+        current = self._keys.get(key)
+        if current is None:
+            return
+        if type(current) is set:
+            current.discard(itemID)
+            if len(current) == 1:
+                self._keys[key] = next(iter(current))
+        elif current == itemID:
+            del self._keys[key]
+            self._dropped_key(key)
+
+    def lookup(self, value):
+        """Return the set of itemIDs whose value matches, ignoring case."""
+        current = self._keys.get(normalize(value))
+        if current is None:
+            return set()
+        if type(current) is set:
+            return set(current)
+        return {current}
+
+    def clear(self):
+        self._keys.clear()
+
+    # hooks for indexes that keep extra structures over the keys
+    def _new_key(self, key):
+        pass
+
+    def _dropped_key(self, key):
+        pass
+
+
+class PrefixIndex(HashIndex):
+
+    """
+    HashIndex that can also answer prefix searches and quick (substring and fuzzy) searches.
+
+    The distinct keys are kept in a sorted list; all keys starting with a prefix sit next to
+    each other in it, so a prefix search is a bisect plus a walk over the matching keys.
+    The sorted list is built on the first prefix search, and a TrigramIndex of the keys on
+    the first quick search; both are kept up to date after that.
+
+    Example:
+    index = PrefixIndex()
+    index.add("Walker", 453)
+    index.lookup_prefix("wal")  # {453}
+    index.lookup_similar("alk", 10)  # [(0.7, "walker")]
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sorted = None
+        self._trigrams = None
+
+    def _new_key(self, key):
+        if self._sorted is not None:
+            insort(self._sorted, key)
+        if self._trigrams is not None:
+            self._trigrams.add(key)
+
+    def _dropped_key(self, key):
+        if self._sorted is not None:
+            del self._sorted[bisect_left(self._sorted, key)]
+        if self._trigrams is not None:
+            self._trigrams.remove(key)
+
+    def clear(self):
+        super().clear()
+        self._sorted = None
+        self._trigrams = None
+
+    @property
+    def quick_search_ready(self):
+        """True once the TrigramIndex has been built, so `lookup_similar` is quick."""
+        return self._trigrams is not None
+
+    def prepare_quick_search(self):
+        """Build the TrigramIndex of the keys now rather than on the first quick search."""
+        if self._trigrams is None:
+            # built aside and then put in place, so readers never see half of it
+            trigram_index = TrigramIndex()
+            for key in self._keys:
+                trigram_index.add(key)
+            self._trigrams = trigram_index
+
+    def lookup_similar(self, value, limit, fuzzy=True):
+        """
+        Return up to `limit` (score, key) pairs of the keys matching value, best first.
+
+        See TrigramIndex.search for the scores and `fuzzy`; `lookup(key)` gives the items
+        of a key.
+
+        """
+        self.prepare_quick_search()
+        return self._trigrams.search(normalize(value), limit, fuzzy)
+
+    def lookup_prefix(self, prefix):
+        """Return the set of itemIDs whose value starts with prefix, ignoring case."""
+        prefix = normalize(prefix)
+        if self._sorted is None:
+            self._sorted = sorted(self._keys)
+
+        keys = self._sorted
+        found = set()
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            current = self._keys[keys[position]]
+            if type(current) is set:
+                found |= current
+            else:
+                found.add(current)
+            position += 1
+        return found
+
+
+class TrigramIndex:
+
+    """
+    Inverted index from trigrams to the keys that contain them, for substring and fuzzy search.
+
+    Every key gets an integer ID, and each trigram of the key (see `trigrams`) lists the IDs
+    in an `array('i')` posting list, so a million keys cost a few bytes per trigram rather
+    than a set entry. A substring search checks the keys of the query's rarest trigram
+    only; a fuzzy search counts the trigrams each key shares with the query (like
+    PostgreSQL's pg_trgm) and keeps the keys with a similarity of at least FUZZY_THRESHOLD,
+    so "strm" still finds "storm". Removing a key only forgets its ID; the index rebuilds
+    itself once half of the IDs are gone.
+
+    Example:
+    index = TrigramIndex()
+    index.add("lebowski")
+    index.search("bow", 10)  # [(0.7, "lebowski")]
+
+    """
+
+    def __init__(self):
+        # key -> ID, ID -> key (None once removed), trigram -> IDs of the keys holding it
+        self._ids = {}
+        self._keys = []
+        self._postings = {}
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, key):
+        """Index a key (casefolded). Adding a key twice does nothing."""
+        if key in self._ids:
+            return
+        key_id = self._ids[key] = len(self._keys)
+        self._keys.append(key)
+        postings = self._postings
+        for gram in trigrams(key):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("i")
+            posting.append(key_id)
+
+    def remove(self, key):
+        """Forget a key."""
+        key_id = self._ids.pop(key, None)
+        if key_id is None:
+            return
+        self._keys[key_id] = None
+        self._dead += 1
+        if self._dead >= TRIGRAM_MIN_DEAD and self._dead * 2 >= len(self._keys):
+            keys = [key for key in self._keys if key is not None]
+            self.__init__()
+            for key in keys:
+                self.add(key)
+
+    def search(self, query, limit, fuzzy=True):
+        """
+        Return up to `limit` (score, key) pairs of the keys matching a casefolded query, best first.
+
+        Keys containing the query score by where it is (see `match_score`); if fewer than
+        `limit` do and `fuzzy` is set, keys that look like it (at least FUZZY_THRESHOLD
+        trigram similarity) fill the rest. Ties go to the shorter key. Queries of one or two
+        characters match the keys starting with them only.
+
+        """
+        if not query:
+            return []
+        keys = self._keys
+        scores = {}
+
+        # substring matches: every key holding the query holds its rarest trigram, so only
+        # that posting list is checked (for a short query, the trigram of the key's start)
+        if len(query) >= 3:
+            grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        else:
+            grams = {("  " + query)[-3:]}
+        postings = [self._postings.get(gram) for gram in grams]
+        if all(posting is not None for posting in postings):
+            rarest = min(postings, key=len)
+            for checked, key_id in enumerate(rarest):
+                if checked >= SUBSTRING_SCAN_LIMIT or len(scores) >= MATCH_LIMIT:
+                    break
+                key = keys[key_id]
+                if key is not None:
+                    score = match_score(query, key)
+                    if score:
+                        scores[key] = score
+
+        # fuzzy matches, ranked by the trigrams they share with the query
+        if fuzzy and len(scores) < limit and len(query) >= 3:
+            query_grams = trigrams(query)
+            shared = Counter()
+            common = max(min(FUZZY_COMMON_KEYS, len(self._ids) * FUZZY_COMMON_SHARE), limit)
+            for gram in query_grams:
+                posting = self._postings.get(gram)
+                if posting is not None and len(posting) <= common:
+                    shared.update(posting)
+            for key_id, _count in shared.most_common(FUZZY_CANDIDATES):
+                key = keys[key_id]
+                if key is None or key in scores:
+                    continue
+                key_grams = trigrams(key)
+                similarity = len(query_grams & key_grams) / len(query_grams | key_grams)
+                if similarity >= FUZZY_THRESHOLD:
+                    scores[key] = FUZZY_WEIGHT * similarity
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(item[0]), item[0]))
+        return [(score, key) for key, score in ranked[:limit]]
+
+
+class RecencyIndex:
+
+    """
+    Doubly linked list of store rows, oldest to newest.
+
+    The links live in two `array('q')` columns (previous and next row, -1 at either end),
+    so adding or removing a row is O(1) and the newest N rows can be walked from the tail
+    in O(N), however many rows the store holds. Rows are appended in the order items are
+    added; overwriting an item leaves it where it was.
+
+    Example:
+    recency = RecencyIndex()
+    recency.append(0)
+    recency.append(1)
+    list(recency.newest(1))  # [1]
+
+    """
+
+    def __init__(self):
+        self._prev = array("q")
+        self._next = array("q")
+        self.head = -1
+        self.tail = -1
+
+    def append(self, row):
+        """Link a new row (always the next row number) in as the newest."""
+        if row != len(self._next):
+            raise ValueError(f"row {row} is not the next row of the store")
+        self._prev.append(self.tail)
+        self._next.append(-1)
+        if self.tail == -1:
+            self.head = row
+        else:
+            self._next[self.tail] = row
+        self.tail = row
+
+    def remove(self, row):
+        """Unlink a row."""
+        before, after = self._prev[row], self._next[row]
+        if before == -1:
+            self.head = after
+        else:
+            self._next[before] = after
+        if after == -1:
+            self.tail = before
+        else:
+            self._prev[after] = before
+        self._prev[row] = self._next[row] = -1
+
+    def newest(self, count):
+        """Yield up to `count` rows, newest first."""
+        prev = self._prev
+        row = self.tail
+        while row != -1 and count > 0:
+            yield row
+            row = prev[row]
+            count -= 1
+
+    def oldest(self):
+        """Yield every linked row, oldest first."""
+        following = self._next
+        row = self.head
+        while row != -1:
+            yield row
+            row = following[row]
+
+    @classmethod
+    def from_order(cls, rows, size):
+        """
+        Build the index for a store of `size` rows, linking `rows` oldest to newest.
+
+        Used after the store renumbers its rows; rows not in `rows` stay unlinked.
+
+        """
+        recency = cls()
+        recency._prev = array("q", [-1]) * size
+        recency._next = array("q", [-1]) * size
+        last = -1
+        for row in rows:
+            recency._prev[row] = last
+            if last == -1:
+                recency.head = row
+            else:
+                recency._next[last] = row
+            last = row
+        recency.tail = last
+        return recency
+
+
+class IdTable:
+
+    """
+    Hash table from keys to the integer IDs they are stored under, holding only the IDs.
+
+    The IDs sit in one `array('q')` of slots (-1 for an empty one) found by linear probing;
+    the keys stay wherever the caller keeps them and are read back through `key_of(ID)` to
+    compare. A key costs a slot or two of 8 bytes instead of a dict entry with the key and an
+    int object. The table doubles once two thirds full, and removing an ID shifts the IDs
+    that probed past it back into its slot, so there are no tombstones.
+
+    Parameters:
+    - key_of (callable): Returns the key stored under an ID.
+
+    Example:
+    names = ["Ann", "Bob"]
+    table = IdTable(names.__getitem__)
+    table.add("Ann", 0)
+    table.add("Bob", 1)
+    table.get("Bob")  # 1
+
+    """
+
+    def __init__(self, key_of):
+        self._key_of = key_of
+        self._slots = array("q", [-1]) * 8
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _slot(self, key):
+        # the slot holding key, or the empty slot it would go in
+        slots, key_of = self._slots, self._key_of
+        mask = len(slots) - 1
+        slot = hash(key) & mask
+        while True:
+            found = slots[slot]
+            if found == -1 or key_of(found) == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def get(self, key):
+        """Return the ID stored under key, or None if it is not in the table."""
+        found = self._slots[self._slot(key)]
+        return None if found == -1 else found
+
+    def add(self, key, ID):
+        """Store ID under key, which is not in the table yet; key_of(ID) must already return key."""
+        if (self._count + 1) * 3 > len(self._slots) * 2:
+            self._resize(len(self._slots) * 2)
+        self._slots[self._slot(key)] = ID
+        self._count += 1
+
+    def remove(self, key):
+        """Take key out of the table, while key_of still returns it for its ID. Does nothing if it is not there."""
+        slots, key_of = self._slots, self._key_of
+        mask = len(slots) - 1
+        hole = self._slot(key)
+        if slots[hole] == -1:
+            return
+        slots[hole] = -1
+        self._count -= 1
+
+        # move back every ID after the hole whose probe started at or before it
+        slot = hole
+        while True:
+            slot = (slot + 1) & mask
+            found = slots[slot]
+            if found == -1:
+                return
+            if (slot - (hash(key_of(found)) & mask)) & mask >= (slot - hole) & mask:
+                slots[hole] = found
+                slots[slot] = -1
+                hole = slot
+
+    def _resize(self, size):
+        old, key_of = self._slots, self._key_of
+        slots = self._slots = array("q", [-1]) * size
+        mask = size - 1
+        for found in old:
+            if found != -1:
+                slot = hash(key_of(found)) & mask
+                while slots[slot] != -1:
+                    slot = (slot + 1) & mask
+                slots[slot] = found
@@ -0,0 +1,293 @@
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+
+
+# Record timings from the start, picked with STORAGE_PERF=1; the Performance window and
+# `performance.enable()` turn it on and off while the app runs
+PERF_ENABLED = os.environ.get('STORAGE_PERF', '') not in ('', '0')
+
+# Upper bounds in seconds of the latency histogram's buckets, two per decade from 10 us to
+# 10 s; anything slower lands in a last, open-ended bucket
+LATENCY_BOUNDS = tuple(10 ** (exponent / 2) for exponent in range(-10, 3))
+
+# Functions listed in a captured profile, by cumulative time
+PROFILE_LINES = 30
+
+
+def bucket_label(index):
+    """Name histogram bucket `index`, e.g. '<=3.2ms', or '>10s' for the last one."""
+    bound = LATENCY_BOUNDS[min(index, len(LATENCY_BOUNDS) - 1)]
+    if bound >= 1:
+        text = f"{bound:.3g}s"
+    elif bound >= 1e-3:
+        text = f"{bound * 1e3:.3g}ms"
+    else:
+        text = f"{bound * 1e6:.3g}us"
+    return ("<=" if index < len(LATENCY_BOUNDS) else ">") + text
+
+
+class OperationStats:
+
+    """Counters of one kind of operation: calls, errors, time, rows, bytes and a latency histogram."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = [0] * (len(LATENCY_BOUNDS) + 1)
+
+    def add(self, seconds, rows, nbytes, failed):
+        self.calls += 1
+        self.errors += failed
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows += rows
+        self.bytes += nbytes
+        self.buckets[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+
+    def percentile(self, share):
+        """Return the upper bound of the bucket holding the `share` percentile in seconds, at most the slowest call."""
+        wanted = share * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return min(LATENCY_BOUNDS[index], self.max_seconds) if index < len(LATENCY_BOUNDS) else self.max_seconds
+        return 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.seconds,
+            "mean_ms": self.seconds / self.calls * 1e3 if self.calls else 0.0,
+            "p50_ms": self.percentile(0.5) * 1e3,
+            "p99_ms": self.percentile(0.99) * 1e3,
+            "max_ms": self.max_seconds * 1e3,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "histogram": {bucket_label(index): count for index, count in enumerate(self.buckets) if count},
+        }
+
+
+class Measurement:
+
+    """
+    One timed call of an operation, used as a context manager (see PerformanceMonitor.measure).
+
+    Set `rows` and `bytes` inside the `with` block to count what the call processed. A call
+    that raises is counted as an error.
+
+    """
+
+    __slots__ = ("monitor", "operation", "rows", "bytes", "start", "profile")
+
+    def __init__(self, monitor, operation):
+        self.monitor = monitor
+        self.operation = operation
+        self.rows = 0
+        self.bytes = 0
+        self.profile = None
+
+    def __enter__(self):
+        self.profile = self.monitor._claim_profile()
+        if self.profile is not None:
+            self.profile.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        seconds = time.perf_counter() - self.start
+        if self.profile is not None:
+            self.profile.disable()
+            self.monitor._keep_profile(self.operation, seconds, self.profile)
+        self.monitor.record(self.operation, seconds, self.rows, self.bytes, error_type is not None)
+        return False
+
+
+class IdleMeasurement:
+
+    """
+    Stands in for a Measurement while recording is off.
+
+    One instance is shared by every call on every thread, so it keeps nothing: setting rows
+    or bytes is ignored and both always read 0.
+
+    """
+
+    __slots__ = ()
+    rows = 0
+    bytes = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        return False
+
+
+IDLE = IdleMeasurement()
+
+
+class PerformanceMonitor:
+
+    """
+    Low-overhead counters for the storage operations.
+
+    Every measured operation keeps its call count, errors, total and maximum time, a latency
+    histogram (LATENCY_BOUNDS), and the rows and bytes it processed. While recording is off,
+    `measure` hands back a shared do-nothing context manager, so the instrumented code pays
+    about one attribute check per call. The counters are kept under a lock, so any thread
+    may record.
+
+    `profile_next` arms a one-shot cProfile capture: the next operation measured on any
+    thread runs under the profiler and its top functions are kept in `last_profile`.
+
+    The StorageCore, the window and the service all record into the module's `performance`
+    monitor; `snapshot()` returns everything as plain data for JSON.
+
+    Parameters:
+    - enabled (bool): Whether to record from the start.
+
+    Example:
+    performance.enable()
+    with performance.measure("export") as measurement:
+        measurement.rows = write_storage_csv(path, records)
+    performance.snapshot()["operations"]["export"]["p99_ms"]
+
+    """
+
+    def __init__(self, enabled=PERF_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._operations = {}
+        self.since = time.time()
+
+        # profiling armed by `profile_next`, and the report of the last capture
+        self._profile_armed = False
+        self.last_profile = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forget every counter and the last profile."""
+        with self._lock:
+            self._operations = {}
+            self.since = time.time()
+            self.last_profile = None
+
+    def measure(self, operation):
+        """Return a context manager that times one call of `operation` while recording is on."""
+        if not self.enabled:
+            return IDLE
+        return Measurement(self, operation)
+
+    def record(self, operation, seconds, rows=0, nbytes=0, failed=False):
+        """Count one call of `operation` that took `seconds`, e.g. one timed somewhere `measure` cannot wrap."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = OperationStats()
+            stats.add(seconds, rows, nbytes, failed)
+
+    def profile_next(self):
+        """Profile the next measured operation with cProfile (see `last_profile`). Turns recording on."""
+        self.enabled = True
+        with self._lock:
+            self._profile_armed = True
+
+    @property
+    def profile_armed(self):
+        return self._profile_armed
+
+    def _claim_profile(self):
+        # hand the armed capture to one measurement only; cProfile allows one profiler at a time
+        if not self._profile_armed:
+            return None
+        with self._lock:
+            if not self._profile_armed:
+                return None
+            self._profile_armed = False
+        return cProfile.Profile()
+
+    def _keep_profile(self, operation, seconds, profile):
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_LINES)
+        self.last_profile = {"operation": operation, "seconds": seconds, "time": time.time(), "report": text.getvalue()}
+
+    def snapshot(self):
+        """
+        Return every counter as plain data, ready for json.dumps.
+
+        Holds "enabled", "since" (when counting started), "operations" (the counters of every
+        operation, by name, see OperationStats) and "last_profile" (None, or the operation,
+        its seconds and the cProfile report of the last capture).
+
+        """
+        with self._lock:
+            operations = {name: stats.as_dict() for name, stats in sorted(self._operations.items())}
+        profile = dict(self.last_profile) if self.last_profile is not None else None
+        return {"enabled": self.enabled, "since": self.since, "operations": operations, "last_profile": profile}
+
+
+# The monitor everything records into
+performance = PerformanceMonitor()
+
+
+def measured(operation, rows=None):
+
+    """
+    Decorate a function so every call of it is measured as `operation`.
+
+    Parameters:
+    - operation (str): The name the calls are counted under.
+    - rows (callable): Works out the rows processed from the function's result, e.g. len.
+
+    Example:
+    @measured("page", rows=len)
+    def page(self, start, count): ...
+
+    """
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not performance.enabled:
+                return function(*args, **kwargs)
+            with performance.measure(operation) as measurement:
+                result = function(*args, **kwargs)
+                if rows is not None:
+                    measurement.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def format_report(report):
+    """Format a `PerformanceMonitor.snapshot()` as a text table, slowest total time first, for the Performance window."""
+    lines = [f"{'operation':<22} {'calls':>8} {'errors':>6} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'rows':>10} {'bytes':>12}"]
+    operations = sorted(report["operations"].items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+    for name, stats in operations:
+        lines.append(f"{name:<22} {stats['calls']:>8} {stats['errors']:>6} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} "
+                     f"{stats['p99_ms']:>9.3f} {stats['max_ms']:>9.3f} {stats['rows']:>10} {stats['bytes']:>12}")
+    if not operations:
+        lines.append("Nothing recorded yet." if report["enabled"] else "Recording is off.")
+    return "\n".join(lines) + "\n"
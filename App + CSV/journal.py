@@ -0,0 +1,299 @@
+import csv
+import io
+import os
+import tempfile
+
+from csv_loader import CSV_HEADER, column_positions, compression_for_write, copy_mode, open_storage_file
+
+
+# Journal entries written before a save folds them into the CSV snapshot
+COMPACT_THRESHOLD = 10000
+
+# Operation codes at the start of every journal line
+OP_ADD = 'A'
+OP_DELETE = 'D'
+OP_QUANTITY = 'Q'
+
+
+class Journal:
+
+    """
+    Append-only write-ahead journal kept next to the CSV snapshot.
+
+    Every change made in the app is recorded as one CSV line in '<snapshot>.journal':
+    'A,<itemID>,<product>,<quantity>,...' for an added item, 'D,<itemID>' for a deleted one
+    and 'Q,<itemID>,<quantity>' for an item whose quantity changed in place.
+    Changes are buffered in memory and written by `flush`, so a save costs O(changes)
+    instead of rewriting every item. Once the journal holds COMPACT_THRESHOLD entries,
+    `compact` merges it into the snapshot through a temp file and `os.replace`, so a crash
+    never leaves a half-written ProjectStorage.csv behind. A compressed snapshot (e.g.
+    'ProjectStorage.csv.gz') stays compressed; the journal itself never is.
+
+    Parameters:
+    - snapshot_path (str): The CSV snapshot the journal belongs to.
+    - compact_threshold (int): The number of journal entries that makes `needs_compaction` true.
+    - compress_level (int): The level a compressed snapshot is written with; None for the
+      codec's default (see csv_loader.open_storage_file).
+
+    Example:
+    journal = Journal('ProjectStorage.csv')
+    journal.record_delete(42)
+    journal.flush()
+
+    """
+
+    def __init__(self, snapshot_path, compact_threshold=COMPACT_THRESHOLD, compress_level=None):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + '.journal'
+        self.compact_threshold = compact_threshold
+        self.compress_level = compress_level
+
+        # lines recorded but not yet written to the journal file
+        self._pending = io.StringIO()
+        self._writer = csv.writer(self._pending)
+        self.pending_entries = 0
+
+        # entries already in the journal file
+        self.entries = self._count_entries()
+
+    def _count_entries(self):
+        try:
+            with open(self.path, 'rb') as file:
+                return sum(1 for _line in file)
+        except FileNotFoundError:
+            return 0
+
+    def record_add(self, record):
+        """
+        Record an added (or overwritten) item.
+
+        Parameters:
+        - record (sequence): The item's fields in CSV_HEADER order.
+
+        """
+        self._writer.writerow((OP_ADD, *record))
+        self.pending_entries += 1
+
+    def record_delete(self, itemID):
+        """
+        Record a deleted item.
+
+        Parameters:
+        - itemID (int): The unique identifier of the deleted item.
+
+        """
+        self._writer.writerow((OP_DELETE, itemID))
+        self.pending_entries += 1
+
+    def record_quantity(self, itemID, quantity):
+        """
+        Record an item's new quantity after a stock movement.
+
+        Parameters:
+        - itemID (int): The unique identifier of the item.
+        - quantity (int): Its quantity after the movement.
+
+        """
+        self._writer.writerow((OP_QUANTITY, itemID, quantity))
+        self.pending_entries += 1
+
+    @property
+    def needs_compaction(self):
+        return self.entries + self.pending_entries >= self.compact_threshold
+
+    def flush(self):
+        """
+        Append the recorded changes to the journal file and fsync it.
+
+        Returns the number of entries written.
+
+        """
+        return self.write(*self.take_pending())
+
+    def take_pending(self):
+        """
+        Hand over the recorded changes and start a new batch.
+
+        Returns (text, entries) for `write`, so a save can take the batch quickly on the
+        thread that records changes and write it out on another one.
+
+        """
+        batch = self._pending.getvalue(), self.pending_entries
+        self._pending.seek(0)
+        self._pending.truncate()
+        self.pending_entries = 0
+        return batch
+
+    def restore_pending(self, text, entries):
+        """Put a batch from `take_pending` that could not be written back in front of the current one."""
+        newer = self._pending.getvalue()
+        self._pending.seek(0)
+        self._pending.truncate()
+        self._pending.write(text + newer)
+        self.pending_entries += entries
+
+    def write(self, text, entries):
+        """
+        Append a batch from `take_pending` to the journal file and fsync it.
+
+        Returns the number of entries written.
+
+        """
+        if not entries:
+            return 0
+
+        with open(self.path, 'a+b') as file:
+            # finish off a torn last line so it cannot swallow the first new entry
+            if file.seek(0, os.SEEK_END):
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    file.write(b'\n')
+            file.write(text.encode('utf-8'))
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.entries += entries
+        return entries
+
+    def replay(self):
+        """
+        Yield the operations stored in the journal file, oldest first.
+
+        Yields (OP_ADD, row) with row in CSV_HEADER order and integer itemID and quantity,
+        (OP_DELETE, itemID) or (OP_QUANTITY, (itemID, quantity)). A torn last line left by a
+        crash is ignored.
+
+        """
+        try:
+            file = open(self.path, 'r', encoding='utf-8', newline='')
+        except FileNotFoundError:
+            return
+
+        with file:
+            for entry in csv.reader(file):
+                try:
+                    if entry[0] == OP_ADD and len(entry) == len(CSV_HEADER) + 1:
+                        itemID, product, quantity, first, last, phone, email = entry[1:]
+                        yield OP_ADD, (int(itemID), product, int(quantity), first, last, phone, email)
+                    elif entry[0] == OP_DELETE and len(entry) == 2:
+                        yield OP_DELETE, int(entry[1])
+                    elif entry[0] == OP_QUANTITY and len(entry) == 3:
+                        yield OP_QUANTITY, (int(entry[1]), int(entry[2]))
+                except ValueError:
+                    continue
+
+    def apply_to(self, store):
+        """
+        Replay the journal file on top of a store loaded from the snapshot.
+
+        Returns the number of operations applied.
+
+        """
+        applied = 0
+        for op, value in self.replay():
+            if op == OP_ADD:
+                store.put(*value)
+            elif op == OP_DELETE:
+                store.delete(value)
+            elif value[0] in store:
+                store.set_quantity(*value)
+            applied += 1
+        return applied
+
+    def compact(self, flush=True):
+        """
+        Merge the journal into the CSV snapshot and empty the journal.
+
+        The snapshot is streamed into a temp file in the same folder, leaving out every item
+        the journal added or deleted; the journal's surviving items are written after it in
+        the order they were last added. Items whose quantity alone changed keep their place. The temp file then atomically replaces the snapshot.
+        Replaying the journal is idempotent, so a crash between the replace and the
+        truncation of the journal loses nothing.
+
+        Parameters:
+        - flush (bool): Write the recorded changes first. A save that already wrote its batch
+          passes False, so changes recorded meanwhile on another thread wait for the next save.
+
+        Returns the number of items in the new snapshot.
+
+        """
+        if flush:
+            self.flush()
+
+        # final state of every item the journal added or deleted, ordered by its last change,
+        # and the new quantity of snapshot items that only had their quantity changed
+        changes = {}
+        quantities = {}
+        for op, value in self.replay():
+            if op == OP_ADD:
+                itemID = value[0]
+                changes.pop(itemID, None)
+                quantities.pop(itemID, None)
+                changes[itemID] = value
+            elif op == OP_DELETE:
+                changes.pop(value, None)
+                quantities.pop(value, None)
+                changes[value] = None
+            else:
+                itemID, quantity = value
+                row = changes.get(itemID)
+                if row is not None:
+                    changes[itemID] = row[:2] + (quantity,) + row[3:]
+                elif itemID not in changes:
+                    quantities[itemID] = quantity
+
+        folder = os.path.dirname(os.path.abspath(self.snapshot_path))
+        compression = compression_for_write(self.snapshot_path)
+        handle, temp_path = tempfile.mkstemp(prefix='.ProjectStorage-', suffix='.tmp', dir=folder)
+        os.close(handle)
+        items = 0
+        try:
+            with open_storage_file(temp_path, 'w', compression, self.compress_level) as out:
+                writer = csv.writer(out)
+                writer.writerow(CSV_HEADER)
+                items += self._copy_snapshot(writer, changes, quantities)
+                for row in changes.values():
+                    if row is not None:
+                        writer.writerow(row)
+                        items += 1
+                out.sync()
+            copy_mode(self.snapshot_path, temp_path)
+            os.replace(temp_path, self.snapshot_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        # the snapshot now holds everything, so the journal can start over
+        with open(self.path, 'w'):
+            pass
+        self.entries = 0
+        return items
+
+    def _copy_snapshot(self, writer, changes, quantities):
+        # stream the old snapshot, skipping the items the journal has newer versions of
+        # and writing the new quantity of the ones it only moved stock for
+        try:
+            file = open_storage_file(self.snapshot_path)
+        except FileNotFoundError:
+            return 0
+
+        copied = 0
+        with file:
+            csv_reader = csv.reader(file)
+            header = next(csv_reader, None)
+            if header is None:
+                return 0
+            positions = column_positions(header, self.snapshot_path)
+            i_item = positions[0]
+            for row in csv_reader:
+                if not row:
+                    continue
+                itemID = int(row[i_item])
+                if itemID in changes:
+                    continue
+                row = [row[i] for i in positions]
+                if itemID in quantities:
+                    row[2] = quantities[itemID]
+                writer.writerow(row)
+                copied += 1
+        return copied
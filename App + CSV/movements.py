@@ -0,0 +1,116 @@
+import os
+import struct
+import time
+from collections import namedtuple
+
+
+# Kinds of stock movement, as stored in the log
+CHECK_IN = 'in'
+CHECK_OUT = 'out'
+SET_QUANTITY = 'set'
+MOVEMENT_KINDS = (CHECK_IN, CHECK_OUT, SET_QUANTITY)
+
+# One movement: when it happened, the item, what kind it was, by how many units the
+# quantity changed and the quantity it left behind
+Movement = namedtuple("Movement", ["time", "itemID", "kind", "change", "quantity"])
+
+# Fixed-width little-endian record: time (double), itemID, change, quantity (int64) and kind (1 byte)
+RECORD = struct.Struct('<dqqqB')
+KIND_CODES = {kind: code for code, kind in enumerate(MOVEMENT_KINDS)}
+
+
+class MovementLog:
+
+    """
+    Append-only log of stock movements kept next to the storage file.
+
+    Every check-in, check-out and quantity set is packed into one fixed-width RECORD (33
+    bytes) in memory; `flush` appends everything recorded since the last save to
+    '<storage>.movements' in one write and fsyncs it. The log is never rewritten, so it is a
+    full history of how each quantity got to where it is.
+
+    Parameters:
+    - path (str): The log file, e.g. 'ProjectStorage.movements'.
+
+    Example:
+    log = MovementLog('ProjectStorage.movements')
+    log.record(42, CHECK_OUT, -3, 7)
+    log.flush()
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        # packed records not yet written to the log file
+        self._pending = bytearray()
+        self.pending_entries = 0
+
+    def record(self, itemID, kind, change, quantity, when=None):
+        """
+        Record one movement.
+
+        Parameters:
+        - itemID (int): The item that moved.
+        - kind (str): One of MOVEMENT_KINDS.
+        - change (int): The units added (positive) or taken away (negative).
+        - quantity (int): The item's quantity after the movement.
+        - when (float): The time of the movement; defaults to now.
+
+        """
+        self._pending += RECORD.pack(time.time() if when is None else when, itemID, change, quantity, KIND_CODES[kind])
+        self.pending_entries += 1
+
+    def flush(self):
+        """
+        Append the recorded movements to the log file and fsync it.
+
+        Returns the number of movements written.
+
+        """
+        return self.write(*self.take_pending())
+
+    def take_pending(self):
+        """Hand over the recorded movements as (data, entries) for `write` and start a new batch."""
+        batch = bytes(self._pending), self.pending_entries
+        self._pending.clear()
+        self.pending_entries = 0
+        return batch
+
+    def restore_pending(self, data, entries):
+        """Put a batch from `take_pending` that could not be written back in front of the current one."""
+        self._pending[:0] = data
+        self.pending_entries += entries
+
+    def write(self, data, entries):
+        """
+        Append a batch from `take_pending` to the log file and fsync it.
+
+        Returns the number of movements written.
+
+        """
+        if not entries:
+            return 0
+
+        with open(self.path, 'ab') as file:
+            # drop a torn last record left by a crash so every record stays aligned
+            end = file.seek(0, os.SEEK_END)
+            if end % RECORD.size:
+                file.truncate(end - end % RECORD.size)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        return entries
+
+    def read(self):
+        """Yield every Movement written to the log file, oldest first. A torn last record is ignored."""
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+
+        with file:
+            data = file.read()
+        usable = len(data) - len(data) % RECORD.size
+        for when, itemID, change, quantity, code in RECORD.iter_unpack(memoryview(data)[:usable]):
+            yield Movement(when, itemID, MOVEMENT_KINDS[code], change, quantity)
@@ -0,0 +1,160 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+# Columns of the result table: heading and width in pixels
+COLUMNS = (
+    ("itemID", 90),
+    ("Product", 140),
+    ("Quantity", 80),
+    ("Full Name", 180),
+    ("Phone Number", 120),
+    ("Email", 240),
+)
+
+# Rows shown (and fetched) at a time
+PAGE_SIZE = 25
+
+# Rows moved by one turn of the mouse wheel
+WHEEL_ROWS = 3
+
+
+def record_values(record):
+    """Format one StorageRecord as the values of a table row."""
+    return (record.itemID, record.product, record.quantity, f"{record.first_name} {record.last_name}", record.phone_number, record.email)
+
+
+class PagedView(tk.Frame):
+
+    """
+    Virtualized table of storage items.
+
+    The table never holds more than `page_size` rows. It is given a data source as two
+    functions, `count()` for the number of rows and `fetch(start, count)` for the records at
+    those positions, and only fetches and formats the rows in view. Scrolling (scrollbar or
+    mouse wheel), the First/Prev/Next/Last buttons and the page entry all just move the
+    window over the source and fetch the new rows.
+
+    Parameters:
+    - master (tk widget): The parent widget.
+    - page_size (int): The number of rows shown at a time.
+
+    Example:
+    view = PagedView(window)
+    view.show("Stored storage", lambda: len(store), store.page)
+
+    """
+
+    def __init__(self, master, page_size=PAGE_SIZE, **options):
+        super().__init__(master, **options)
+        self.page_size = page_size
+        self.start = 0
+        self._refresh_pending = None
+        self._count = lambda: 0
+        self._fetch = lambda start, count: []
+
+        # title above the table
+        self.title_label = tk.Label(self, text="", fg="blue")
+        self.title_label.pack()
+
+        # the table and a scrollbar that stands for the whole source, not just the rows in view
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(body, columns=[name for name, _width in COLUMNS], show="headings", height=page_size)
+        for name, width in COLUMNS:
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width, anchor=tk.W)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # mouse wheel on Windows/macOS and on X11
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_rows(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(WHEEL_ROWS) or "break")
+
+        # page and jump controls
+        controls = tk.Frame(self)
+        controls.pack(pady=5)
+        tk.Button(controls, text="First", command=lambda: self.go_to_row(0)).pack(side=tk.LEFT)
+        tk.Button(controls, text="Prev", command=lambda: self.scroll_rows(-self.page_size)).pack(side=tk.LEFT)
+        self.page_label = tk.Label(controls, text="", width=34)
+        self.page_label.pack(side=tk.LEFT)
+        tk.Button(controls, text="Next", command=lambda: self.scroll_rows(self.page_size)).pack(side=tk.LEFT)
+        tk.Button(controls, text="Last", command=lambda: self.go_to_row(self._count())).pack(side=tk.LEFT)
+        tk.Label(controls, text="  Go to page:").pack(side=tk.LEFT)
+        self.page_entry = tk.Entry(controls, width=8)
+        self.page_entry.pack(side=tk.LEFT)
+        self.page_entry.bind("<Return>", lambda event: self._jump())
+        tk.Button(controls, text="Go", command=self._jump).pack(side=tk.LEFT)
+
+    def show(self, title, count, fetch):
+        """
+        Show a new data source from its first row.
+
+        Parameters:
+        - title (str): The text shown above the table.
+        - count (callable): Returns the number of rows in the source.
+        - fetch (callable): fetch(start, count) returns the records at those positions.
+
+        """
+        self.title_label.config(text=title)
+        self._count = count
+        self._fetch = fetch
+        self.start = 0
+        self.refresh()
+
+    def clear(self):
+        """Empty the table and forget the data source."""
+        self.show("", lambda: 0, lambda start, count: [])
+
+    def refresh(self):
+        """Fetch and draw the rows in view again, e.g. after the store changed."""
+        if self._refresh_pending is not None:
+            self.after_cancel(self._refresh_pending)
+            self._refresh_pending = None
+        total = self._count()
+        self.start = max(0, min(self.start, total - self.page_size))
+        records = self._fetch(self.start, self.page_size) if total else []
+
+        # only the rows in view are ever formatted and put in the table
+        self.tree.delete(*self.tree.get_children())
+        for record in records:
+            self.tree.insert("", tk.END, values=record_values(record))
+
+        if total:
+            end = self.start + len(records)
+            page = self.start // self.page_size + 1
+            pages = (total + self.page_size - 1) // self.page_size
+            self.page_label.config(text=f"Rows {self.start + 1}-{end} of {total} (page {page} of {pages})")
+            self.scrollbar.set(self.start / total, end / total)
+        else:
+            self.page_label.config(text="No items")
+            self.scrollbar.set(0.0, 1.0)
+
+    def refresh_later(self):
+        """Refresh once the window is idle, so a burst of changes (e.g. items scanned in one after the other) redraws the table once."""
+        if self._refresh_pending is None:
+            self._refresh_pending = self.after_idle(self.refresh)
+
+    def go_to_row(self, row):
+        """Scroll so that the row at position `row` is the first one in view."""
+        self.start = row
+        self.refresh()
+
+    def scroll_rows(self, rows):
+        """Scroll the view by a number of rows (negative scrolls up)."""
+        self.go_to_row(self.start + rows)
+
+    def _jump(self):
+        text = self.page_entry.get().strip()
+        if text.isdigit() and int(text) > 0:
+            self.go_to_row((int(text) - 1) * self.page_size)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        # the scrollbar reports positions as fractions of the whole source
+        if action == tk.MOVETO:
+            self.go_to_row(int(float(amount) * self._count()))
+        elif action == tk.SCROLL:
+            step = self.page_size if unit == tk.PAGES else 1
+            self.scroll_rows(int(amount) * step)
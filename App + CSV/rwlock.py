@@ -0,0 +1,73 @@
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+
+    """
+    Lock that lets many threads read at once but only one thread write.
+
+    A writer waits until the readers inside have left, and readers that arrive while a writer
+    is waiting queue up behind it, so a steady stream of reads cannot keep a write out.
+    The lock is not reentrant: a thread holding it must not take it again, for reading or
+    writing.
+
+    Example:
+    lock = ReadWriteLock()
+    with lock.reading():
+        record = store.get(42)
+    with lock.writing():
+        store.delete(42)
+
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self):
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """Hold the lock as one of its readers for the `with` block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """Hold the lock as its only writer for the `with` block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,337 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+from csv_loader import CHUNK_SIZE, CsvLoader, read_storage_csv, write_storage_csv
+from storage_store import StorageRecord
+
+
+# The snapshot sits next to the CSV it was saved with: ProjectStorage.csv -> ProjectStorage.snapshot
+SNAPSHOT_SUFFIX = '.snapshot'
+
+MAGIC = b'STORSNAP'
+VERSION = 1
+
+# magic, version, CRC-32 of everything after the header, record count, string count,
+# string blob size, and the size and mtime (ns) of the CSV the snapshot was saved with
+HEADER = struct.Struct('<8sIIQQQqq')
+
+# Text fields kept as references into the string table, in StorageRecord order
+STRING_FIELDS = ("product", "first_name", "last_name", "phone_number", "email")
+
+# Records decoded together by SnapshotReader.rows
+ROWS_CHUNK = 4096
+
+
+class SnapshotError(ValueError):
+    """A snapshot file that is not a snapshot, is from another version or is damaged."""
+
+
+def snapshot_path(csv_path):
+    """Return the snapshot file that belongs to a storage CSV."""
+    return os.path.splitext(csv_path)[0] + SNAPSHOT_SUFFIX
+
+
+def source_stamp(csv_path):
+    # size and mtime of the CSV, or (-1, -1) when there is none
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return -1, -1
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_snapshot(path, rows, source=(-1, -1)):
+
+    """
+    Write rows to a snapshot file.
+
+    Layout, all little-endian and 8-byte aligned up to the string blob:
+    HEADER, then the itemID column (int64), the quantity column (int64), the record
+    positions sorted by itemID (int64, for binary search), the string table offsets
+    (uint64, one more than there are strings), one uint32 reference column per field in
+    STRING_FIELDS, and the UTF-8 blob of the interned strings. Every distinct string is
+    stored once, so repeated products and names cost 4 bytes a record.
+
+    An itemID that comes more than once (a CSV edited by hand) is stored once, with the
+    fields of its last row at the position of its first, the same way StorageStore.put
+    loads it.
+
+    The file is written to a temp file, read back to check its CRC-32, and moved into place
+    with os.replace, so a snapshot in place has already been verified once and opening it
+    does not have to read it all again.
+
+    Parameters:
+    - rows (iterable): (itemID, product, quantity, first name, last name, phone number, email) tuples.
+    - source (tuple): The size and mtime of the CSV the rows match (see `source_stamp`).
+
+    Returns the number of records written.
+
+    """
+
+    if sys.byteorder != 'little':
+        raise SnapshotError("Snapshots can only be written on little-endian machines.")
+
+    item_ids = array('q')
+    quantities = array('q')
+    references = [array('I') for _field in STRING_FIELDS]
+    table = {}
+    # itemID -> position, to overwrite a repeated itemID in place
+    positions = {}
+    for itemID, product, quantity, first_name, last_name, phone_number, email in rows:
+        position = positions.get(itemID)
+        if position is None:
+            position = positions[itemID] = len(item_ids)
+            item_ids.append(itemID)
+            quantities.append(quantity)
+            for column in references:
+                column.append(0)
+        else:
+            quantities[position] = quantity
+        for column, text in zip(references, (product, first_name, last_name, phone_number, email)):
+            reference = table.get(text)
+            if reference is None:
+                reference = table[text] = len(table)
+            column[position] = reference
+    del positions
+
+    order = array('q', sorted(range(len(item_ids)), key=item_ids.__getitem__))
+    blob = bytearray()
+    offsets = array('Q', [0])
+    for text in table:
+        blob += text.encode('utf-8')
+        offsets.append(len(blob))
+
+    body = [item_ids, quantities, order, offsets, *references, blob]
+    checksum = 0
+    for part in body:
+        checksum = zlib.crc32(part, checksum)
+    header = HEADER.pack(MAGIC, VERSION, checksum, len(item_ids), len(table), len(blob), *source)
+
+    folder = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix='.snapshot-', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(header)
+            for part in body:
+                file.write(part)
+            file.flush()
+            os.fsync(file.fileno())
+        SnapshotReader(temp_path, verify=True).close()
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(item_ids)
+
+
+class SnapshotReader:
+
+    """
+    Read-only view of a snapshot file through mmap.
+
+    Opening maps the file, checks the header and the size and lays memoryviews over the
+    columns; nothing else is read. The CRC-32 of the whole file is only checked when asked
+    for (`verify`), since `write_snapshot` checks it before the file is put in place. Records are decoded one at a time when they are asked
+    for, and each string of the table is decoded the first time a record needs it and then
+    shared, so an item's product and names are the same objects across records.
+
+    Parameters:
+    - path (str): The snapshot file.
+    - verify (bool): Check the CRC-32 of the file when it is opened (see `verify`).
+
+    Raises SnapshotError if the file is not a valid snapshot.
+
+    Example:
+    with SnapshotReader('ProjectStorage.snapshot') as snapshot:
+        snapshot.get(123)
+        snapshot.page(0, 25)
+
+    """
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER.size:
+                raise SnapshotError(f"{path} is too short to be a snapshot.")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._open(size, verify)
+        except BaseException:
+            self._map.close()
+            raise
+
+    def _open(self, size, verify):
+        magic, version, checksum, count, strings, blob_size, *source = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a storage snapshot.")
+        if version != VERSION:
+            raise SnapshotError(f"{self.path} is a version {version} snapshot; this app reads version {VERSION}.")
+        if size != HEADER.size + 24 * count + 8 * (strings + 1) + 4 * len(STRING_FIELDS) * count + blob_size:
+            raise SnapshotError(f"{self.path} is damaged: it has the wrong size.")
+
+        body = memoryview(self._map)[HEADER.size:]
+        self._checksum = checksum
+        if verify and zlib.crc32(body) != checksum:
+            body.release()
+            raise SnapshotError(f"{self.path} is damaged: its checksum does not match.")
+
+        self.source = tuple(source)
+        self._count = count
+        self._views = [body]
+
+        def column(start, length, code):
+            view = body[start:start + length * struct.calcsize(code)].cast(code)
+            self._views.append(view)
+            return view, start + length * struct.calcsize(code)
+
+        self._item_ids, at = column(0, count, 'q')
+        self._quantities, at = column(at, count, 'q')
+        self._order, at = column(at, count, 'q')
+        self._offsets, at = column(at, strings + 1, 'Q')
+        self._references = []
+        for _field in STRING_FIELDS:
+            references, at = column(at, count, 'I')
+            self._references.append(references)
+        self._blob = body[at:]
+        self._views.append(self._blob)
+
+        # decoded strings, filled in as records need them
+        self._strings = [None] * strings
+
+    def verify(self):
+        """Read the whole file and check its CRC-32. Raises SnapshotError if it does not match."""
+        if zlib.crc32(self._views[0]) != self._checksum:
+            raise SnapshotError(f"{self.path} is damaged: its checksum does not match.")
+
+    def close(self):
+        """Release the columns and unmap the file."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _string(self, reference):
+        text = self._strings[reference]
+        if text is None:
+            text = self._strings[reference] = str(self._blob[self._offsets[reference]:self._offsets[reference + 1]], 'utf-8')
+        return text
+
+    def _row(self, position):
+        string = self._string
+        products, first_names, last_names, phone_numbers, emails = self._references
+        return (self._item_ids[position], string(products[position]), self._quantities[position], string(first_names[position]),
+                string(last_names[position]), string(phone_numbers[position]), string(emails[position]))
+
+    def record(self, position):
+        """Return the StorageRecord at a position, counted from the oldest item."""
+        return StorageRecord(*self._row(position))
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self.record(position)
+
+    def page(self, start, count):
+        """Return the records at positions start to start + count, like StorageStore.page."""
+        return [self.record(position) for position in range(max(start, 0), min(start + count, self._count))]
+
+    def get(self, itemID):
+        """Return the StorageRecord for itemID in O(log n), or None if it is not in the snapshot."""
+        item_ids, order = self._item_ids, self._order
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if item_ids[order[middle]] < itemID:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and item_ids[order[low]] == itemID:
+            return self.record(order[low])
+        return None
+
+    def rows(self, start=0, stop=None):
+        """Yield the records from start to stop as store tuples, ready for StorageStore.put_many."""
+        stop = self._count if stop is None else min(stop, self._count)
+        string = self._string
+        strings = self._strings
+        # whole column slices at a time, so each value is read with one tolist() instead of an index call
+        for chunk in range(start, stop, ROWS_CHUNK):
+            end = min(chunk + ROWS_CHUNK, stop)
+            fields = [[strings[reference] or string(reference) for reference in column[chunk:end].tolist()] for column in self._references]
+            yield from zip(self._item_ids[chunk:end].tolist(), fields[0], self._quantities[chunk:end].tolist(), *fields[1:])
+
+
+def open_current_snapshot(csv_path):
+    """
+    Open the snapshot of a storage CSV if it was saved with the CSV as it is now.
+
+    Returns a SnapshotReader, or None when there is no snapshot, it is damaged, or the CSV
+    has changed since (for example when a journal compaction rewrote it).
+
+    """
+    try:
+        snapshot = SnapshotReader(snapshot_path(csv_path))
+    except (FileNotFoundError, SnapshotError):
+        return None
+    if snapshot.source != source_stamp(csv_path):
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def csv_to_snapshot(csv_path, path=None):
+    """Convert a storage CSV to a snapshot. Returns the number of records written."""
+    return write_snapshot(path or snapshot_path(csv_path), read_storage_csv(csv_path), source_stamp(csv_path))
+
+
+def snapshot_to_csv(path, csv_path):
+    """Convert a snapshot back to a storage CSV. Returns the number of records written."""
+    with SnapshotReader(path) as snapshot:
+        return write_storage_csv(csv_path, snapshot.rows())
+
+
+class SnapshotLoader(CsvLoader):
+
+    """
+    Background reader that streams the records of a snapshot in chunks.
+
+    Works like CsvLoader, so the window's `poll_load` can drain either one, but decodes
+    records from an open SnapshotReader instead of parsing CSV text. Progress is counted in
+    records rather than bytes.
+
+    Parameters:
+    - snapshot (SnapshotReader): The open snapshot to read.
+    - chunk_size (int): The number of records per chunk.
+
+    """
+
+    def __init__(self, snapshot, chunk_size=CHUNK_SIZE):
+        super().__init__(snapshot.path, chunk_size)
+        self.snapshot = snapshot
+
+    def _read(self):
+        snapshot = self.snapshot
+        self.total_bytes = len(snapshot)
+        for start in range(0, len(snapshot), self.chunk_size):
+            if self._cancelled.is_set():
+                return
+            chunk = list(snapshot.rows(start, start + self.chunk_size))
+            self.rows_read += len(chunk)
+            self.bytes_read = self.rows_read
+            if not self._publish(chunk):
+                return
@@ -0,0 +1,369 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from heapq import nlargest
+
+from indexes import MATCH_LIMIT, match_score
+from storage_store import INDEXED_FIELDS, PREFIX_FIELDS, QUICK_SEARCH_FIELDS, Customer, ProductTotal, StorageRecord, normalize
+
+
+# Columns of the items table, in StorageRecord order
+COLUMNS = "itemID, product, quantity, first_name, last_name, phone_number, email"
+
+# seq gives every row its insertion order, so recency and paging walk the primary key.
+# Text columns compare case-insensitively, like the in-memory indexes.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    seq INTEGER PRIMARY KEY,
+    itemID INTEGER NOT NULL UNIQUE,
+    product TEXT NOT NULL COLLATE NOCASE,
+    quantity INTEGER NOT NULL,
+    first_name TEXT NOT NULL COLLATE NOCASE,
+    last_name TEXT NOT NULL COLLATE NOCASE,
+    phone_number TEXT NOT NULL COLLATE NOCASE,
+    email TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS items_quantity ON items (quantity);
+""" + "".join(f"CREATE INDEX IF NOT EXISTS items_{field} ON items ({field});\n" for field in INDEXED_FIELDS)
+
+# Statements are kept as constants so sqlite3's statement cache prepares each one only once
+SELECT_ITEM = f"SELECT {COLUMNS} FROM items WHERE itemID = ?"
+CONTAINS_ITEM = "SELECT 1 FROM items WHERE itemID = ?"
+INSERT_ITEM = f"INSERT INTO items ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+UPSERT_ITEM = (f"INSERT INTO items ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (itemID) DO UPDATE SET product = excluded.product, quantity = excluded.quantity, "
+               "first_name = excluded.first_name, last_name = excluded.last_name, "
+               "phone_number = excluded.phone_number, email = excluded.email")
+DELETE_ITEM = "DELETE FROM items WHERE itemID = ?"
+SELECT_QUANTITY = "SELECT quantity FROM items WHERE itemID = ?"
+UPDATE_QUANTITY = "UPDATE items SET quantity = ? WHERE itemID = ?"
+COUNT_ITEMS = "SELECT COUNT(*) FROM items"
+ALL_ITEMS = f"SELECT {COLUMNS} FROM items ORDER BY seq"
+PAGE_OLDEST = f"SELECT {COLUMNS} FROM items ORDER BY seq LIMIT ? OFFSET ?"
+PAGE_NEWEST = f"SELECT {COLUMNS} FROM items ORDER BY seq DESC LIMIT ? OFFSET ?"
+# the rows after a seq, so a full scan walks the primary key instead of skipping OFFSET rows every time
+PAGE_AFTER = f"SELECT seq, {COLUMNS} FROM items WHERE seq > ? ORDER BY seq LIMIT ?"
+SEARCH_EXACT = {field: f"SELECT itemID FROM items WHERE {field} = ?" for field in INDEXED_FIELDS}
+SEARCH_PREFIX = {field: f"SELECT itemID FROM items WHERE {field} LIKE ? ESCAPE '\\'" for field in PREFIX_FIELDS}
+# the distinct values containing the Quick Search query; LIKE ignores ASCII case
+SEARCH_CONTAINS = {field: f"SELECT DISTINCT {field} FROM items WHERE {field} LIKE ? ESCAPE '\\' LIMIT {MATCH_LIMIT}"
+                   for field in QUICK_SEARCH_FIELDS}
+COUNT_DISTINCT = {field: f"SELECT COUNT(DISTINCT {field}) FROM items" for field in INDEXED_FIELDS}
+COUNT_CUSTOMERS = "SELECT COUNT(*) FROM (SELECT DISTINCT first_name COLLATE BINARY, last_name COLLATE BINARY, phone_number COLLATE BINARY, email COLLATE BINARY FROM items)"
+# the email index finds the candidates; the binary comparisons keep only the exact customer
+CUSTOMER_ITEMS = ("SELECT itemID FROM items WHERE email = ? AND email = ? COLLATE BINARY AND first_name = ? COLLATE BINARY "
+                  "AND last_name = ? COLLATE BINARY AND phone_number = ? COLLATE BINARY")
+# SQLite's SUM stops with "integer overflow" past 64 bits, which ten large quantities reach, so
+# units are summed as their high and low 32 bits and put back together in Python (see join_units)
+TOTAL_QUANTITY = "SELECT COALESCE(SUM(quantity >> 32), 0), COALESCE(SUM(quantity & 4294967295), 0) FROM items"
+PRODUCT_TOTALS = ("SELECT MIN(product), SUM(quantity >> 32), SUM(quantity & 4294967295), COUNT(*) "
+                  "FROM items GROUP BY product ORDER BY product")
+LOW_STOCK = "SELECT itemID FROM items WHERE quantity <= ? ORDER BY seq"
+
+# Most itemIDs put in one "IN (...)" list
+IN_LIST_SIZE = 500
+
+# Rows read at a time by `records`
+SCAN_PAGE_SIZE = 5000
+
+
+def join_units(high, low):
+    # the exact number of units from the sums of their high and low 32 bits
+    return (high << 32) + low
+
+
+def like_prefix(prefix):
+    # escape LIKE's wildcards so the prefix is matched literally
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def like_contains(text):
+    # a LIKE pattern matching every value that holds the text
+    return "%" + like_prefix(text)
+
+
+class SqliteStore:
+
+    """
+    StorageStore backed by an SQLite database instead of memory.
+
+    It has the same methods as StorageStore, so StorageCore and the views can use either.
+    Nothing is read when it opens; every operation is a query on indexed columns, so startup
+    is O(1) and the data set does not have to fit in memory. The database runs in WAL mode,
+    bulk writes go through `executemany`, and changes stay in one open transaction until
+    `commit` (the app's save).
+
+    Parameters:
+    - path (str): The database file, e.g. 'ProjectStorage.db'.
+
+    Example:
+    store = SqliteStore('ProjectStorage.db')
+    store.add(123, "Laptop", 5, "John", "Doe", "123-456-7890", "john@example.com")
+    store.commit()
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # the window and background loaders share the connection; the lock keeps their statements apart
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.executescript(SCHEMA)
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _write(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters)
+
+    @contextmanager
+    def _savepoint(self, name):
+        # a savepoint inside the connection's open transaction: RELEASE keeps the changes for
+        # `commit` instead of committing them, and any failure undoes this batch only
+        with self._lock:
+            connection = self._connection
+            if not connection.in_transaction:
+                connection.execute("BEGIN")
+            connection.execute(f"SAVEPOINT {name}")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute(f"ROLLBACK TO {name}")
+                connection.execute(f"RELEASE {name}")
+                raise
+            connection.execute(f"RELEASE {name}")
+
+    def __len__(self):
+        return self._query(COUNT_ITEMS)[0][0]
+
+    @property
+    def compacted(self):
+        """Always True: the database pages itself, so `page` only reads (see StorageStore.compacted)."""
+        return True
+
+    def __contains__(self, itemID):
+        return bool(self._query(CONTAINS_ITEM, (itemID,)))
+
+    def __iter__(self):
+        return self.records()
+
+    def get(self, itemID):
+        """Return the StorageRecord for itemID, or None if it is not in the store."""
+        rows = self._query(SELECT_ITEM, (itemID,))
+        return StorageRecord(*rows[0]) if rows else None
+
+    def add(self, itemID, product, quantity, first_name, last_name, phone_number, email):
+        """Add a new item. Raises KeyError if the itemID is already in the store."""
+        try:
+            self._write(INSERT_ITEM, (itemID, product, quantity, first_name, last_name, phone_number, email))
+        except sqlite3.IntegrityError:
+            raise KeyError(itemID)
+
+    def put(self, itemID, product, quantity, first_name, last_name, phone_number, email):
+        """Add an item, or overwrite it in place if the itemID is already stored."""
+        self._write(UPSERT_ITEM, (itemID, product, quantity, first_name, last_name, phone_number, email))
+
+    def put_many(self, rows):
+        """Call `put` for every row in rows, as one executemany."""
+        with self._lock:
+            self._connection.executemany(UPSERT_ITEM, rows)
+
+    def add_many(self, rows):
+        """
+        Add many new items in one go, or none of them.
+
+        Raises KeyError if any itemID is already in the store.
+
+        """
+        try:
+            with self._savepoint("add_many") as connection:
+                connection.executemany(INSERT_ITEM, rows)
+        except sqlite3.IntegrityError as error:
+            raise KeyError(str(error))
+
+    def set_quantity(self, itemID, quantity):
+        """Change the quantity of an item in place. Returns the previous quantity; KeyError if it is not stored."""
+        with self._lock:
+            rows = self._connection.execute(SELECT_QUANTITY, (itemID,)).fetchall()
+            if not rows:
+                raise KeyError(itemID)
+            self._connection.execute(UPDATE_QUANTITY, (quantity, itemID))
+        return rows[0][0]
+
+    def set_quantities(self, changes):
+        """
+        Change the quantity of many items, as one executemany, or of none of them.
+
+        Raises KeyError if any itemID is not in the store.
+
+        """
+        with self._savepoint("set_quantities") as connection:
+            updated = connection.executemany(UPDATE_QUANTITY, [(quantity, itemID) for itemID, quantity in changes]).rowcount
+            if updated != len(changes):
+                raise KeyError("an itemID in the batch is not in the store")
+
+    def delete(self, itemID):
+        """Delete an item. Returns True if it was deleted, False if it was not in the store."""
+        return self._write(DELETE_ITEM, (itemID,)).rowcount > 0
+
+    def clear(self):
+        """Remove every item from the store."""
+        self._write("DELETE FROM items")
+
+    def commit(self):
+        """Make the changes since the last commit durable."""
+        with self._lock:
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def records(self):
+        """Yield a StorageRecord for every item, oldest first."""
+        # read in pages so the lock is never held while the caller works on a record; each page
+        # starts after the last seq of the one before, so the whole scan is O(n)
+        after = 0
+        while True:
+            rows = self._query(PAGE_AFTER, (after, SCAN_PAGE_SIZE))
+            for row in rows:
+                yield StorageRecord(*row[1:])
+            if len(rows) < SCAN_PAGE_SIZE:
+                return
+            after = rows[-1][0]
+
+    def item_ids(self):
+        """Yield every itemID, oldest first."""
+        for record in self.records():
+            yield record.itemID
+
+    def page(self, start, count, newest_first=False):
+        """Return the records at positions start to start + count (see StorageStore.page)."""
+        rows = self._query(PAGE_NEWEST if newest_first else PAGE_OLDEST, (count, max(start, 0)))
+        return [StorageRecord(*row) for row in rows]
+
+    def most_recent(self, count):
+        """Return the `count` most recently added records, newest first."""
+        return self.page(0, count, newest_first=True)
+
+    def search_ids(self, field, value, prefix=False):
+        """Return the set of itemIDs whose field matches value, ignoring case (see StorageStore.search_ids)."""
+        if field == "itemID":
+            if prefix or not value.isdigit():
+                raise ValueError("itemID can only be searched by its exact digits.")
+            itemID = int(value)
+            return {itemID} if itemID in self and str(itemID) == value else set()
+
+        statements = SEARCH_PREFIX if prefix else SEARCH_EXACT
+        if field not in statements:
+            raise ValueError(f"{field.replace('_', ' ')} cannot be searched{' by prefix' if prefix else ''}.")
+        return {row[0] for row in self._query(statements[field], (like_prefix(value) if prefix else value,))}
+
+    def records_for(self, item_ids, limit=None):
+        """Return the StorageRecords of item_ids, oldest first; itemIDs not in the database are skipped."""
+        item_ids = list(item_ids)
+        rows = []
+        for start in range(0, len(item_ids), IN_LIST_SIZE):
+            chunk = item_ids[start:start + IN_LIST_SIZE]
+            rows += self._query(f"SELECT seq, {COLUMNS} FROM items WHERE itemID IN ({', '.join('?' * len(chunk))})", chunk)
+        rows.sort()
+        if limit is not None:
+            rows = rows[:limit]
+        return [StorageRecord(*row[1:]) for row in rows]
+
+    def search(self, field, value, prefix=False, limit=None):
+        """Find items by any field (see StorageStore.search)."""
+        return self.records_for(self.search_ids(field, value, prefix), limit)
+
+    @property
+    def quick_search_ready(self):
+        return True
+
+    def prepare_quick_search(self):
+        """Nothing to build: the database has no trigram index (see `quick_search`)."""
+
+    def quick_search(self, value, limit):
+        """
+        Find up to `limit` items whose product, names or email contain value, best match first.
+
+        Ranked like StorageStore.quick_search, but substring matches only: the values come
+        from a LIKE scan of the table rather than a trigram index, so there are no fuzzy
+        matches and every keystroke reads the whole table.
+
+        """
+        value = value.strip()
+        if not value or limit <= 0:
+            return []
+        query = normalize(value)
+        matches = []
+        for order, field in enumerate(QUICK_SEARCH_FIELDS):
+            for (key,) in self._query(SEARCH_CONTAINS[field], (like_contains(value),)):
+                score = match_score(query, normalize(key))
+                if score:
+                    matches.append((-score, order, len(key), key, field))
+        matches.sort()
+
+        found = []
+        seen = set()
+        for _score, _order, _length, key, field in matches:
+            item_ids = self.search_ids(field, key) - seen
+            if item_ids:
+                seen |= item_ids
+                found.extend(self.records_for(item_ids, limit - len(found)))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def distinct(self, field):
+        """Return the number of different values of an indexed field."""
+        return self._query(COUNT_DISTINCT[field])[0][0]
+
+    def product_count(self):
+        """Return the number of different products, ignoring case."""
+        return self.distinct("product")
+
+    def email_count(self):
+        """Return the number of different emails, ignoring case."""
+        return self.distinct("email")
+
+    def customer_count(self):
+        """Return the number of different customers (first name, last name, phone number, email) with items."""
+        return self._query(COUNT_CUSTOMERS)[0][0]
+
+    def customers_for(self, item_ids):
+        """Return the Customers who own any of item_ids, sorted by last name, first name and email."""
+        item_ids = list(item_ids)
+        found = set()
+        for start in range(0, len(item_ids), IN_LIST_SIZE):
+            chunk = item_ids[start:start + IN_LIST_SIZE]
+            sql = f"SELECT first_name, last_name, phone_number, email FROM items WHERE itemID IN ({', '.join('?' * len(chunk))})"
+            found.update(Customer(*row) for row in self._query(sql, chunk))
+        return sorted(found, key=lambda customer: (normalize(customer.last_name), normalize(customer.first_name), customer.email))
+
+    def customer_item_ids(self, customer):
+        """Return the set of itemIDs a customer owns (see StorageStore.customer_item_ids)."""
+        parameters = (customer.email, customer.email, customer.first_name, customer.last_name, customer.phone_number)
+        return {row[0] for row in self._query(CUSTOMER_ITEMS, parameters)}
+
+    def total_quantity(self):
+        """Return the number of units on hand over every item."""
+        return join_units(*self._query(TOTAL_QUANTITY)[0])
+
+    def product_totals(self):
+        """Return a ProductTotal for every product, sorted by product name (see StorageStore.product_totals)."""
+        return [ProductTotal(product, join_units(high, low), items) for product, high, low, items in self._query(PRODUCT_TOTALS)]
+
+    def top_products(self, count):
+        """Return the ProductTotals of the `count` products with the most units, most first."""
+        # ranked in Python, where the sums cannot overflow; O(products) like product_totals
+        return nlargest(count, self.product_totals(), key=lambda total: total.units)
+
+    def low_stock_ids(self, threshold):
+        """Return the itemIDs of the items with at most `threshold` units, oldest first."""
+        return [row[0] for row in self._query(LOW_STOCK, (threshold,))]
@@ -0,0 +1,279 @@
+"""
+Command line for the storage system.
+
+Runs the same operations as the Storage Management window through StorageCore, without
+a display. It never imports tkinter, so it starts quickly and works in scripts and batch jobs.
+
+Usage:
+python storage_cli.py [--storage ProjectStorage.csv] [--backend memory|sqlite] [--compress-level N] [--perf] [--profile] <command> ...
+
+A storage file named .gz, .bz2 or .xz is kept compressed, at --compress-level if given.
+
+--perf prints the call counts, latencies, rows and bytes of every operation as JSON to
+stderr once the command is done; --profile also runs the command under cProfile and
+prints its busiest functions.
+
+Commands:
+load FILE [FILE ...]       bulk import CSV files into the storage, in parallel with --workers N
+add ITEMID PRODUCT QUANTITY FIRST LAST PHONE EMAIL
+find ITEMID                print one item
+find --field FIELD VALUE   search by product, first_name, last_name, phone_number or email
+quick TEXT [--limit N]     print the best matches of TEXT in products, names and emails, typos included
+customer --field FIELD VALUE
+                           print a customer's items and totals, by email, phone_number or name
+delete ITEMID              delete an item
+move ITEMID in|out|set N [ITEMID in|out|set N ...]
+                           check stock in or out, or set quantities; all moves or none
+export FILE [--compression gzip|bz2|lzma|none] [--level N]
+                           write every item to a CSV file, compressed by FILE's extension or --compression
+changes [--since N] [--format csv|jsonl] [--output FILE]
+                           write the saved changes after sequence number N, without loading the storage
+snapshot                   save, then write the binary snapshot the next load maps in
+convert SOURCE TARGET      convert a storage CSV to a snapshot or back (by extension)
+stats                      print figures about the storage as JSON
+stock                      print units on hand, product totals and low stock items as JSON
+serve [--port N]           serve the storage as a local HTTP/JSON service (see storage_service.py)
+
+"""
+import argparse
+import json
+import sys
+
+from bulk_import import IMPORT_WORKERS
+from changes import CHANGE_FORMATS
+from csv_loader import COMPRESSIONS
+from instrumentation import performance
+from storage_core import (BACKENDS, CUSTOMER_FIELDS, DEFAULT_BACKEND, LOW_STOCK_THRESHOLD, QUICK_SEARCH_LIMIT, STORAGE_PATH, StorageCore,
+                          StorageError, format_customer, format_record)
+from snapshot import SNAPSHOT_SUFFIX, csv_to_snapshot, snapshot_to_csv
+from storage_service import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, serve
+from validation import ValidationError
+
+
+def command_load(core, args):
+    importer = core.import_files(args.files, args.rejects, args.workers)
+    print(importer.summary())
+    return True
+
+
+def command_add(core, args):
+    record = core.add_item(args.itemID, args.product, args.quantity, args.first_name, args.last_name, args.phone_number, args.email)
+    print(f"Item {record.itemID} has been added successfully.")
+    return True
+
+
+def command_find(core, args):
+    if args.field == "itemID" and not args.prefix:
+        print(format_record(core.find_item(args.value)))
+        return False
+
+    total, records = core.search(args.field, args.value, args.prefix, args.limit)
+    print(f"Items found: {total}\n")
+    for record in records:
+        print(format_record(record))
+    return False
+
+
+def command_quick(core, args):
+    records = core.quick_search(args.text, args.limit)
+    print(f"Best matches: {len(records)}\n")
+    for record in records:
+        print(format_record(record))
+    return False
+
+
+def command_customer(core, args):
+    found = core.find_customers(args.field, args.value)
+    print(f"Customers found: {len(found)}\n")
+    for customer_items in found:
+        print(format_customer(customer_items))
+        for record in customer_items.records:
+            print(format_record(record))
+    return False
+
+
+def command_delete(core, args):
+    core.delete_item(args.itemID)
+    print(f"Item {args.itemID} has been deleted.")
+    return True
+
+
+def command_move(core, args):
+    if len(args.moves) % 3:
+        raise ValueError("move takes ITEMID in|out|set N for every movement.")
+    moves = [tuple(args.moves[i:i + 3]) for i in range(0, len(args.moves), 3)]
+    for (itemID, _kind, _amount), quantity in zip(moves, core.move_stock(moves)):
+        print(f"Item {itemID} now has {quantity} units.")
+    return True
+
+
+def command_export(core, args):
+    count = core.export(args.file, args.compression, args.level)
+    print(f"Exported {count} items to {args.file}.")
+    return False
+
+
+def command_changes(core, args):
+    if args.output is None:
+        written, last = core.export_changes(sys.stdout, args.since, args.format, args.limit)
+    else:
+        with open(args.output, 'w', newline='') as out:
+            written, last = core.export_changes(out, args.since, args.format, args.limit)
+    print(f"Exported {written} changes; the next export starts after {last}.", file=sys.stderr)
+    return False
+
+
+def command_snapshot(core, args):
+    count = core.save_snapshot()
+    print(f"Saved a snapshot of {count} items.")
+    return False
+
+
+def command_convert(core, args):
+    if args.source.endswith(SNAPSHOT_SUFFIX):
+        count = snapshot_to_csv(args.source, args.target)
+    else:
+        count = csv_to_snapshot(args.source, args.target)
+    print(f"Converted {count} items to {args.target}.")
+    return False
+
+
+def command_stats(core, args):
+    print(json.dumps(core.stats(), indent=2))
+    return False
+
+
+def command_stock(core, args):
+    report = core.stock_report(args.top, args.threshold)
+    for key in ("products", "top_products"):
+        report[key] = [total._asdict() for total in report[key]]
+    print(json.dumps(report, indent=2))
+    return False
+
+
+def command_serve(core, args):
+    def ready(service):
+        host, port = service.server_address[:2]
+        print(f"Serving {len(core)} items on http://{host}:{port}/ with {args.workers} workers. Press Ctrl+C to stop.", flush=True)
+    serve(core, args.host, args.port, args.workers, args.verbose, ready)
+    return True
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="storage_cli.py", description="Headless storage management.")
+    parser.add_argument("--storage", default=STORAGE_PATH, help="the storage CSV file (default: %(default)s)")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=BACKENDS, help="where the items are kept (default: %(default)s)")
+    parser.add_argument("--compress-level", type=int, help="compression level of a compressed storage file (default: the codec's)")
+    parser.add_argument("--perf", action="store_true", help="print performance counters as JSON to stderr when done")
+    parser.add_argument("--profile", action="store_true", help="profile the command with cProfile (implies --perf)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="bulk import CSV files into the storage")
+    load.add_argument("files", nargs="+")
+    load.add_argument("--rejects", default="ImportRejects.csv", help="where rejected rows are written")
+    load.add_argument("--workers", type=int, default=IMPORT_WORKERS,
+                      help="processes that parse and validate large imports; 1 reads on one core (default: %(default)s)")
+    load.set_defaults(run=command_load)
+
+    add = commands.add_parser("add", help="add an item")
+    for name in ("itemID", "product", "quantity", "first_name", "last_name", "phone_number", "email"):
+        add.add_argument(name)
+    add.set_defaults(run=command_add)
+
+    find = commands.add_parser("find", help="find items by itemID or another field")
+    find.add_argument("value")
+    find.add_argument("--field", default="itemID", choices=["itemID", "product", "first_name", "last_name", "phone_number", "email"])
+    find.add_argument("--prefix", action="store_true", help="match values starting with VALUE")
+    find.add_argument("--limit", type=int, default=50, help="most items to print")
+    find.set_defaults(run=command_find)
+
+    quick = commands.add_parser("quick", help="print the best matches of some text in products, names and emails")
+    quick.add_argument("text")
+    quick.add_argument("--limit", type=int, default=QUICK_SEARCH_LIMIT, help="most items to print")
+    quick.set_defaults(run=command_quick)
+
+    customer = commands.add_parser("customer", help="print a customer's items and totals")
+    customer.add_argument("value")
+    customer.add_argument("--field", default="email", choices=CUSTOMER_FIELDS)
+    customer.set_defaults(run=command_customer)
+
+    delete = commands.add_parser("delete", help="delete an item")
+    delete.add_argument("itemID")
+    delete.set_defaults(run=command_delete)
+
+    move = commands.add_parser("move", help="check stock in or out, or set quantities")
+    move.add_argument("moves", nargs="+", metavar="ITEMID in|out|set N")
+    move.set_defaults(run=command_move)
+
+    export = commands.add_parser("export", help="write every item to a CSV file")
+    export.add_argument("file")
+    export.add_argument("--compression", choices=COMPRESSIONS + ('none',), help="compress with this codec whatever FILE's extension")
+    export.add_argument("--level", type=int, help="compression level (default: --compress-level, else the codec's)")
+    export.set_defaults(run=command_export)
+
+    changes = commands.add_parser("changes", help="write the saved changes after a sequence number as CSV or JSON Lines")
+    changes.add_argument("--since", type=int, default=0, help="the last sequence number already applied (default: %(default)s)")
+    changes.add_argument("--format", default="csv", choices=CHANGE_FORMATS)
+    changes.add_argument("--limit", type=int, help="most changes to write")
+    changes.add_argument("--output", help="the file to write (default: standard output)")
+    # the changes come from the change log alone, so the storage is not loaded
+    changes.set_defaults(run=command_changes, needs_store=False)
+
+    snapshot = commands.add_parser("snapshot", help="save and write a binary snapshot of the storage")
+    snapshot.set_defaults(run=command_snapshot)
+
+    convert = commands.add_parser("convert", help="convert a storage CSV to a snapshot or a snapshot to a CSV")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    convert.set_defaults(run=command_convert, needs_store=False)
+
+    stats = commands.add_parser("stats", help="print figures about the storage")
+    stats.set_defaults(run=command_stats)
+
+    stock = commands.add_parser("stock", help="print units on hand, per-product totals and low stock items")
+    stock.add_argument("--top", type=int, default=10, help="how many products to rank")
+    stock.add_argument("--threshold", type=int, default=LOW_STOCK_THRESHOLD, help="the highest quantity that counts as low stock")
+    stock.set_defaults(run=command_stock)
+
+    service = commands.add_parser("serve", help="serve the storage as a local HTTP/JSON service")
+    service.add_argument("--host", default=SERVICE_HOST, help="address to listen on (default: %(default)s)")
+    service.add_argument("--port", type=int, default=SERVICE_PORT, help="port to listen on (default: %(default)s)")
+    service.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="worker threads (default: %(default)s)")
+    service.add_argument("--verbose", action="store_true", help="log every request")
+    service.set_defaults(run=command_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    core = StorageCore(args.storage, args.backend, args.compress_level)
+    if args.perf or args.profile:
+        performance.enable()
+    try:
+        if getattr(args, "needs_store", True):
+            core.load()
+        # armed after the load, so the profile is of the command itself
+        if args.profile:
+            performance.profile_next()
+        # commands that change the storage return True so their changes get saved
+        if args.run(core, args):
+            core.save()
+    except (ValidationError, StorageError) as error:
+        print(f"{error.title}: {error.message}", file=sys.stderr)
+        return 1
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if args.perf or args.profile:
+            report = performance.snapshot()
+            # the profile is printed as text after the counters rather than as one JSON string
+            profile = report["last_profile"].pop("report") if report["last_profile"] is not None else None
+            print(json.dumps(report, indent=2), file=sys.stderr)
+            if profile is not None:
+                print(profile, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
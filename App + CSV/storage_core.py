@@ -0,0 +1,722 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+from bulk_import import IMPORT_WORKERS, REJECTS_PATH, BulkImporter
+from changes import ChangeLog
+from csv_loader import read_storage_csv, write_storage_csv
+from instrumentation import measured, performance
+from journal import Journal
+from movements import CHECK_IN, CHECK_OUT, MOVEMENT_KINDS, SET_QUANTITY, MovementLog
+from rwlock import ReadWriteLock
+from snapshot import csv_to_snapshot, open_current_snapshot, snapshot_path, write_snapshot
+from sqlite_store import SqliteStore
+from storage_store import StorageStore
+from validation import DIGITS, INVALID_ITEM_ID, INVALID_QUANTITY, ITEM_ID, ITEM_ID_LEADING_ZERO, ValidationError, validate_item
+
+
+# The CSV file the storage system is saved in
+STORAGE_PATH = 'ProjectStorage.csv'
+
+# Ways to look up a customer: by email, phone number, or name ("First Last", or one of them)
+CUSTOMER_FIELDS = ("email", "phone_number", "name")
+
+# One customer found by `find_customers`: the Customer, their items oldest first and the units they hold
+CustomerItems = namedtuple("CustomerItems", ["customer", "records", "units"])
+
+# Largest quantity an item can hold (the quantity column is 64-bit)
+MAX_QUANTITY = 2**63 - 1
+
+# Items with at most this many units count as low stock unless another threshold is given
+LOW_STOCK_THRESHOLD = 5
+
+# Items a Quick Search returns unless another limit is given
+QUICK_SEARCH_LIMIT = 50
+
+# Where the items are kept: "memory" (StorageStore, saved to the CSV through the journal)
+# or "sqlite" (SqliteStore, in a database next to the CSV). Picked with STORAGE_BACKEND.
+BACKENDS = ('memory', 'sqlite')
+DEFAULT_BACKEND = os.environ.get('STORAGE_BACKEND', 'memory')
+
+
+class StorageError(Exception):
+
+    """
+    An operation on the storage system that could not be done.
+
+    Like ValidationError, it carries a short `title` and a `message` for the user.
+
+    """
+
+    title = "Storage Error"
+
+    def __init__(self, message, title=None):
+        super().__init__(message)
+        self.message = message
+        if title is not None:
+            self.title = title
+
+
+class DuplicateItemError(StorageError):
+    """An item was added with an itemID that is already in use."""
+    title = "Invalid ItemID"
+
+
+class ItemNotFoundError(StorageError):
+    """An itemID that is not in the storage system."""
+    title = "Item Not Found"
+
+
+class StockError(StorageError):
+    """A stock movement that would leave an item with a negative or impossible quantity."""
+    title = "Not Enough Stock"
+
+
+def format_record(record):
+    """Format one StorageRecord the way the app prints an item."""
+    return (f"itemID: {record.itemID}\nProduct: {record.product}\nQuantity: {record.quantity}\n"
+            f"Full Name: {record.first_name} {record.last_name}\nPhone Number: {record.phone_number}\nEmail Address: {record.email}\n")
+
+
+def format_customer(customer_items):
+    """Format a CustomerItems the way the app prints a customer."""
+    customer = customer_items.customer
+    return (f"Customer: {customer.first_name} {customer.last_name}\nPhone Number: {customer.phone_number}\nEmail Address: {customer.email}\n"
+            f"Items: {len(customer_items.records)}\nTotal Quantity: {customer_items.units}\n")
+
+
+def parse_quantity(quantity):
+    """
+    Turn a quantity typed by the user into an integer.
+
+    Raises ValidationError if it is not made of digits.
+
+    """
+    if isinstance(quantity, int) and quantity >= 0:
+        return quantity
+    if not isinstance(quantity, str) or not DIGITS.fullmatch(quantity.strip()):
+        raise ValidationError(*INVALID_QUANTITY)
+    return int(quantity)
+
+
+def parse_item_id(itemID):
+    """
+    Turn an itemID typed by the user into the integer the store uses.
+
+    Raises ValidationError if it is not made of digits, or starts with a 0 (see ITEM_ID).
+
+    """
+    if isinstance(itemID, int):
+        return itemID
+    itemID = itemID.strip()
+    if not ITEM_ID.fullmatch(itemID):
+        raise ValidationError(*(ITEM_ID_LEADING_ZERO if DIGITS.fullmatch(itemID) else INVALID_ITEM_ID))
+    return int(itemID)
+
+
+class StorageCore:
+
+    """
+    The storage system without any window.
+
+    Holds the store for one storage file and offers every operation the app has: add, find,
+    search, delete, load, save, import and export. With the "memory" backend the items live in
+    a StorageStore loaded from the CSV and saved through a Journal; with the "sqlite" backend
+    they live in a SqliteStore, nothing is loaded up front and a save commits the database.
+    The CSV stays the import and export format either way.
+
+    Operations return results and raise ValidationError or StorageError instead of showing
+    messageboxes, so they can run in scripts, batch jobs, benchmarks and the command line.
+    The Tk app is a thin client on top of one StorageCore. Nothing here imports tkinter.
+
+    Every operation is safe to call from several threads at once. The store sits behind a
+    ReadWriteLock: finds, searches, pages and reports share it, while anything that changes
+    items holds it alone, so a multi-column update or a whole batch of movements is seen
+    either completely or not at all. Exports copy the records they need while holding the
+    lock and write the file after letting go of it.
+
+    A storage file named .gz, .bz2 or .xz, or one that is already compressed, is read and
+    saved compressed (see open_storage_file).
+
+    Parameters:
+    - path (str): The CSV file the storage system is saved in.
+    - backend (str): One of BACKENDS.
+    - compress_level (int): The compression level of compressed saves and exports; None for
+      the codec's default (see DEFAULT_COMPRESSION_LEVELS).
+
+    Example:
+    core = StorageCore()
+    core.load()
+    core.add_item("123", "Laptop", "5", "John", "Doe", "123-456-7890", "john@example.com")
+    core.save()
+
+    """
+
+    def __init__(self, path=STORAGE_PATH, backend=DEFAULT_BACKEND, compress_level=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown storage backend {backend!r}; use one of {', '.join(BACKENDS)}.")
+        self.path = path
+        self.backend = backend
+        self.compress_level = compress_level
+        if backend == 'sqlite':
+            # the database keeps itself, so there is no journal to write or replay
+            self.store = SqliteStore(os.path.splitext(path)[0] + '.db')
+            self.journal = None
+        else:
+            self.store = StorageStore()
+            self.journal = Journal(path, compress_level=compress_level)
+
+        # every stock movement, flushed with each save
+        self.movements = MovementLog(os.path.splitext(path)[0] + '.movements')
+
+        # every change, numbered for downstream systems (see export_changes), flushed with each save
+        self.changes = ChangeLog(os.path.splitext(path)[0] + '.changes')
+
+        # changes made since the last save, and when the last save finished (None before the first)
+        self.unsaved_changes = 0
+        self.last_saved = None
+
+        # _lock guards the change count and the journal, movement and change buffers, so a save on
+        # another thread (see Autosaver) takes a whole batch at once; _save_lock keeps the
+        # file writes of two saves from interleaving
+        self._lock = threading.Lock()
+        self._save_lock = threading.RLock()
+
+        # many readers or one writer at a time on the store; taken before _lock, never inside it
+        self._access = ReadWriteLock()
+
+    @property
+    def load_on_demand(self):
+        """True when the store reads items as they are needed, so `load` has nothing to do."""
+        return self.journal is None
+
+    def __len__(self):
+        with self._access.reading():
+            return len(self.store)
+
+    def __contains__(self, itemID):
+        with self._access.reading():
+            return itemID in self.store
+
+    @property
+    def dirty(self):
+        """True when there are changes the next save would write."""
+        return self.unsaved_changes > 0
+
+    @measured("add_item")
+    def add_item(self, itemID, product, quantity, first_name, last_name, phone_number, email):
+        """
+        Validate and add a new item.
+
+        Parameters are the item's fields as typed by the user (strings).
+
+        Returns the new StorageRecord.
+        Raises ValidationError for a bad field and DuplicateItemError for an itemID in use.
+
+        """
+        with performance.measure("validate"):
+            error = validate_item(itemID, product, quantity, first_name, last_name, phone_number, email)
+        if error is not None:
+            raise error
+
+        record = (int(itemID), product, int(quantity), first_name, last_name, phone_number, email)
+        with self._access.writing():
+            if record[0] in self.store:
+                raise DuplicateItemError("ItemID you entered is already in use. Try again")
+
+            self.store.add(*record)
+            self._changed(record)
+            return self.store.get(record[0])
+
+    @measured("delete_item")
+    def delete_item(self, itemID):
+        """
+        Delete an item.
+
+        Raises ItemNotFoundError if it is not in the storage system.
+
+        """
+        try:
+            number = parse_item_id(itemID)
+        except ValidationError:
+            raise ItemNotFoundError(f"Item {itemID} is not in the system.")
+        with self._access.writing():
+            if not self.store.delete(number):
+                raise ItemNotFoundError(f"Item {itemID} is not in the system.")
+            self._changed(number, deleted=True)
+
+    def _changed(self, value, deleted=False):
+        # count the change for the next save, number it and, with the memory backend, journal it
+        with self._lock:
+            self.unsaved_changes += 1
+            if deleted:
+                self.changes.record_delete(value)
+            else:
+                self.changes.record_add(value)
+            if self.journal is not None:
+                if deleted:
+                    self.journal.record_delete(value)
+                else:
+                    self.journal.record_add(value)
+
+    @measured("move_stock", rows=len)
+    def move_stock(self, moves):
+        """
+        Apply a batch of stock movements, all of them or none.
+
+        Each move is (itemID, kind, amount): CHECK_IN adds `amount` units, CHECK_OUT takes
+        them away and SET_QUANTITY sets the quantity to `amount`. Moves apply in order, so an
+        item can appear more than once. Every quantity is worked out before anything is
+        changed; then the quantity column is updated in place, so items keep their position.
+        Each move is journaled, logged to the movement log and numbered in the change log.
+
+        Parameters:
+        - moves (iterable): (itemID, kind, amount) tuples; itemID and amount may be typed strings.
+
+        Returns the list of the items' quantities after each move.
+        Raises ValidationError for a bad amount or kind, ItemNotFoundError for an unknown item
+        and StockError if a move would take an item below zero or past MAX_QUANTITY.
+
+        """
+        with self._access.writing():
+            store = self.store
+            planned = []
+            quantities = {}
+            for itemID, kind, amount in moves:
+                if kind not in MOVEMENT_KINDS:
+                    raise ValidationError("Invalid Movement", f"Movement must be one of: {', '.join(MOVEMENT_KINDS)}.")
+                amount = parse_quantity(amount)
+                try:
+                    number = parse_item_id(itemID)
+                except ValidationError:
+                    raise ItemNotFoundError(f"Item {itemID} is not in the system.")
+
+                current = quantities.get(number)
+                if current is None:
+                    record = store.get(number)
+                    if record is None:
+                        raise ItemNotFoundError(f"Item {itemID} is not in the system.")
+                    current = record.quantity
+
+                if kind == CHECK_IN:
+                    quantity = current + amount
+                elif kind == CHECK_OUT:
+                    quantity = current - amount
+                else:
+                    quantity = amount
+                if quantity < 0:
+                    raise StockError(f"Item {number} has {current} units; cannot check out {amount}.")
+                if quantity > MAX_QUANTITY:
+                    raise StockError(f"Item {number} cannot hold more than {MAX_QUANTITY} units.", "Quantity Too Large")
+
+                quantities[number] = quantity
+                planned.append((number, kind, quantity - current, quantity))
+
+            # nothing has changed yet; apply the whole batch
+            store.set_quantities([(number, quantity) for number, _kind, _change, quantity in planned])
+            with self._lock:
+                for number, kind, change, quantity in planned:
+                    self.movements.record(number, kind, change, quantity)
+                    self.changes.record_quantity(number, quantity)
+                    if self.journal is not None:
+                        self.journal.record_quantity(number, quantity)
+                self.unsaved_changes += len(planned)
+            return [quantity for _number, _kind, _change, quantity in planned]
+
+    def check_in(self, itemID, amount):
+        """Add `amount` units to an item. Returns its new quantity (see move_stock)."""
+        return self.move_stock([(itemID, CHECK_IN, amount)])[0]
+
+    def check_out(self, itemID, amount):
+        """Take `amount` units from an item. Returns its new quantity (see move_stock)."""
+        return self.move_stock([(itemID, CHECK_OUT, amount)])[0]
+
+    def set_quantity(self, itemID, quantity):
+        """Set an item's quantity. Returns the new quantity (see move_stock)."""
+        return self.move_stock([(itemID, SET_QUANTITY, quantity)])[0]
+
+    @measured("find_item")
+    def find_item(self, itemID):
+        """
+        Return the StorageRecord of an item.
+
+        Raises ValidationError for an itemID that is not made of digits or starts with 0, and
+        ItemNotFoundError if the item is not in the storage system.
+
+        """
+        number = parse_item_id(itemID)
+        with self._access.reading():
+            record = self.store.get(number)
+        if record is None:
+            raise ItemNotFoundError(f"Item not found for itemID: {itemID}")
+        return record
+
+    @measured("search", rows=lambda found: len(found[1]))
+    def search(self, field, value, prefix=False, limit=None):
+        """
+        Find items by any field (see StorageStore.search_ids).
+
+        Returns (number of matches, list of up to `limit` StorageRecords, oldest first).
+        Raises ValidationError if the search cannot be done.
+
+        """
+        with self._access.reading():
+            try:
+                found = self.store.search_ids(field, value, prefix)
+            except ValueError as error:
+                raise ValidationError("Invalid Search", str(error))
+            return len(found), self.store.records_for(found, limit)
+
+    @measured("quick_search", rows=len)
+    def quick_search(self, value, limit=QUICK_SEARCH_LIMIT):
+        """
+        Find the items whose product, names or email contain or look like value, as it is typed.
+
+        Returns a list of up to `limit` StorageRecords, best match first (see
+        StorageStore.quick_search).
+
+        """
+        with self._access.reading():
+            if self.store.quick_search_ready:
+                return self.store.quick_search(value, limit)
+        # the first search builds the trigram indexes, which changes the store
+        with self._access.writing():
+            return self.store.quick_search(value, limit)
+
+    @property
+    def quick_search_ready(self):
+        """True once the Quick Search's indexes are built, so `quick_search` builds nothing."""
+        return self.store.quick_search_ready
+
+    def prepare_quick_search(self):
+        """
+        Build the trigram indexes of the Quick Search ahead of the first search, e.g. on a
+        worker thread as soon as the user starts typing one.
+
+        Only takes the read lock, so the app keeps answering meanwhile: each index is built
+        aside and put in place whole, so a search running at the same time at worst builds
+        the same index again.
+
+        """
+        with performance.measure("prepare_quick_search"):
+            with self._access.reading():
+                self.store.prepare_quick_search()
+
+    @measured("find_customers", rows=len)
+    def find_customers(self, field, value):
+        """
+        Find customers and everything they have in storage.
+
+        Customers are found through the field's index, then each one's items come from the
+        store's customer -> items table, so the work is proportional to the items of the
+        customers found, not to the size of the store.
+
+        Parameters:
+        - field (str): One of CUSTOMER_FIELDS. A "name" is "First Last", or a single name
+          that matches either the first or the last name.
+        - value (str): The value to look for, ignoring case.
+
+        Returns a list of CustomerItems, sorted by last name, first name and email.
+        Raises ValidationError if the lookup cannot be done.
+
+        """
+        value = value.strip()
+        if not value:
+            raise ValidationError("Invalid Search", "Please enter what to look the customer up by.")
+        with self._access.reading():
+            store = self.store
+            if field == "name":
+                names = value.split()
+                if len(names) == 1:
+                    found = store.search_ids("first_name", names[0]) | store.search_ids("last_name", names[0])
+                elif len(names) == 2:
+                    found = store.search_ids("first_name", names[0]) & store.search_ids("last_name", names[1])
+                else:
+                    raise ValidationError("Invalid Search", "Please enter a first and last name.")
+            elif field in CUSTOMER_FIELDS:
+                found = store.search_ids(field, value)
+            else:
+                raise ValidationError("Invalid Search", f"Customers cannot be looked up by {field.replace('_', ' ')}.")
+
+            results = []
+            for customer in store.customers_for(found):
+                records = store.records_for(store.customer_item_ids(customer))
+                results.append(CustomerItems(customer, records, sum(record.quantity for record in records)))
+            return results
+
+    @measured("most_recent", rows=len)
+    def most_recent(self, count):
+        """Return the `count` most recently added records, newest first."""
+        with self._access.reading():
+            return self.store.most_recent(count)
+
+    @measured("page", rows=len)
+    def page(self, start, count):
+        """Return the records at positions start to start + count, oldest first (see StorageStore.page)."""
+        with self._access.reading():
+            if self.store.compacted:
+                return self.store.page(start, count)
+        # the store has to drop its dead rows before it can page, which changes it
+        with self._access.writing():
+            return self.store.page(start, count)
+
+    @measured("records_for", rows=len)
+    def records_for(self, item_ids, limit=None):
+        """Return the records of the given itemIDs that are still stored, oldest first; the others are skipped."""
+        with self._access.reading():
+            return self.store.records_for(item_ids, limit)
+
+    def load(self, path=None):
+        """
+        Read the saved storage into the store on the calling thread.
+
+        Reads the binary snapshot if it is current (see `save_snapshot`) or else the CSV,
+        then replays the journal on top of it. A missing CSV counts as an empty one. The
+        sqlite backend has nothing to load.
+
+        Returns the number of items in the store.
+
+        """
+        if self.load_on_demand:
+            return len(self)
+        with performance.measure("load") as measurement:
+            snapshot = self.open_snapshot() if path is None else None
+            if snapshot is not None:
+                with snapshot:
+                    measurement.bytes = os.path.getsize(snapshot.path)
+                    self.put_loaded(snapshot.rows())
+            else:
+                try:
+                    self.put_loaded(read_storage_csv(path or self.path))
+                    measurement.bytes = os.path.getsize(path or self.path)
+                except FileNotFoundError:
+                    pass
+            self.replay_journal()
+            # a local, not measurement.rows: while recording is off every call shares one measurement
+            count = measurement.rows = len(self)
+            return count
+
+    def put_loaded(self, rows):
+        """Put rows read from the saved storage into the store. They are already saved, so nothing is journaled."""
+        with self._access.writing():
+            self.store.put_many(rows)
+
+    def replay_journal(self):
+        """Apply the saved journal to the store, after its snapshot has been loaded."""
+        if self.journal is None:
+            return 0
+        with self._access.writing():
+            return self.journal.apply_to(self.store)
+
+    def save(self, compact=True):
+        """
+        Save the changes made since the last save.
+
+        With the memory backend, appends them to the journal and compacts the journal into
+        the CSV once it has grown. With the sqlite backend, commits the open transaction.
+        Either way the stock movements since the last save are appended to the movement log
+        and the numbered changes to the change log. Does nothing when there are no changes.
+
+        The batch of changes is taken in one step and written afterwards, so a save can run on
+        another thread (see Autosaver) while the app keeps making changes; those go in the
+        next save. If writing fails, the batch is put back for the next save to retry.
+
+        Parameters:
+        - compact (bool): Whether this save may compact the journal.
+
+        Returns the number of changes saved.
+
+        """
+        with self._save_lock, performance.measure("save") as measurement:
+            with self._lock:
+                saved, self.unsaved_changes = self.unsaved_changes, 0
+                movements = self.movements.take_pending()
+                changes = self.changes.take_pending()
+                journal = self.journal.take_pending() if self.journal is not None else None
+            if not saved:
+                return 0
+            # the batches are ASCII, so their lengths are the bytes written
+            measurement.rows = saved
+            measurement.bytes = len(movements[0]) + len(changes[0]) + (len(journal[0]) if journal is not None else 0)
+
+            try:
+                self.movements.write(*movements)
+                movements = None
+                if self.journal is None:
+                    self.store.commit()
+                else:
+                    self.journal.write(*journal)
+                journal = None
+                # after the items themselves, so an exported change is always one that was saved
+                self.changes.write(*changes)
+                changes = None
+            except BaseException:
+                # keep whatever was not written for the next save
+                with self._lock:
+                    self.unsaved_changes += saved
+                    if movements is not None:
+                        self.movements.restore_pending(*movements)
+                    if journal is not None:
+                        self.journal.restore_pending(*journal)
+                    if changes is not None:
+                        self.changes.restore_pending(*changes)
+                raise
+
+            self.last_saved = time.time()
+            if compact and self.journal is not None and self.journal.needs_compaction:
+                self.journal.compact(flush=False)
+            return saved
+
+    def wait_for_save(self):
+        """Block until a save running on another thread has finished writing."""
+        with self._save_lock:
+            pass
+
+    @measured("import_files", rows=lambda importer: importer.rows_read)
+    def import_files(self, paths, rejects_path=REJECTS_PATH, workers=IMPORT_WORKERS):
+        """
+        Bulk import CSV files (see BulkImporter) on the calling thread.
+
+        With more than one worker, large imports are parsed and validated in a process pool.
+
+        Returns the finished BulkImporter.
+
+        """
+        importer = BulkImporter(paths, self.__contains__, rejects_path, workers=workers)
+        importer.prepare()
+        self.commit_import(importer)
+        return importer
+
+    def commit_import(self, importer):
+        """Add the rows a prepared BulkImporter staged. Returns the number added."""
+        with self._access.writing(), self._lock:
+            added = importer.commit(self.store, self.journal, self.changes)
+            self.unsaved_changes += added
+        return added
+
+    def export(self, path, compression=None, level=None):
+        """
+        Write every item to a CSV file with the ProjectStorage.csv header.
+
+        The file is written to a temp file first and then moved into place, so an existing
+        file is never left half written. The records are copied first, so changes made while
+        the file is being written wait only for the copy.
+
+        Parameters:
+        - path (str): The CSV file; a name ending in .gz, .bz2 or .xz writes it compressed.
+        - compression (str): One of COMPRESSIONS, or 'none', in place of the one the name asks for.
+        - level (int): The compression level; None for `compress_level`.
+
+        Returns the number of items written.
+
+        """
+        with performance.measure("export") as measurement:
+            with self._access.reading():
+                records = list(self.store.records())
+            if level is None:
+                level = self.compress_level
+            written = measurement.rows = write_storage_csv(path, records, compression, level)
+            measurement.bytes = os.path.getsize(path)
+            return written
+
+    def export_changes(self, out, since=0, format='csv', limit=None):
+        """
+        Write the saved changes with a sequence number above `since` to an open text file.
+
+        A system mirroring the storage keeps the last sequence number it has applied and asks
+        for what came after it, so a sync costs O(changes since) rather than a read of every
+        item. Changes show up once they are saved. See ChangeLog.export for the formats.
+
+        Parameters:
+        - out (file): Where to write, opened with newline='' for CSV.
+        - since (int): The last sequence number already applied; 0 for every change.
+        - format (str): 'csv' or 'jsonl'.
+        - limit (int): The most changes to write; None for all of them.
+
+        Returns (changes, last): the number of changes written and the sequence number to pass
+        as `since` next time.
+
+        Example:
+        with open('changes.jsonl', 'w') as out:
+            written, since = core.export_changes(out, since, 'jsonl')
+
+        """
+        with performance.measure("export_changes") as measurement:
+            written, last = self.changes.export(out, since, format, limit)
+            measurement.rows = written
+            return written, last
+
+    def changes_since(self, since=0, limit=None):
+        """Return the saved changes with a sequence number above `since` as a list of Change tuples, oldest first."""
+        return list(self.changes.changes(since, limit))
+
+    @measured("save_snapshot", rows=int)
+    def save_snapshot(self):
+        """
+        Save the storage and write a binary snapshot of it next to the CSV.
+
+        The journal is folded into the CSV first and the snapshot is then converted from that
+        CSV, so the two always hold the same items, even if the store only holds part of them
+        (a cancelled load). The snapshot records the CSV's size and mtime, and `load` only uses
+        it while the CSV is still that file. Later saves keep appending to the journal, which
+        `load` replays on top of the snapshot.
+
+        Returns the number of items in the snapshot.
+
+        """
+        with self._save_lock:
+            self.save()
+            if self.journal is None:
+                with self._access.reading():
+                    records = list(self.store.records())
+                return write_snapshot(snapshot_path(self.path), records)
+            self.journal.compact()
+            return csv_to_snapshot(self.path)
+
+    def open_snapshot(self):
+        """Return a SnapshotReader of the current snapshot, or None if there is none to use."""
+        if self.load_on_demand:
+            return None
+        return open_current_snapshot(self.path)
+
+    def stats(self):
+        """Return a dict of figures about the storage system."""
+        store = self.store
+        with self._access.reading():
+            return {
+                "backend": self.backend,
+                "items": len(store),
+                "products": store.product_count(),
+                "customers": store.customer_count(),
+                "emails": store.email_count(),
+                "journal_entries": self.journal.entries if self.journal is not None else 0,
+                "unsaved_changes": self.unsaved_changes,
+                "last_sequence": self.changes.last_sequence,
+                "saved_sequence": self.changes.saved_sequence,
+            }
+
+    @measured("stock_report")
+    def stock_report(self, top=10, threshold=LOW_STOCK_THRESHOLD):
+        """
+        Return a dict describing the stock on hand.
+
+        Holds the total units and items, the units and items of every product ("products",
+        sorted by name), the `top` products with the most units ("top_products") and the
+        itemIDs of the items with at most `threshold` units ("low_stock", oldest first).
+
+        Parameters:
+        - top (int): How many products to rank.
+        - threshold (int): The highest quantity that counts as low stock.
+
+        """
+        store = self.store
+        with self._access.reading():
+            return {
+                "total_units": store.total_quantity(),
+                "items": len(store),
+                "products": store.product_totals(),
+                "top_products": store.top_products(top),
+                "threshold": threshold,
+                "low_stock": store.low_stock_ids(threshold),
+            }
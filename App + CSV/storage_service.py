@@ -0,0 +1,385 @@
+"""
+Local HTTP/JSON service for the storage system.
+
+Serves one StorageCore to every client on the machine (front desk, scanners, reporting
+scripts) through the standard library's http.server. Requests are handled by a fixed pool
+of worker threads; the core's reader-writer lock lets finds and searches run side by side
+while changes go one at a time. Connections are kept alive between requests (HTTP/1.1),
+and an Autosaver saves the changes in the background.
+
+Start it with:
+python storage_cli.py serve [--port 8765] [--workers 16]
+
+Endpoints (JSON in, JSON out):
+GET    /items?start=0&count=50     list items, oldest first, a page at a time
+POST   /items                      add an item: {"itemID": ..., "product": ..., "quantity": ..., "first_name": ...,
+                                   "last_name": ..., "phone_number": ..., "email": ...}
+GET    /items/ITEMID               find an item
+DELETE /items/ITEMID               delete an item
+POST   /items/batch                add several items: {"items": [{...}, ...]}; each one succeeds or fails on its own
+POST   /items/find                 find several items: {"itemIDs": [...]}
+POST   /items/delete               delete several items: {"itemIDs": [...]}
+GET    /search?field=email&value=john@gmail.com[&prefix=1][&limit=50]
+GET    /quick?q=lebow[&limit=50]   the best matches of some text in products, names and emails, typos included
+GET    /stats                      figures about the storage
+GET    /perf                       call counts, latency histograms, rows and bytes of every operation
+                                   and request, while recording is on (STORAGE_PERF=1 or storage_cli.py --perf serve)
+GET    /changes?since=0[&limit=1000]
+                                   saved changes after sequence number `since`, oldest first; pass the
+                                   returned "last" as `since` next time
+
+Errors come back as {"error": title, "message": message} with status 400 (bad input),
+404 (unknown item or endpoint), 409 (itemID in use) or 500.
+
+"""
+import json
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from autosave import Autosaver
+from changes import change_json
+from instrumentation import performance
+from storage_core import QUICK_SEARCH_LIMIT, DuplicateItemError, ItemNotFoundError, StorageError
+from validation import ValidationError
+
+
+# Where the service listens; localhost only, it has no authentication
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+
+# Worker threads handling requests. Each open connection holds a worker while it is kept
+# alive, so this is also the number of clients served at once.
+SERVICE_WORKERS = 16
+
+# Seconds an idle kept-alive connection stays open, so it hands its worker back
+KEEP_ALIVE_TIMEOUT = 5
+
+# Largest request body, most items in one page and most entries in one batch
+MAX_BODY_BYTES = 16 * 2**20
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+# Item fields as they appear in JSON, in add_item order
+ITEM_FIELDS = ("itemID", "product", "quantity", "first_name", "last_name", "phone_number", "email")
+
+
+class RequestError(Exception):
+
+    """A request the service cannot answer, with the HTTP status to send back."""
+
+    def __init__(self, status, title, message):
+        super().__init__(message)
+        self.status = status
+        self.title = title
+        self.message = message
+
+
+def error_status(error):
+    # HTTP status for an error raised by StorageCore
+    if isinstance(error, ItemNotFoundError):
+        return 404
+    if isinstance(error, DuplicateItemError):
+        return 409
+    return 400
+
+
+def error_body(error):
+    return {"error": error.title, "message": error.message}
+
+
+def record_json(record):
+    return record._asdict()
+
+
+def query_int(query, name, default):
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        raise RequestError(400, "Invalid Request", f"{name} must be a whole number.")
+
+
+def item_fields(item):
+    # the fields of one JSON item as the strings add_item takes
+    if not isinstance(item, dict):
+        raise RequestError(400, "Invalid Request", "Each item must be a JSON object.")
+    return [str(item.get(name, "")).strip() for name in ITEM_FIELDS]
+
+
+def batch(body, key):
+    entries = body.get(key) if isinstance(body, dict) else None
+    if not isinstance(entries, list):
+        raise RequestError(400, "Invalid Request", f"The body must be a JSON object with a list of {key}.")
+    if len(entries) > MAX_BATCH_SIZE:
+        raise RequestError(400, "Invalid Request", f"A batch can hold at most {MAX_BATCH_SIZE} {key}.")
+    return entries
+
+
+def list_items(core, query, body):
+    start = max(query_int(query, "start", 0), 0)
+    count = min(max(query_int(query, "count", 50), 0), MAX_PAGE_SIZE)
+    return 200, {"total": len(core), "start": start, "items": [record_json(record) for record in core.page(start, count)]}
+
+
+def add_item(core, query, body):
+    return 201, record_json(core.add_item(*item_fields(body)))
+
+
+def find_item(core, query, body, itemID):
+    return 200, record_json(core.find_item(itemID))
+
+
+def delete_item(core, query, body, itemID):
+    core.delete_item(itemID)
+    return 200, {"deleted": itemID}
+
+
+def add_items(core, query, body):
+    results = []
+    for item in batch(body, "items"):
+        try:
+            results.append({"item": record_json(core.add_item(*item_fields(item)))})
+        except (RequestError, ValidationError, StorageError) as error:
+            results.append(error_body(error))
+    added = sum(1 for result in results if "item" in result)
+    return 200, {"added": added, "failed": len(results) - added, "results": results}
+
+
+def find_items(core, query, body):
+    results = []
+    for itemID in batch(body, "itemIDs"):
+        try:
+            results.append({"item": record_json(core.find_item(str(itemID)))})
+        except (ValidationError, StorageError) as error:
+            results.append(error_body(error))
+    return 200, {"found": sum(1 for result in results if "item" in result), "results": results}
+
+
+def delete_items(core, query, body):
+    results = []
+    for itemID in batch(body, "itemIDs"):
+        try:
+            core.delete_item(str(itemID))
+            results.append({"deleted": itemID})
+        except (ValidationError, StorageError) as error:
+            results.append(error_body(error))
+    deleted = sum(1 for result in results if "deleted" in result)
+    return 200, {"deleted": deleted, "failed": len(results) - deleted, "results": results}
+
+
+def search_items(core, query, body):
+    field = query.get("field", [""])[0]
+    value = query.get("value", [""])[0]
+    prefix = query.get("prefix", ["0"])[0].lower() in ("1", "true", "yes")
+    limit = min(max(query_int(query, "limit", 50), 0), MAX_PAGE_SIZE)
+    if field == "itemID" and not prefix:
+        try:
+            return 200, {"total": 1, "items": [record_json(core.find_item(value))]}
+        except ItemNotFoundError:
+            return 200, {"total": 0, "items": []}
+    total, records = core.search(field, value, prefix, limit)
+    return 200, {"total": total, "items": [record_json(record) for record in records]}
+
+
+def quick_search(core, query, body):
+    limit = min(max(query_int(query, "limit", QUICK_SEARCH_LIMIT), 0), MAX_PAGE_SIZE)
+    records = core.quick_search(query.get("q", [""])[0], limit)
+    return 200, {"items": [record_json(record) for record in records]}
+
+
+def stats(core, query, body):
+    return 200, core.stats()
+
+
+def perf(core, query, body):
+    return 200, performance.snapshot()
+
+
+def list_changes(core, query, body):
+    since = max(query_int(query, "since", 0), 0)
+    limit = min(max(query_int(query, "limit", MAX_PAGE_SIZE), 0), MAX_PAGE_SIZE)
+    changes = core.changes_since(since, limit)
+    return 200, {"last": changes[-1].sequence if changes else since, "changes": [change_json(change) for change in changes]}
+
+
+# (method, path) -> handler; handlers for /items/ITEMID take the itemID as well
+ROUTES = {
+    ("GET", "/items"): list_items,
+    ("POST", "/items"): add_item,
+    ("POST", "/items/batch"): add_items,
+    ("POST", "/items/find"): find_items,
+    ("POST", "/items/delete"): delete_items,
+    ("GET", "/search"): search_items,
+    ("GET", "/quick"): quick_search,
+    ("GET", "/stats"): stats,
+    ("GET", "/changes"): list_changes,
+    ("GET", "/perf"): perf,
+}
+ITEM_ROUTES = {
+    "GET": find_item,
+    "DELETE": delete_item,
+}
+
+
+class StorageRequestHandler(BaseHTTPRequestHandler):
+
+    """Answers the requests of one connection, for as long as the client keeps it alive."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'StorageService/1.0'
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    # headers and body go out in separate writes; without TCP_NODELAY every response on a
+    # kept-alive connection waits for the client's delayed ACK (about 40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        try:
+            url = urlsplit(self.path)
+            path = url.path.rstrip("/") or "/"
+            query = parse_qs(url.query)
+            body = self._read_body()
+            handler = ROUTES.get((method, path))
+            if handler is not None:
+                with performance.measure("http " + handler.__name__):
+                    status, payload = handler(self.server.core, query, body)
+            elif path.startswith("/items/") and path.count("/") == 2 and method in ITEM_ROUTES:
+                handler = ITEM_ROUTES[method]
+                with performance.measure("http " + handler.__name__):
+                    status, payload = handler(self.server.core, query, body, path[len("/items/"):])
+            else:
+                raise RequestError(404, "Not Found", f"There is no {method} {url.path}.")
+        except RequestError as error:
+            status, payload = error.status, error_body(error)
+        except (ValidationError, StorageError) as error:
+            status, payload = error_status(error), error_body(error)
+        except Exception as error:
+            self.log_error("%s %s failed: %r", method, self.path, error)
+            status, payload = 500, {"error": "Server Error", "message": str(error)}
+        self._send(status, payload)
+
+    def _read_body(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise RequestError(400, "Invalid Request", "Content-Length must be a whole number of bytes.")
+        if length > MAX_BODY_BYTES:
+            # the body is not read, so the connection cannot be reused
+            self.close_connection = True
+            raise RequestError(400, "Invalid Request", f"The body is larger than {MAX_BODY_BYTES} bytes.")
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise RequestError(400, "Invalid Request", "The body is not valid JSON.")
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StorageService(HTTPServer):
+
+    """
+    HTTP server that answers StorageRequestHandler requests from a pool of worker threads.
+
+    The listening thread only accepts connections; each one is handed to the pool, which
+    serves it until the client closes it or it stays idle for KEEP_ALIVE_TIMEOUT seconds.
+
+    Parameters:
+    - core (StorageCore): The storage system to serve.
+    - address (tuple): (host, port) to listen on; port 0 picks a free one.
+    - workers (int): The number of worker threads.
+    - verbose (bool): Log every request to stderr.
+
+    Example:
+    service = StorageService(core, ('127.0.0.1', 8765))
+    service.serve_forever()
+
+    """
+
+    def __init__(self, core, address=(SERVICE_HOST, SERVICE_PORT), workers=SERVICE_WORKERS, verbose=False):
+        super().__init__(address, StorageRequestHandler)
+        self.core = core
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='storage-service')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def serve(core, host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, verbose=False, ready=None):
+
+    """
+    Serve a StorageCore over HTTP until interrupted (Ctrl+C or SIGTERM) or until the service is shut down.
+
+    An Autosaver saves the changes while the service runs, and once more when it stops.
+
+    Parameters:
+    - core (StorageCore): The loaded storage system to serve.
+    - host, port: Where to listen.
+    - workers (int): The number of worker threads.
+    - verbose (bool): Log every request to stderr.
+    - ready (callable): Called with the StorageService once it is listening.
+
+    """
+
+    service = StorageService(core, (host, port), workers, verbose)
+    autosaver = Autosaver(core)
+    autosaver.start()
+    # stop the same way on SIGTERM (e.g. from a service manager) as on Ctrl+C, so the last changes are saved
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        if ready is not None:
+            ready(service)
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server_close()
+        autosaver.stop()
+    if autosaver.error is not None:
+        raise autosaver.error
+
+
+def start_in_thread(core, host=SERVICE_HOST, port=0, workers=SERVICE_WORKERS):
+    """Start a StorageService on a background thread, e.g. for benchmarks. Returns the service; stop it with `shutdown` and `server_close`."""
+    service = StorageService(core, (host, port), workers)
+    threading.Thread(target=service.serve_forever, daemon=True).start()
+    return service
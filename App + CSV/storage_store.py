@@ -0,0 +1,709 @@
+from array import array
+from collections import namedtuple
+from heapq import nlargest, nsmallest
+
+from indexes import HashIndex, IdTable, PrefixIndex, RecencyIndex, normalize
+
+# NumPy is optional; without it the stock queries fall back to plain loops over the columns
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# One stored item, in the same column order as the header of ProjectStorage.csv
+StorageRecord = namedtuple(
+    "StorageRecord",
+    ["itemID", "product", "quantity", "first_name", "last_name", "phone_number", "email"],
+)
+
+# Fields with a secondary index; the ones in PREFIX_FIELDS can also be searched by prefix
+INDEXED_FIELDS = ("product", "first_name", "last_name", "phone_number", "email")
+PREFIX_FIELDS = ("product", "first_name", "last_name", "email")
+
+# Fields the Quick Search looks through, all of them PREFIX_FIELDS; on equal scores the
+# earlier field's matches come first
+QUICK_SEARCH_FIELDS = ("product", "first_name", "last_name", "email")
+
+# Only compact once this many rows have been deleted, so small stores never bother
+COMPACT_MIN_DEAD = 1024
+
+# One customer, as the customer table hands it out
+Customer = namedtuple("Customer", ["first_name", "last_name", "phone_number", "email"])
+
+# Units and number of items of one product, as the stock queries report them
+ProductTotal = namedtuple("ProductTotal", ["product", "units", "items"])
+
+
+class StorageStore:
+
+    """
+    Columnar record store for the storage system.
+
+    Every item lives in one row. The row is found through a single itemID -> row index map,
+    and each field is kept in its own `array('q')` column: itemID, quantity, and two small
+    integer references. The product reference points into a pool holding every distinct
+    product name once; the customer reference is a customer ID. The customer table keeps
+    every distinct (first name, last name, phone number, email) once, in four columns
+    indexed by customer ID, and finds a customer's ID through an IdTable, so a customer
+    costs a few list and array slots rather than a tuple and a dict entry, and one with
+    fifty items costs fifty integers instead of two hundred strings. The table also keeps
+    the itemIDs of each customer's items, so `customer_item_ids` is O(items of the
+    customer). A customer whose last item goes is taken out of the table and its ID is
+    handed to the next new customer. Deleting an item only marks its row as dead; dead rows are dropped
+    by `compact`, which keeps the rows in insertion order.
+
+    The text fields can also be indexed (see INDEXED_FIELDS) so `search` can find items by
+    product, name, phone number or email without scanning every row. A field's index is
+    built the first time the field is searched (or by `prepare_quick_search`) and kept up to
+    date from then on, so a store that is only loaded, paged and saved (the command line, a
+    batch job) holds no indexes at all. A RecencyIndex links the rows in the order they
+    were added so `most_recent` is O(N).
+
+    Every product name also has a product code (names that differ only in case share one),
+    and the units and items of each product code are kept up to date as rows change, so the
+    stock queries (`total_quantity`, `product_totals`, `top_products`) cost O(products)
+    instead of a pass over every row. `low_stock_ids` filters the quantity column, with
+    NumPy when it is installed.
+
+    Example:
+    store = StorageStore()
+    store.add(123, "Laptop", 5, "John", "Doe", "123-456-7890", "john@example.com")
+    store.get(123).product  # "Laptop"
+
+    """
+
+    def __init__(self):
+        # itemID -> row index
+        self._rows = {}
+
+        # column arrays, one entry per row (live or dead)
+        self._item_ids = array("q")
+        self._quantities = array("q")
+        self._product_refs = array("q")
+        self._customer_refs = array("q")
+
+        # 1 for a live row and 0 for a deleted one
+        self._live = bytearray()
+        self._dead = 0
+
+        # product pool: every distinct product name once, name -> reference, and the product code of each
+        self._product_pool = []
+        self._product_ref = {}
+        self._product_groups = array("q")
+
+        # customer table: the fields of each customer ID, Customer -> ID, the itemIDs of each
+        # customer's live items and the IDs free for reuse. Like the HashIndex keys, a customer
+        # with a single item holds its itemID directly and only gets a set with a second one.
+        self._first_names = []
+        self._last_names = []
+        self._phone_numbers = []
+        self._emails = []
+        self._customer_ids = IdTable(self._customer)
+        self._customer_items = []
+        self._free_customers = []
+
+        # per product code: its name and the units and live items it has. The units are plain
+        # ints, since the units of many items can add up past what a 64-bit column holds.
+        self._product_code = {}
+        self._product_names = []
+        self._product_units = []
+        self._product_items = array("q")
+        self._total_units = 0
+
+        # secondary indexes built so far, field name -> index of that field's values (see `index`)
+        self.indexes = {}
+
+        # rows linked oldest to newest
+        self._recency = RecencyIndex()
+
+    def _customer(self, ref):
+        # the Customer with this ID
+        return Customer(self._first_names[ref], self._last_names[ref], self._phone_numbers[ref], self._emails[ref])
+
+    def _text_fields(self, row):
+        # product, first name, last name, phone number and email of a row, in INDEXED_FIELDS order
+        return (self._product_pool[self._product_refs[row]], *self._customer(self._customer_refs[row]))
+
+    def _index_row(self, row):
+        if not self.indexes:
+            return
+        itemID = self._item_ids[row]
+        values = self._text_fields(row)
+        for field, index in self.indexes.items():
+            index.add(values[INDEXED_FIELDS.index(field)], itemID)
+
+    def _unindex_row(self, row):
+        if not self.indexes:
+            return
+        itemID = self._item_ids[row]
+        values = self._text_fields(row)
+        for field, index in self.indexes.items():
+            index.remove(values[INDEXED_FIELDS.index(field)], itemID)
+
+    def index(self, field):
+        """
+        Return the secondary index of one of INDEXED_FIELDS, building it from the rows the first time.
+
+        A new index is built aside and then put in place, so readers never see half of it.
+
+        """
+        index = self.indexes.get(field)
+        if index is None:
+            index = PrefixIndex() if field in PREFIX_FIELDS else HashIndex()
+            position = INDEXED_FIELDS.index(field)
+            item_ids, live = self._item_ids, self._live
+            for row in range(len(live)):
+                if live[row]:
+                    index.add(self._text_fields(row)[position], item_ids[row])
+            self.indexes[field] = index
+        return index
+
+    def _product_ref_for(self, product):
+        # the pool reference of a product name, adding it to the pool the first time it is seen
+        ref = self._product_ref.get(product)
+        if ref is None:
+            ref = self._product_ref[product] = len(self._product_pool)
+            self._product_pool.append(product)
+            self._product_groups.append(self._code_for(product))
+        return ref
+
+    def _customer_ref_for(self, customer, itemID):
+        # the ID of a customer, adding it to the table the first time it is seen, with itemID as one of its items
+        ref = self._customer_ids.get(customer)
+        if ref is None:
+            first_name, last_name, phone_number, email = customer
+            if self._free_customers:
+                ref = self._free_customers.pop()
+                self._first_names[ref] = first_name
+                self._last_names[ref] = last_name
+                self._phone_numbers[ref] = phone_number
+                self._emails[ref] = email
+                self._customer_items[ref] = itemID
+            else:
+                ref = len(self._emails)
+                self._first_names.append(first_name)
+                self._last_names.append(last_name)
+                self._phone_numbers.append(phone_number)
+                self._emails.append(email)
+                self._customer_items.append(itemID)
+            self._customer_ids.add(customer, ref)
+            return ref
+
+        items = self._customer_items[ref]
+        if type(items) is set:
+            items.add(itemID)
+        elif items != itemID:
+            self._customer_items[ref] = {items, itemID}
+        return ref
+
+    def _release_customer(self, ref, itemID):
+        # take itemID off a customer's items, and the customer out of the table after its last one
+        items = self._customer_items[ref]
+        if type(items) is set:
+            items.discard(itemID)
+            if len(items) == 1:
+                self._customer_items[ref] = next(iter(items))
+            return
+        self._customer_ids.remove(self._customer(ref))
+        self._first_names[ref] = self._last_names[ref] = self._phone_numbers[ref] = self._emails[ref] = None
+        self._customer_items[ref] = None
+        self._free_customers.append(ref)
+
+    def _code_for(self, product):
+        # the code of a product, handing out a new one the first time it is seen
+        key = normalize(product)
+        code = self._product_code.get(key)
+        if code is None:
+            code = self._product_code[key] = len(self._product_names)
+            self._product_names.append(product)
+            self._product_units.append(0)
+            self._product_items.append(0)
+        return code
+
+    def _count_stock(self, row, sign):
+        # add (sign 1) or take away (sign -1) a row's quantity from the stock totals
+        code = self._product_groups[self._product_refs[row]]
+        quantity = self._quantities[row] * sign
+        self._product_units[code] += quantity
+        self._product_items[code] += sign
+        self._total_units += quantity
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def compacted(self):
+        """True when there are no dead rows, so `page` only reads the store."""
+        return not self._dead
+
+    def __contains__(self, itemID):
+        return itemID in self._rows
+
+    def __iter__(self):
+        return self.records()
+
+    def _record(self, row):
+        # build the record tuple for a row index
+        ref = self._customer_refs[row]
+        return StorageRecord(
+            self._item_ids[row],
+            self._product_pool[self._product_refs[row]],
+            self._quantities[row],
+            self._first_names[ref],
+            self._last_names[ref],
+            self._phone_numbers[ref],
+            self._emails[ref],
+        )
+
+    def get(self, itemID):
+        """
+        Return the StorageRecord for itemID, or None if it is not in the store.
+
+        Parameters:
+        - itemID (int): The unique identifier of the item.
+
+        """
+        row = self._rows.get(itemID)
+        if row is None:
+            return None
+        return self._record(row)
+
+    def add(self, itemID, product, quantity, first_name, last_name, phone_number, email):
+        """
+        Append a new item to the store.
+
+        Parameters:
+        - itemID (int): The unique identifier of the item.
+        - product (str): The product name.
+        - quantity (int): The quantity of the item.
+        - first_name, last_name, phone_number, email (str): The customer details.
+
+        Raises KeyError if the itemID is already in the store.
+
+        """
+        if itemID in self._rows:
+            raise KeyError(itemID)
+
+        # the new row goes at the end of every column
+        self._rows[itemID] = len(self._item_ids)
+        self._item_ids.append(itemID)
+        self._quantities.append(quantity)
+        self._product_refs.append(self._product_ref_for(product))
+        self._customer_refs.append(self._customer_ref_for(Customer(first_name, last_name, phone_number, email), itemID))
+        self._live.append(1)
+        self._index_row(len(self._item_ids) - 1)
+        self._count_stock(len(self._item_ids) - 1, 1)
+        self._recency.append(len(self._item_ids) - 1)
+
+    def put(self, itemID, product, quantity, first_name, last_name, phone_number, email):
+        """
+        Add an item, or overwrite it in place if the itemID is already stored.
+
+        An overwritten item keeps its position in the store, the same way assigning to an
+        existing dict key does.
+
+        Parameters are the same as for `add`.
+
+        """
+        row = self._rows.get(itemID)
+        if row is None:
+            self.add(itemID, product, quantity, first_name, last_name, phone_number, email)
+            return
+
+        self._unindex_row(row)
+        self._count_stock(row, -1)
+        self._quantities[row] = quantity
+        self._product_refs[row] = self._product_ref_for(product)
+        customer = Customer(first_name, last_name, phone_number, email)
+        if customer != self._customer(self._customer_refs[row]):
+            # take the new customer before letting go of the old one, so the old ID cannot be reused for it
+            customer_ref = self._customer_ref_for(customer, itemID)
+            self._release_customer(self._customer_refs[row], itemID)
+            self._customer_refs[row] = customer_ref
+        self._index_row(row)
+        self._count_stock(row, 1)
+
+    def put_many(self, rows):
+        """
+        Call `put` for every row in rows.
+
+        Parameters:
+        - rows (iterable): (itemID, product, quantity, first name, last name, phone number, email) tuples.
+
+        """
+        put = self.put
+        for row in rows:
+            put(*row)
+
+    def add_many(self, rows):
+        """
+        Add many new items in one go, or none of them.
+
+        Parameters:
+        - rows (list): (itemID, product, quantity, first name, last name, phone number, email) tuples.
+
+        Raises KeyError, with nothing added, if any itemID is already in the store.
+
+        """
+        added = 0
+        try:
+            for row in rows:
+                self.add(*row)
+                added += 1
+        except BaseException:
+            for row in rows[:added]:
+                self.delete(row[0])
+            raise
+
+    def set_quantity(self, itemID, quantity):
+        """
+        Change the quantity of an item in place, in O(1).
+
+        The item keeps its position and the stock totals follow the change.
+
+        Parameters:
+        - itemID (int): The unique identifier of the item.
+        - quantity (int): The new quantity.
+
+        Returns the previous quantity. Raises KeyError if the item is not in the store.
+
+        """
+        row = self._rows[itemID]
+        previous = self._quantities[row]
+        self._quantities[row] = quantity
+        code = self._product_groups[self._product_refs[row]]
+        self._product_units[code] += quantity - previous
+        self._total_units += quantity - previous
+        return previous
+
+    def set_quantities(self, changes):
+        """
+        Change the quantity of many items in place, or of none of them.
+
+        Parameters:
+        - changes (list): (itemID, quantity) pairs, applied in order.
+
+        Raises KeyError, with nothing changed, if any itemID is not in the store.
+
+        """
+        rows = self._rows
+        for itemID, _quantity in changes:
+            if itemID not in rows:
+                raise KeyError(itemID)
+        for itemID, quantity in changes:
+            self.set_quantity(itemID, quantity)
+
+    def delete(self, itemID):
+        """
+        Delete an item from the store.
+
+        Parameters:
+        - itemID (int): The unique identifier of the item.
+
+        Returns True if the item was deleted, False if it was not in the store.
+
+        """
+        row = self._rows.pop(itemID, None)
+        if row is None:
+            return False
+
+        # mark the row dead and let go of its customer straight away
+        self._unindex_row(row)
+        self._count_stock(row, -1)
+        self._recency.remove(row)
+        self._release_customer(self._customer_refs[row], itemID)
+        self._live[row] = 0
+        self._dead += 1
+
+        # compact once at least half of the rows are dead
+        if self._dead >= COMPACT_MIN_DEAD and self._dead * 2 >= len(self._live):
+            self.compact()
+        return True
+
+    def clear(self):
+        """Remove every item from the store."""
+        self.__init__()
+
+    def compact(self):
+        """
+        Drop the dead rows and rebuild the itemID -> row index map.
+
+        The live rows keep their order, so the most recently added items stay at the end.
+
+        """
+        if not self._dead:
+            return
+
+        live = self._live
+        keep = [row for row in range(len(live)) if live[row]]
+
+        # old row -> new row, to carry the recency order over to the new row numbers
+        new_row = array("q", [-1]) * len(live)
+        for row, old in enumerate(keep):
+            new_row[old] = row
+        self._recency = RecencyIndex.from_order((new_row[old] for old in self._recency.oldest()), len(keep))
+
+        self._item_ids = array("q", [self._item_ids[row] for row in keep])
+        self._quantities = array("q", [self._quantities[row] for row in keep])
+        self._product_refs = array("q", [self._product_refs[row] for row in keep])
+        self._customer_refs = array("q", [self._customer_refs[row] for row in keep])
+        self._live = bytearray(b"\x01") * len(keep)
+        self._dead = 0
+        self._rows = {itemID: row for row, itemID in enumerate(self._item_ids)}
+
+    def distinct(self, field):
+        """Return the number of different values of an indexed field (building its index, see `index`)."""
+        return len(self.index(field))
+
+    def product_count(self):
+        """Return the number of different products with items, ignoring case, from the product codes (no index needed)."""
+        return sum(1 for items in self._product_items if items)
+
+    def email_count(self):
+        """Return the number of different emails with items, ignoring case, from the customer table (no index needed)."""
+        return len({normalize(email) for email in self._emails if email is not None})
+
+    def customer_count(self):
+        """Return the number of different customers (first name, last name, phone number, email) with items."""
+        return len(self._customer_ids)
+
+    def customers_for(self, item_ids):
+        """
+        Return the Customers who own any of item_ids, sorted by last name, first name and email.
+
+        Parameters:
+        - item_ids (iterable): itemIDs that are in the store.
+
+        """
+        rows, refs, customer_of = self._rows, self._customer_refs, self._customer
+        found = {customer_of(refs[rows[itemID]]) for itemID in item_ids}
+        return sorted(found, key=lambda customer: (normalize(customer.last_name), normalize(customer.first_name), customer.email))
+
+    def customer_item_ids(self, customer):
+        """
+        Return the set of itemIDs a customer owns, in O(items of the customer).
+
+        Parameters:
+        - customer (Customer): The customer, exactly as stored.
+
+        """
+        ref = self._customer_ids.get(customer)
+        if ref is None:
+            return set()
+        items = self._customer_items[ref]
+        if type(items) is set:
+            return set(items)
+        return {items}
+
+    def records(self):
+        """Yield a StorageRecord for every item, oldest first."""
+        live = self._live
+        for row in range(len(live)):
+            if live[row]:
+                yield self._record(row)
+
+    def page(self, start, count, newest_first=False):
+        """
+        Return the records at positions start to start + count.
+
+        Positions count live items only, oldest first (or newest first with newest_first),
+        so a view can fetch just the rows it shows. Dead rows are compacted away first so
+        that positions line up with rows.
+
+        Parameters:
+        - start (int): The position of the first record.
+        - count (int): The number of records to return.
+        - newest_first (bool): Count positions from the most recently added item.
+
+        """
+        self.compact()
+        total = len(self._item_ids)
+        start = max(start, 0)
+        if newest_first:
+            rows = range(total - 1 - start, max(total - 1 - start - count, -1), -1)
+        else:
+            rows = range(start, min(start + count, total))
+        return [self._record(row) for row in rows]
+
+    def most_recent(self, count):
+        """
+        Return the `count` most recently added records, newest first, in O(count).
+
+        Parameters:
+        - count (int): The number of records to return.
+
+        """
+        return [self._record(row) for row in self._recency.newest(count)]
+
+    def item_ids(self):
+        """Yield every itemID, oldest first."""
+        live = self._live
+        item_ids = self._item_ids
+        for row in range(len(live)):
+            if live[row]:
+                yield item_ids[row]
+
+    def search_ids(self, field, value, prefix=False):
+        """
+        Return the set of itemIDs whose field matches value, ignoring case.
+
+        Parameters:
+        - field (str): "itemID" or one of INDEXED_FIELDS.
+        - value (str): The value to look for.
+        - prefix (bool): Match every value starting with `value` (only for PREFIX_FIELDS).
+
+        Raises ValueError for a field that cannot be searched that way.
+
+        """
+        if field == "itemID":
+            if prefix or not value.isdigit():
+                raise ValueError("itemID can only be searched by its exact digits.")
+            itemID = int(value)
+            # "007" is not how itemID 7 is written, so it matches nothing
+            return {itemID} if itemID in self._rows and str(itemID) == value else set()
+
+        if field not in INDEXED_FIELDS or (prefix and field not in PREFIX_FIELDS):
+            raise ValueError(f"{field.replace('_', ' ')} cannot be searched{' by prefix' if prefix else ''}.")
+        index = self.index(field)
+        if prefix:
+            return index.lookup_prefix(value)
+        return index.lookup(value)
+
+    def records_for(self, item_ids, limit=None):
+        """
+        Return the StorageRecords of item_ids, oldest first.
+
+        itemIDs that are not in the store (e.g. deleted since they were looked up) are
+        skipped, as they are by SqliteStore.records_for.
+
+        Parameters:
+        - item_ids (iterable): The itemIDs.
+        - limit (int): Only return the first `limit` records.
+
+        """
+        rows = self._rows
+        found = [row for row in map(rows.get, item_ids) if row is not None]
+        if limit is None:
+            order = sorted(found)
+        else:
+            order = nsmallest(limit, found)
+        return [self._record(row) for row in order]
+
+    def search(self, field, value, prefix=False, limit=None):
+        """
+        Find items by any field through the secondary indexes.
+
+        Parameters are the same as for `search_ids` and `records_for`.
+
+        Example:
+        store.search("last_name", "jon", prefix=True)  # every Jones, Jonas, ...
+
+        """
+        return self.records_for(self.search_ids(field, value, prefix), limit)
+
+    @property
+    def quick_search_ready(self):
+        """True once every QUICK_SEARCH_FIELDS index has its trigrams, so `quick_search` builds nothing."""
+        indexes = self.indexes
+        return all(field in indexes and indexes[field].quick_search_ready for field in QUICK_SEARCH_FIELDS)
+
+    def prepare_quick_search(self):
+        """Build the indexes and trigram indexes `quick_search` uses now, e.g. on a worker thread, rather than on the first search."""
+        for field in QUICK_SEARCH_FIELDS:
+            self.index(field).prepare_quick_search()
+
+    def quick_search(self, value, limit):
+        """
+        Find up to `limit` items whose product, names or email contain or look like value, best match first.
+
+        Every QUICK_SEARCH_FIELDS index ranks its own values containing the query (see
+        TrigramIndex.search); only if all of them together hold fewer than `limit` values are
+        values that merely look like it searched for too. The values of all the fields are
+        merged by score, and each brings its items, oldest first, until `limit` items are
+        found. The work depends on the number of values sharing the query's rarest
+        trigrams, not on the number of items.
+
+        Parameters:
+        - value (str): What was typed so far, ignoring case.
+        - limit (int): The most items to return.
+
+        Example:
+        store.quick_search("lebow", 20)  # the Lebowskis first, then anything like them
+
+        """
+        value = value.strip()
+        if not value or limit <= 0:
+            return []
+        matches = []
+        for fuzzy in (False, True):
+            if fuzzy and len(matches) >= limit:
+                break
+            matches = []
+            for order, field in enumerate(QUICK_SEARCH_FIELDS):
+                for score, key in self.index(field).lookup_similar(value, limit, fuzzy):
+                    matches.append((-score, order, len(key), key, field))
+        matches.sort()
+
+        found = []
+        seen = set()
+        for _score, _order, _length, key, field in matches:
+            item_ids = self.indexes[field].lookup(key) - seen
+            if item_ids:
+                seen |= item_ids
+                found.extend(self.records_for(item_ids, limit - len(found)))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def total_quantity(self):
+        """Return the number of units on hand over every item."""
+        return self._total_units
+
+    def product_totals(self):
+        """
+        Return a ProductTotal for every product in the store, sorted by product name.
+
+        Products are grouped ignoring case and shown with the spelling they were first added
+        with. The totals are kept up to date as items change, so this is O(products).
+
+        """
+        names, units, items = self._product_names, self._product_units, self._product_items
+        totals = [ProductTotal(names[code], units[code], items[code]) for code in range(len(names)) if items[code]]
+        totals.sort(key=lambda total: normalize(total.product))
+        return totals
+
+    def top_products(self, count):
+        """
+        Return the ProductTotals of the `count` products with the most units, most first.
+
+        Parameters:
+        - count (int): The number of products to return.
+
+        """
+        names, units, items = self._product_names, self._product_units, self._product_items
+        codes = nlargest(count, (code for code in range(len(names)) if items[code]), key=units.__getitem__)
+        return [ProductTotal(names[code], units[code], items[code]) for code in codes]
+
+    def low_stock_ids(self, threshold):
+        """
+        Return the itemIDs of the items with at most `threshold` units, oldest first.
+
+        With NumPy installed the quantity column is compared in one vectorized pass over a
+        view of the array, without copying it.
+
+        Parameters:
+        - threshold (int): The highest quantity that counts as low stock.
+
+        """
+        if numpy is not None:
+            quantities = numpy.frombuffer(self._quantities, dtype=numpy.int64)
+            live = numpy.frombuffer(self._live, dtype=numpy.bool_)
+            rows = numpy.flatnonzero((quantities <= threshold) & live)
+            found = numpy.frombuffer(self._item_ids, dtype=numpy.int64)[rows].tolist()
+            # let go of the views, or the columns could not grow any more
+            del quantities, live, rows
+            return found
+
+        item_ids, quantities, live = self._item_ids, self._quantities, self._live
+        return [item_ids[row] for row in range(len(live)) if live[row] and quantities[row] <= threshold]
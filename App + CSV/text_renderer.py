@@ -0,0 +1,178 @@
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Least time between two redraws of the text, so a burst of updates (e.g. items scanned in
+# one after the other) is drawn once per frame at about 60 frames a second
+RENDER_FRAME_MS = 16
+
+# How often the Tk thread checks on text being worked out in the background
+RENDER_POLL_MS = 20
+
+
+def common_prefix_length(first, second):
+    """Return the length of the longest common prefix of two strings, comparing slices so the work is done in C."""
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class TextRenderer:
+
+    """
+    Render layer for a Text widget that shows messages and results.
+
+    Handlers never touch the widget: `clear`, `write` and `show` only change a buffer, and
+    the first change schedules one redraw with `after_idle` (at most one per
+    RENDER_FRAME_MS), so everything a handler writes, and every handler run in the same
+    frame, is drawn at once. A redraw compares the buffer with the text already shown and
+    only replaces what comes after the part they share, so a progress line that changes a
+    few characters, or a result that did not change at all, costs next to nothing. The
+    widget is read-only to the user, so what is shown is always what was last drawn.
+
+    Text that takes work to produce, e.g. formatting search results, is worked out with
+    `submit` on a background thread, and the Tk thread only draws it. A newer `clear`,
+    `show` or `submit` supersedes results still being worked out, so typing fast only ever
+    draws the last one.
+
+    All methods are called from the Tk thread.
+
+    Parameters:
+    - widget (tk.Text): The widget to draw in.
+    - on_error (callable): Called on the Tk thread with the exception of a failed `submit`;
+      by default its text is shown.
+
+    Example:
+    output = TextRenderer(storage_text)
+    output.clear()
+    output.write("Items found: 2\\n")
+    output.submit(lambda: "\\n".join(format_record(record) for record in core.most_recent(10)))
+
+    """
+
+    def __init__(self, widget, on_error=None):
+        self.widget = widget
+        self.on_error = on_error
+        self.widget.configure(state=tk.DISABLED)
+
+        # what the buffer holds, and what the widget shows
+        self._parts = []
+        self._shown = ""
+
+        # the pending redraw, and when the last one happened
+        self._scheduled = None
+        self._last_render = 0.0
+
+        # text worked out in the background; a result only counts if nothing changed the
+        # buffer since it was submitted
+        self._workers = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        self._generation = 0
+        self._pending = []
+
+    def clear(self):
+        """Empty the text."""
+        self._replace([])
+
+    def show(self, text):
+        """Replace the text with `text`."""
+        self._replace([text])
+
+    def write(self, text):
+        """Add `text` at the end."""
+        self._parts.append(text)
+        self._schedule()
+
+    def submit(self, work, done=None):
+        """
+        Work out the text to show on a background thread, then show it in place of the current text.
+
+        Parameters:
+        - work (callable): Returns the text; or (text, value) when `done` is given.
+        - done (callable): Called on the Tk thread with the value once the text is shown,
+          e.g. to put records in the result table.
+
+        Returns the Future of the work.
+
+        """
+        self._generation += 1
+        future = self._workers.submit(self._work, self._generation, work)
+        self._pending.append((self._generation, future, done))
+        if len(self._pending) == 1:
+            self.widget.after(RENDER_POLL_MS, self._poll)
+        return future
+
+    def flush(self):
+        """Draw the pending changes now rather than when the window is idle."""
+        if self._scheduled is not None:
+            self.widget.after_cancel(self._scheduled)
+        self._render()
+
+    def close(self):
+        """Stop the background thread; results still being worked out are dropped."""
+        self._generation += 1
+        self._workers.shutdown(wait=False, cancel_futures=True)
+
+    def _replace(self, parts):
+        # also supersedes whatever is still being worked out
+        self._generation += 1
+        self._parts = parts
+        self._schedule()
+
+    def _schedule(self):
+        if self._scheduled is not None:
+            return
+        wait = RENDER_FRAME_MS - (time.perf_counter() - self._last_render) * 1000
+        if wait > 0:
+            self._scheduled = self.widget.after(int(wait) + 1, self._render)
+        else:
+            self._scheduled = self.widget.after_idle(self._render)
+
+    def _render(self):
+        self._scheduled = None
+        self._last_render = time.perf_counter()
+        text = "".join(self._parts)
+        self._parts = [text] if text else []
+        if text == self._shown:
+            return
+
+        # replace only what comes after the part already on screen
+        same = common_prefix_length(text, self._shown)
+        self.widget.configure(state=tk.NORMAL)
+        self.widget.delete(f"1.0 + {same} chars", tk.END)
+        self.widget.insert(tk.END, text[same:])
+        self.widget.configure(state=tk.DISABLED)
+        self._shown = text
+
+    def _work(self, generation, work):
+        # runs on the background thread; work superseded while it waited is skipped
+        if generation != self._generation:
+            return None
+        return work()
+
+    def _poll(self):
+        # hand finished background work to the Tk thread, in the order it was submitted
+        while self._pending and self._pending[0][1].done():
+            generation, future, done = self._pending.pop(0)
+            if generation != self._generation or future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                if self.on_error is not None:
+                    self.on_error(error)
+                else:
+                    self.show(f"{error}\n")
+                continue
+            result = future.result()
+            text, value = result if done is not None else (result, None)
+            self._parts = [text]
+            self._schedule()
+            if done is not None:
+                done(value)
+        if self._pending:
+            self.widget.after(RENDER_POLL_MS, self._poll)
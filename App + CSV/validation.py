@@ -0,0 +1,116 @@
+import re
+
+
+# Patterns are compiled once when the module loads and matched against the whole field.
+# Digits are ASCII only, and at most 18 of them, because itemID and quantity are stored
+# in 64-bit integer columns.
+DIGITS = re.compile(r"[0-9]{1,18}")
+
+# An itemID is stored as a number, so "007" and "7" would be the same item; an itemID is
+# written without leading zeros so every itemID has exactly one spelling
+ITEM_ID = re.compile(r"0|[1-9][0-9]{0,17}")
+PHONE_NUMBER = re.compile(r"[0-9]{3}-[0-9]{3}-[0-9]{4}")
+
+# A valid email has exactly one '@' and one '.', ends in '.com' and otherwise only holds
+# letters and digits. EMAIL_SHAPE accepts any characters around the '@' and '.com', which
+# tells a wrongly shaped address apart from one that only has bad characters.
+EMAIL = re.compile(r"[A-Za-z0-9]*@[A-Za-z0-9]*\.com")
+EMAIL_SHAPE = re.compile(r"[^@.]*@[^@.]*\.com")
+
+EMAIL_FORMAT_MESSAGE = "Invalid email format. Please use the correct email format (e.g., user@example.com)."
+EMAIL_CHARACTERS_MESSAGE = "Invalid characters in the email address. Please use only letters, numbers, @, and '.'."
+
+
+class ValidationError(ValueError):
+
+    """
+    A field of an item that did not pass validation.
+
+    Parameters:
+    - title (str): A short title, used for the messagebox shown to the user.
+    - message (str): What is wrong and how to fix it.
+
+    """
+
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+
+
+# (title, message) of each kind of failure. Every failure gets a new ValidationError made from
+# them: a raised exception carries its traceback, so one instance must not be shared by threads.
+INCOMPLETE = ("Incomplete Information", "Please fill out the entire information.")
+INVALID_ITEM_ID = ("Invalid ItemID", "Please enter a valid integer for itemID.")
+ITEM_ID_LEADING_ZERO = ("Invalid ItemID", "ItemIDs cannot start with 0. Please enter the itemID without the leading zeros.")
+INVALID_QUANTITY = ("Invalid Quanity", "Please enter a valid integer for quanity.")
+INVALID_FIRST_NAME = ("Invalid First Name", "Please enter a valid first name with only letters.")
+INVALID_LAST_NAME = ("Invalid Last Name", "Please enter a valid last name with only letters.")
+INVALID_PRODUCT = ("Invalid Product Name", "Please enter a valid product name with only letters.")
+INVALID_EMAIL_FORMAT = ("Invalid Email Address", EMAIL_FORMAT_MESSAGE)
+INVALID_EMAIL_CHARACTERS = ("Invalid Email Address", EMAIL_CHARACTERS_MESSAGE)
+INVALID_PHONE_NUMBER = ("Invalid Phone Number", "Please enter a valid phone number in xxx-xxx-xxxx format.")
+
+
+def validate_item(itemID, product, quantity, first_name, last_name, phone_number, email):
+
+    """
+    Check the fields of one item, as typed into the Create Item window or read from a CSV.
+
+    Every field is looked at once, in the order add_item has always checked them, and the first
+    problem found is returned. Whether the itemID is already taken is up to the caller.
+
+    Parameters:
+    - itemID, product, quantity, first_name, last_name, phone_number, email (str): The item's fields.
+
+    Returns None if the item is valid, otherwise a new ValidationError describing the problem.
+
+    Example:
+    validate_item("123", "Laptop", "5", "John", "Doe", "123-456-7890", "john@example.com")  # None
+
+    """
+
+    if not itemID or not product or not first_name or not last_name or not phone_number or not email:
+        return ValidationError(*INCOMPLETE)
+    if not ITEM_ID.fullmatch(itemID):
+        return ValidationError(*(ITEM_ID_LEADING_ZERO if DIGITS.fullmatch(itemID) else INVALID_ITEM_ID))
+    if not DIGITS.fullmatch(quantity):
+        return ValidationError(*INVALID_QUANTITY)
+    if not first_name.isalpha():
+        return ValidationError(*INVALID_FIRST_NAME)
+    if not last_name.isalpha():
+        return ValidationError(*INVALID_LAST_NAME)
+    if not product.isalpha():
+        return ValidationError(*INVALID_PRODUCT)
+    if not EMAIL.fullmatch(email):
+        return ValidationError(*(INVALID_EMAIL_CHARACTERS if EMAIL_SHAPE.fullmatch(email) else INVALID_EMAIL_FORMAT))
+    if not PHONE_NUMBER.fullmatch(phone_number):
+        return ValidationError(*INVALID_PHONE_NUMBER)
+    return None
+
+
+def validate_batch(rows):
+
+    """
+    Check many items at once.
+
+    Parameters:
+    - rows (iterable): Sequences of the seven string fields in ProjectStorage.csv column order
+      (itemID, product, quantity, first name, last name, phone number, email).
+
+    Returns a list of (position, ValidationError) pairs for the rows that failed, in order;
+    rows that are not listed are valid. A row without exactly seven fields is incomplete.
+
+    Example:
+    validate_batch([["1", "Apple", "3", "Ann", "Lee", "123-456-7890", "ann@mail.com"]])  # []
+
+    """
+
+    errors = []
+    append = errors.append
+    check = validate_item
+    for position, row in enumerate(rows):
+        error = check(*row) if len(row) == 7 else ValidationError(*INCOMPLETE)
+        if error is not None:
+            append((position, error))
+    return errors